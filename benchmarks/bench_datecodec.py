@@ -0,0 +1,116 @@
+"""
+Microbenchmarks of the date codec (mimir.backend.datecodec) against the string
+based helper functions it replaces. Run with
+
+    python -m benchmarks.bench_datecodec [--n 100000] [--distinct 1000]
+
+from the root of the repository.
+"""
+import argparse
+import datetime
+import random
+import timeit
+from collections.abc import Callable
+
+import mimir.backend.datecodec as datecodec
+import mimir.backend.helper as helper
+
+
+def legacy_convert(internal_string: str) -> datetime.datetime:
+    """convertToDateTime before the date codec was added"""
+    if len(internal_string.split("|")) != 2:
+        raise TypeError(internal_string)
+    date, time = internal_string.split("|")
+    if len(date.split(".")) != 3:
+        raise RuntimeError
+    if len(time.split(":")) != 3:
+        raise RuntimeError
+    day, month, year = date.split(".")
+    hour, minute, sec = time.split(":")
+    return datetime.datetime(
+        2000 + int(year), int(month), int(day), int(hour), int(minute), int(sec)
+    )
+
+
+def legacy_sort(list_to_sort: list[str]) -> list[str]:
+    """sortDateTime before the date codec was added"""
+    datetime_objs = []
+    for elem in list_to_sort:
+        try:
+            datetime_objs.append(legacy_convert(elem))
+        except TypeError:
+            datetime_objs.append(legacy_convert("01.01.00|00:00:00"))
+    datetime_objs = sorted(datetime_objs, reverse=True)
+    return [
+        "{0:02}.{1:02}.{2:02}|{3:02}:{4:02}:{5:02}".format(
+            e.day, e.month, e.year - 2000, e.hour, e.minute, e.second
+        )
+        for e in datetime_objs
+    ]
+
+
+def make_dates(n: int, distinct: int) -> list[str]:
+    start = datetime.datetime(2019, 1, 1)
+    pool = [
+        (start + datetime.timedelta(seconds=random.randrange(10**8))).strftime(
+            "%d.%m.%y|%H:%M:%S"
+        )
+        for _ in range(distinct)
+    ]
+    return [random.choice(pool) for _ in range(n)]
+
+
+def bench(name: str, func: Callable[[], object], repeat: int = 3) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print("  {0:<40} {1:8.1f} ms".format(name, best * 1000))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100000, help="Number of dates")
+    parser.add_argument(
+        "--distinct", type=int, default=1000, help="Number of distinct dates"
+    )
+    args = parser.parse_args()
+
+    dates = make_dates(args.n, args.distinct)
+    print("{0} dates ({1} distinct)".format(args.n, args.distinct))
+
+    print("Parse")
+    legacy = bench(
+        "legacy convertToDateTime", lambda: [legacy_convert(d) for d in dates]
+    )
+    datecodec.clear_memo()
+    cold = bench(
+        "datecodec.to_epochs (cold memo)",
+        lambda: (datecodec.clear_memo(), datecodec.to_epochs(dates)),
+    )
+    warm = bench("datecodec.to_epochs (warm memo)", lambda: datecodec.to_epochs(dates))
+    print(
+        "  speedup: {0:.1f}x cold, {1:.1f}x warm".format(legacy / cold, legacy / warm)
+    )
+
+    print("Format")
+    epochs = datecodec.to_epochs(dates)
+    date_objects = [legacy_convert(d) for d in dates]
+    legacy = bench(
+        "str.format of datetime",
+        lambda: [
+            "{0:02}.{1:02}.{2:02}|{3:02}:{4:02}:{5:02}".format(
+                e.day, e.month, e.year - 2000, e.hour, e.minute, e.second
+            )
+            for e in date_objects
+        ],
+    )
+    codec = bench("datecodec.from_epochs", lambda: datecodec.from_epochs(epochs))
+    print("  speedup: {0:.1f}x".format(legacy / codec))
+
+    print("Sort")
+    legacy = bench("legacy sortDateTime", lambda: legacy_sort(dates))
+    codec = bench("helper.sortDateTime", lambda: helper.sortDateTime(dates))
+    print("  speedup: {0:.1f}x".format(legacy / codec))
+
+
+if __name__ == "__main__":
+    main()
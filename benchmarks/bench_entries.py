@@ -0,0 +1,113 @@
+"""
+Memory per entry before the compact entry classes (LegacyEntry, a copy of the
+storage layout of DataBaseEntry at that time: names list, items dict of Item
+objects with __dict__ and the values as attributes), of the current generic
+DataBaseEntry and of the compact entry class generated from the model (see
+Model.create_entry). Run with
+
+    python -m benchmarks.bench_entries [--n 100000 1000000] \
+        [--model conf/modeltest.json]
+
+from the root of the repository. Values are shared between the entries as in a
+loaded database, so only the memory of the entry structures is compared.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from mimir.backend.database import Model
+from mimir.backend.entry import DataBaseEntry
+
+
+class LegacyItem:
+    """Item as stored before the compact entry classes (no slots)"""
+
+    def __init__(self, name: str, value: str | list[str]) -> None:
+        self.name = name
+        self.value = value
+
+
+class LegacyEntry:
+    """DataBaseEntry as stored before the compact entry classes (no slots)"""
+
+    def __init__(self, init_items: list[tuple[str, str, str | list[str]]]) -> None:
+        self.names = []
+        self.items = {}
+        self.observer = None
+        self.key = None
+        for item_name, item_type, item_value in init_items:
+            self.names.append(item_name)
+            if item_type == "List" and isinstance(item_value, str):
+                item_value = [item_value]
+            self.items[item_name] = LegacyItem(item_name, item_value)
+        for item in self.names:
+            setattr(self, item, self.items[item].value)
+
+
+def make_init_items(
+    model: Model, i_entry: int
+) -> list[tuple[str, str, str | list[str]]]:
+    """Returns the initialization list of the i-th entry"""
+    init_items = []
+    for item in model.items:
+        value = str(i_entry) if item in ("ID", "Path", "Name") else "0"
+        init_items.append((item, "Single", value))
+    for item in model.listitems:
+        init_items.append((item, "List", ["emptyOpened", "01.01.20|00:00:00"]))
+    return init_items
+
+
+def measure(
+    create: Callable[[list], object],
+    all_init_items: list[list[tuple[str, str, str | list[str]]]],
+) -> tuple[float, float]:
+    """Returns bytes per entry and seconds for creating the entries"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = [create(init_items) for init_items in all_init_items]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_entries = len(entries)
+    del entries
+    return size / n_entries, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--n", type=int, nargs="+", default=[100000, 1000000], help="Entries"
+    )
+    parser.add_argument("--model", default="conf/modeltest.json", help="Model json")
+    args = parser.parse_args()
+
+    model = Model(args.model)
+    print(
+        "Model {0}: {1} items, {2} listitems".format(
+            model.modelName, len(model.items), len(model.listitems)
+        )
+    )
+    for n_entries in args.n:
+        all_init_items = [make_init_items(model, i) for i in range(n_entries)]
+        print("{0} entries".format(n_entries))
+        results = {}
+        for name, create in [
+            ("LegacyEntry (before)", LegacyEntry),
+            ("DataBaseEntry", DataBaseEntry),
+            (type(model.create_entry(all_init_items[0])).__name__, model.create_entry),
+        ]:
+            results[name] = measure(create, all_init_items)
+            print(
+                "  {0:<20} {1:8.0f} bytes/entry {2:8.2f} s".format(name, *results[name])
+            )
+        before = results["LegacyEntry (before)"][0]
+        for name, (size, _) in list(results.items())[1:]:
+            print("  reduction {0:<20} {1:.1f}x".format(name, before / size))
+        del all_init_items
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Batches of entry modifications that are validated and applied at once by
+DataBase.apply_mutations.
+"""
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mimir.backend.database import DataBase
+    from mimir.backend.entry import EntryBase
+
+logger = logging.getLogger(__name__)
+
+
+class MutationBatch:
+    """
+    Collects modifications of database entries (identified by ID). Used as context
+    manager (see DataBase.batch) all modifications are applied when the with block
+    exits without exception. Otherwise they are discarded.
+
+    Args:
+        database (DataBase) : Database the modifications are applied to
+
+    Attributes:
+        mutations (list) : Tuples of (ID, item name, method, new value, old value).
+                           See DataBase.apply_mutations
+        modified (list) : Entries modified by the last commit
+    """
+
+    def __init__(self, database: "DataBase") -> None:
+        self.database = database
+        self.mutations = []
+        self.modified = []
+
+    def set(self, identifier: str | int, item_name: str, new_value: str) -> None:
+        """Set the value of a Single item"""
+        self.mutations.append((identifier, item_name, "Set", new_value, None))
+
+    def append(self, identifier: str | int, item_name: str, new_value: str) -> None:
+        """Append a value to a ListItem"""
+        self.mutations.append((identifier, item_name, "Append", new_value, None))
+
+    def replace(
+        self, identifier: str | int, item_name: str, new_value: str, old_value: str
+    ) -> None:
+        """Replace old_value with new_value in a ListItem"""
+        self.mutations.append((identifier, item_name, "Replace", new_value, old_value))
+
+    def remove(self, identifier: str | int, item_name: str, old_value: str) -> None:
+        """Remove a value from a ListItem"""
+        self.mutations.append((identifier, item_name, "Remove", None, old_value))
+
+    def commit(self) -> list["EntryBase"]:
+        """
+        Apply all collected modifications and start a new batch
+
+        Returns:
+            list : Modified DataBaseEntry objects
+        """
+        mutations, self.mutations = self.mutations, []
+        self.modified = self.database.apply_mutations(mutations)
+        return self.modified
+
+    def __len__(self) -> int:
+        return len(self.mutations)
+
+    def __enter__(self) -> "MutationBatch":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *args: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            logger.warning("Discarding %s modifications", len(self.mutations))
+            self.mutations = []
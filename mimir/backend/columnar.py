@@ -0,0 +1,283 @@
+"""
+Columnar representation of the entries of a database for analytics (filters,
+sorting and aggregates over all entries). Requires NumPy.
+"""
+import logging
+import operator
+from typing import TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from mimir.backend.database import DataBase
+    from mimir.backend.entry import EntryBase
+
+logger = logging.getLogger(__name__)
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class ColumnarStore:
+    """
+    Column store of the items of all entries of a database. Each column is a NumPy
+    array indexed by the row key of the entries (see EntryStore), so the store is
+    kept up to date by the database with O(1) updates (see DataBase.enable_columns).
+
+    Column types are derived from the itemType in the model:
+
+        - int, float : float64 (NaN for values that are not numbers)
+        - datetime : int64 seconds since epoch (latest date for ListItems)
+        - str : int32 codes of the values in categories (dictionary encoding)
+
+    Args:
+        database (DataBase) : Database of the entries
+        items (list) : Items stored in columns. Defaults to all Single items and
+                       datetime ListItems. ID is always stored
+
+    Raises:
+        RuntimeError : If NumPy is not installed
+        NotImplementedError : For ListItems that are not of type datetime
+
+    Attributes:
+        kinds (dict) : Item -> numeric, datetime or str
+        columns (dict) : Item -> array (indexed by row key)
+        categories (dict) : Item -> list of values (str items)
+        valid (np.ndarray) : False for row keys of removed entries
+    """
+
+    min_capacity = 1024
+
+    def __init__(self, database: "DataBase", items: list[str] | None = None) -> None:
+        if np is None:
+            raise RuntimeError("The columnar store requires numpy")
+        self.database = database
+        model = database.model
+        if items is None:
+            items = list(model.items) + [
+                item
+                for item in model.listitems
+                if model.get_item_type(item) == "datetime"
+            ]
+        items = list(items)
+        if "ID" not in items:
+            items.append("ID")
+        self.kinds = {}
+        for item_name in items:
+            item_type = model.get_item_type(item_name)
+            if item_name in model.listitems and item_type != "datetime":
+                raise NotImplementedError(
+                    "Columns for none datetime listitems not implemented"
+                )
+            if item_type in ("int", "float"):
+                self.kinds[item_name] = "numeric"
+            elif item_type == "datetime":
+                self.kinds[item_name] = "datetime"
+            else:
+                self.kinds[item_name] = "str"
+        self.categories = {}
+        self._category_codes = {}
+        self.columns = {}
+        capacity = max(database.entries.next_key, self.min_capacity)
+        self.valid = np.zeros(capacity, dtype=bool)
+        for item_name, kind in self.kinds.items():
+            self.columns[item_name] = self._new_column(kind, capacity)
+            if kind == "str":
+                self.categories[item_name] = []
+                self._category_codes[item_name] = {}
+        for entry in database.entries:
+            self.add(entry)
+        logger.info(
+            "Built %s columns for %s entries", len(self.columns), len(database.entries)
+        )
+
+    @staticmethod
+    def _new_column(kind: str, capacity: int) -> "np.ndarray":
+        """Helper returning an empty column"""
+        if kind == "numeric":
+            return np.full(capacity, np.nan, dtype=np.float64)
+        if kind == "datetime":
+            return np.zeros(capacity, dtype=np.int64)
+        return np.full(capacity, -1, dtype=np.int32)
+
+    def _ensure_capacity(self, key: int) -> None:
+        """Helper growing all columns (doubling) so key is a valid row"""
+        capacity = len(self.valid)
+        if key < capacity:
+            return
+        new_capacity = max(key + 1, 2 * capacity)
+        valid = np.zeros(new_capacity, dtype=bool)
+        valid[:capacity] = self.valid
+        self.valid = valid
+        for item_name, kind in self.kinds.items():
+            column = self._new_column(kind, new_capacity)
+            column[:capacity] = self.columns[item_name]
+            self.columns[item_name] = column
+
+    def _encode(self, item_name: str, value: str | list[str]) -> float | int:
+        """Helper converting a value to the representation in the column"""
+        kind = self.kinds[item_name]
+        if kind == "numeric":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+        if kind == "datetime":
+            return self.database.model.get_sort_value(item_name, value)
+        codes = self._category_codes[item_name]
+        code = codes.get(value)
+        if code is None:
+            code = len(self.categories[item_name])
+            codes[value] = code
+            self.categories[item_name].append(value)
+        return code
+
+    def add(self, entry: "EntryBase") -> None:
+        """Add an entry to the columns"""
+        self._ensure_capacity(entry.key)
+        self.valid[entry.key] = True
+        for item_name in self.kinds:
+            self.update(entry, item_name)
+
+    def remove(self, entry: "EntryBase") -> None:
+        """Remove an entry from the columns"""
+        self.valid[entry.key] = False
+
+    def update(self, entry: "EntryBase", item_name: str) -> None:
+        """Update the value of item_name of entry (if item_name is a column)"""
+        if item_name in self.kinds:
+            self.columns[item_name][entry.key] = self._encode(
+                item_name, entry.get_item_value(item_name)
+            )
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.valid))
+
+    def keys(self) -> "np.ndarray":
+        """Returns the row keys of all entries"""
+        return np.flatnonzero(self.valid)
+
+    def values(self, item_name: str, mask: "np.ndarray | None" = None) -> "np.ndarray":
+        """
+        Returns the values of item_name for all entries (or the entries in mask) in
+        order of the row keys. Values of str items are decoded.
+        """
+        if mask is None:
+            mask = self.valid
+        values = self.columns[item_name][mask & self.valid]
+        if self.kinds[item_name] == "str":
+            categories = np.array(self.categories[item_name], dtype=object)
+            return categories[values]
+        return values
+
+    def mask(self, item_name: str, op: str, value: str | float) -> "np.ndarray":
+        """
+        Returns a boolean mask (indexed by row key) of the entries for which the
+        value of item_name compared by op (==, !=, <, <=, >, >=) with value is true.
+        Masks can be combined with & and |. Dates can be passed as DD.MM.YY|HH:MM:SS.
+
+        Raises:
+            KeyError : If item_name is not a column or op is invalid
+            NotImplementedError : For order comparisons of str items
+        """
+        if item_name not in self.kinds:
+            raise KeyError("Item {0} is not a column".format(item_name))
+        if op not in _OPERATORS:
+            raise KeyError("Invalid operator {0}".format(op))
+        kind = self.kinds[item_name]
+        if kind == "str":
+            if op not in ("==", "!="):
+                raise NotImplementedError("Only == and != are supported for str items")
+            # -2 is never used as code, so unknown values match nothing
+            value = self._category_codes[item_name].get(value, -2)
+        elif kind == "datetime" and isinstance(value, str):
+            value = self.database.model.get_sort_value(item_name, value)
+        elif kind == "numeric":
+            value = float(value)
+        return _OPERATORS[op](self.columns[item_name], value) & self.valid
+
+    def ids(self, mask: "np.ndarray") -> list[str]:
+        """Returns the IDs of the entries in mask sorted by ID"""
+        keys = np.flatnonzero(mask & self.valid)
+        keys = keys[np.argsort(self.columns["ID"][keys], kind="stable")]
+        return [self.database.entries[int(key)].ID for key in keys]
+
+    def aggregate(
+        self, item_name: str, func: str = "sum", mask: "np.ndarray | None" = None
+    ) -> float:
+        """
+        Aggregate the values of a numeric or datetime item over all entries (or the
+        entries in mask). NaN values are ignored.
+
+        Args:
+            item_name (str) : Item to aggregate
+            func (str) : sum, mean, min, max or std
+            mask (np.ndarray) : Entries to aggregate (see mask)
+        """
+        if self.kinds[item_name] == "str":
+            raise NotImplementedError("Aggregates are not supported for str items")
+        functions = {
+            "sum": np.nansum,
+            "mean": np.nanmean,
+            "min": np.nanmin,
+            "max": np.nanmax,
+            "std": np.nanstd,
+        }
+        if func not in functions:
+            raise KeyError("Invalid aggregate {0}".format(func))
+        return functions[func](self.values(item_name, mask))
+
+    def value_counts(self, item_name: str, mask: "np.ndarray | None" = None) -> dict:
+        """Returns a dict value -> number of entries (or entries in mask)"""
+        if mask is None:
+            mask = self.valid
+        values = self.columns[item_name][mask & self.valid]
+        if self.kinds[item_name] == "str":
+            counts = np.bincount(values, minlength=len(self.categories[item_name]))
+            return {
+                category: int(count)
+                for category, count in zip(self.categories[item_name], counts)
+                if count
+            }
+        unique, counts = np.unique(values, return_counts=True)
+        return {value.item(): int(count) for value, count in zip(unique, counts)}
+
+    def sorted_ids(
+        self,
+        item_name: str,
+        reverse_order: bool = True,
+        limit: int | None = None,
+        mask: "np.ndarray | None" = None,
+    ) -> list[str]:
+        """
+        Returns the IDs of all entries (or the entries in mask) sorted by the values
+        of a numeric or datetime item. Entries with the same value are sorted by ID
+        (ascending) as in DataBase.get_sorted_ids. With limit only the first limit
+        IDs are selected (partial sort).
+        """
+        if self.kinds[item_name] == "str":
+            raise NotImplementedError("Use DataBase.get_sorted_ids for str items")
+        if mask is None:
+            mask = self.valid
+        keys = np.flatnonzero(mask & self.valid)
+        values = self.columns[item_name][keys]
+        if reverse_order:
+            values = -values
+        if limit is not None and limit < len(keys):
+            # Keep all entries with values up to the limit-th value (ties included)
+            threshold = np.partition(values, limit - 1)[limit - 1]
+            selected = values <= threshold
+            keys, values = keys[selected], values[selected]
+        order = np.lexsort((self.columns["ID"][keys], values))
+        if limit is not None:
+            order = order[:limit]
+        return [self.database.entries[int(key)].ID for key in keys[order]]
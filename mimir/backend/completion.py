@@ -0,0 +1,113 @@
+"""
+Prefix index over the Name and Path of the entries for search-as-you-type lookups
+(see DataBase.complete).
+"""
+import bisect
+import logging
+from collections.abc import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """
+    Index of lowercase tokens in a sorted list. All tokens starting with a prefix
+    are a contiguous range found by bisection, so a lookup costs O(log n) plus the
+    number of returned entries. Each token maps to the row keys of the entries
+    containing it (with count) like the inverted index of the database.
+
+    Args:
+        separators (list) : Separators used to split values into tokens (in
+                            addition to whitespace and /)
+
+    Attributes:
+        tokens (list) : Sorted list of all tokens
+        keys (dict) : Token -> key -> count
+    """
+
+    def __init__(self, separators: Iterable[str] = ()) -> None:
+        self.separators = [" ", "/"] + [sep for sep in separators if sep not in " /"]
+        self.tokens = []
+        self.keys = {}
+
+    def tokenize(self, values: Iterable[str]) -> set[str]:
+        """
+        Returns the set of lowercase tokens of the values. Values are split at
+        whitespace, / and the separators. Complete values (e.g. path components)
+        are tokens as well.
+        """
+        tokens = set()
+        for value in values:
+            value = value.lower()
+            parts = value.split("/")
+            tokens.update(parts)
+            for separator in self.separators[1:]:
+                parts = [part for elem in parts for part in elem.split(separator)]
+            tokens.update(parts)
+            tokens.update(part for elem in parts for part in elem.split(" "))
+        tokens.discard("")
+        return tokens
+
+    def add(self, key: int, tokens: Iterable[str]) -> None:
+        """Add the tokens of the entry with row key key"""
+        for token in tokens:
+            keys = self.keys.get(token)
+            if keys is None:
+                keys = self.keys[token] = {}
+                bisect.insort(self.tokens, token)
+            keys[key] = keys.get(key, 0) + 1
+
+    def remove(self, key: int, tokens: Iterable[str]) -> None:
+        """Remove the tokens of the entry with row key key"""
+        for token in tokens:
+            keys = self.keys.get(token)
+            if keys is None or key not in keys:
+                continue
+            keys[key] -= 1
+            if keys[key] == 0:
+                del keys[key]
+                if not keys:
+                    del self.keys[token]
+                    del self.tokens[bisect.bisect_left(self.tokens, token)]
+
+    def iter_tokens(self, prefix: str) -> Iterator[str]:
+        """Iterate all tokens starting with prefix in order"""
+        for i in range(bisect.bisect_left(self.tokens, prefix), len(self.tokens)):
+            token = self.tokens[i]
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[int]:
+        """
+        Returns the row keys of entries with tokens starting with prefix. If prefix
+        contains whitespace, all words have to be matched (as prefix) by an entry.
+        The keys are ordered by the first matching token (of the last word).
+
+        Args:
+            prefix (str) : Start of a token (case insensitive)
+            limit (int) : Maximum number of returned keys
+        """
+        words = prefix.lower().split()
+        if not words:
+            return []
+        required = None
+        for word in words[:-1]:
+            word_keys = set()
+            for token in self.iter_tokens(word):
+                word_keys.update(self.keys[token])
+            required = word_keys if required is None else required & word_keys
+            if not required:
+                return []
+        found = {}
+        for token in self.iter_tokens(words[-1]):
+            for key in self.keys[token]:
+                if required is not None and key not in required:
+                    continue
+                found[key] = None
+                if limit is not None and len(found) >= limit:
+                    return list(found)
+        return list(found)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
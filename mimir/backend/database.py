@@ -1,20 +1,41 @@
 """
 Toplevel Database class for the Mimir database
 """
+import bisect
 import copy
+import heapq
+import itertools
 import json
 import logging
 import os
 import random
-from collections import OrderedDict
-from glob import glob
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, KeysView
 from shutil import copy2
 from typing import List, Set, Union
 
+import mimir.backend.batch
+import mimir.backend.columnar
+import mimir.backend.datecodec
 import mimir.backend.helper
 import mimir.backend.plugin
-from mimir.backend.entry import DataBaseEntry, Item, ListItem
+import mimir.backend.readonly
+import mimir.backend.scanner
+import mimir.backend.watcher
+from mimir.backend.completion import PrefixIndex
+from mimir.backend.entry import (
+    DataBaseEntry,
+    EntryBase,
+    Item,
+    ListItem,
+    make_entry_class,
+)
+from mimir.backend.entrystore import EntryStore
 from mimir.backend.enums import RandomWeightingMethod
+from mimir.backend.hashing import ContentHashes, DataBaseDiff
+from mimir.backend.matcher import PathMatcher
+from mimir.backend.sampler import WeightedSampler
+from mimir.backend.storage import JSONStorage, get_storage_backend
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +58,17 @@ class DataBase:
         status (str) : Initializes a new Database or loads an existing database
                        in root dir
         model (str) : Path to the model used for database initialization
+        storage (str) : Name of the storage backend (json, sqlite). If not set, new
+                        databases use json and loaded databases the backend found
+                        in the .mimir dir
+        progress (callable) : Called as progress(done, total) while loading an
+                              existing database
+        plugin_workers (int) : Number of processes used for running the plugins of
+                               new files. Defaults to the number of CPUs
+        plugin_chunk_size (int) : Number of files send to a plugin process at once
+        plugin_cache (str) : Path to the plugin cache of a previous database. It is
+                             copied to the new database so plugins are not run again
+                             for unchanged files
 
     Raises:
         RuntimeError : Raised if .mimir folder already existis and a new database is
@@ -50,32 +82,94 @@ class DataBase:
         databaseRoot (str) : Points to the root of the database
         mimirdir (str) : Points to the .mimir dir of the DB
         savepath (str) : Points to the path where the database is saved
-        entries (list) : List of all Entry Object in the database
-        entrydict (dict) : Dict of all entries with ids as key
+        storage (StorageBackend) : Backend used for saving and loading
+        scanner (FileScanner) : Scanner for the files matching the model
+        file_keys (dict) : Path -> (device, inode, size) of the file recorded when
+                           the entry was created. Used for detecting moved files
+        plugin_cache (PluginCache) : Cache of plugin values (None for dummy DBs)
+        columns (ColumnarStore) : Columnar representation of the entries kept up to
+                                  date with the entries (None if not enabled, see
+                                  enable_columns)
+        entries (EntryStore) : All Entry objects in the database addressed by their
+                               row key. The keys are used by all internal
+                               structures, so the ID item is only a user-visible
+                               view that can change (or have gaps) without
+                               touching them
+        _index (dict - dict - dict) : Secondary index for all Single items of the
+                                      model. Maps item -> value -> key -> entry
+        _postings (dict - dict - dict) : Inverted index used by query. Maps
+                                         item -> token -> key -> count
         _model (Model) : General information of the database model
         isdummy (bool) : Flag used for dummy databases
                          --> Currently only disables saveing
-        cachedValue (dict - list) : Saved all present Values for item (key)
-        valuesChanged (dict - bool) : Flag if cachedValues are still valid
+        cachedValues (dict - Counter) : Number of entries with a value for each
+                                        item (key). Updated on every change
+        _sort_keys (dict - dict) : Parsed values used by get_sorted_ids (see
+                                   Model.get_sort_value). Maps item -> key -> sort
+                                   value. Items are added on first request and kept
+                                   up to date afterwards
+        _ordered (dict - list) : Ordered index for datetime items. Maps item -> list
+                                 of (sort value, ID, key) in ascending order
+        _samplers (dict) : Weighted samplers used by get_random_entry. Maps weighting
+                           method (None for uniform) -> WeightedSampler
+        _completion (PrefixIndex) : Prefix index over Name and Path used by complete
+                                    (None until first used)
+        hashes (ContentHashes) : Content hashes of all entries and the root hash
+                                 (see get_root_hash)
+        hash_path (str) : Path of the root hash saved next to the database
+        _changed_entries (dict) : Key -> entry for entries modified since the last
+                                  save/load
+        _removed_ids (set) : IDs removed or changed since the last save/load
     """
 
-    def __init__(self, root, status, model_conf=None, dummy=False) -> None:
+    def __init__(
+        self,
+        root: str,
+        status: str,
+        model_conf: str | None = None,
+        dummy: bool = False,
+        storage: str | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        plugin_workers: int | None = None,
+        plugin_chunk_size: int = 16,
+        plugin_cache: str | None = None,
+    ) -> None:
         logger.info("Initializing DataBase")
         self.databaseRoot = root
-        self.entries = []
-        self.entrydict = {}
+        self.entries = EntryStore()
+        self._index = {}
+        self._postings = {}
+        self._sort_keys = {}
+        self._ordered = {}
+        self._completion = None
+        self._samplers = {}
+        self.hashes = ContentHashes()
+        self._changed_entries = {}
+        self._removed_ids = set()
         self.mimirdir = root + "/.mimir"
-        self.savepath = root + "/.mimir/mainDB.json"
+        if status == "new" and storage is None:
+            storage = JSONStorage.name
+        self.storage = get_storage_backend(self.mimirdir, storage)
+        self.savepath = self.storage.savepath
+        self.hash_path = os.path.splitext(self.savepath)[0] + ".hash.json"
         self.maxID = 0
         self.isdummy = False
         self.cachedValues = {}
-        self.cachedValuesChanged = {}
+        self._path_matcher = None
+        self.plugin_workers = plugin_workers
+        self.plugin_chunk_size = plugin_chunk_size
+        self.plugin_cache = None
+        self.scanner = None
+        self.file_keys = {}
+        self._file_keys_changed = False
+        self.columns = None
 
         self.last_executed_ids = mimir.backend.helper.IdQueue(100)
 
         if status == "new":
             self._model = Model(model_conf)
-            self.init_caching()  # initialize cache so self.createEntry works
+            self.init_caching()
+            self.init_index()
             if os.path.exists(self.mimirdir) and not dummy:
                 raise RuntimeError(
                     ".mimir directory exiting in ROOT dir. Currently not supported!"
@@ -86,6 +180,11 @@ class DataBase:
             else:
                 logger.info("Creating .mimir folder in %s", root)
                 os.makedirs(self.mimirdir)
+                if plugin_cache is not None:
+                    copy2(plugin_cache, self.mimirdir + "/plugin_cache")
+                self.plugin_cache = mimir.backend.plugin.PluginCache(
+                    self.mimirdir + "/plugin_cache"
+                )
                 logger.debug("Saving model in .mimir dir")
                 with open(self.mimirdir + "/model.json", "w") as outfile:
                     json.dump(
@@ -95,71 +194,436 @@ class DataBase:
                         indent=4,
                         separators=(",", ": "),
                     )
+            self.scanner = self.init_scanner()
             # New database always runs a search of the filesystem starting from root
             files_found = self.get_all_files_matching_model()
-            for path2file in files_found:
-                logger.debug("Adding file %s", path2file)
-                self.create_new_entry(path2file, self.maxID, skip_caching=True)
-                self.maxID += 1
-            self.maxID = self.maxID - 1
+            self.create_new_entries(
+                [(path2file, c_id) for c_id, path2file in enumerate(files_found)]
+            )
+            self.maxID = len(files_found) - 1
+            if self.plugin_cache is not None and self.model.pluginDefinitions:
+                self.plugin_cache.evict(
+                    [self.databaseRoot + "/" + path for path in files_found]
+                )
         elif status == "load":
             if not os.path.exists(self.mimirdir) and not dummy:
                 raise RuntimeError("No .mimir dir existant in {0}".format(root))
             if dummy:
                 logger.warning("Loading Database from %s as dummy", root)
                 self.isdummy = True
+            else:
+                self.plugin_cache = mimir.backend.plugin.PluginCache(
+                    self.mimirdir + "/plugin_cache"
+                )
             if model_conf is None:
                 self._model = Model(self.mimirdir + "/model.json")
             else:
                 self._model = Model(model_conf)
-            self.load_main()
+            self.scanner = self.init_scanner()
+            self.init_caching()
+            self.init_index()
+            self.load_main(progress)
+            self.load_file_keys()
 
         else:
             raise RuntimeError("Unsupported status: {0}".format(status))
 
-        self.init_caching()  # Set intiial cache with new entries
+    def init_scanner(self) -> mimir.backend.scanner.FileScanner:
+        """
+        Returns the scanner for the files of the database. The directory cache is
+        saved in the .mimir folder (not for dummy databases).
+        """
+        cache_path = None if self.isdummy else self.mimirdir + "/scan_cache.json"
+        return mimir.backend.scanner.FileScanner(
+            self.databaseRoot, self.model.extentions, cache_path
+        )
 
-    def init_caching(self):
+    def init_caching(self) -> None:
+        """(Re)builds the value counts for all items from the current entries"""
         for item in self.model.allItems:
-            self.cachedValuesChanged[item] = True
-            self.cachedValues[item] = self.get_all_value_by_item_name(item)
+            self.cache_all_value_by_item_name(item)
+
+    def init_index(self) -> None:
+        """
+        (Re)builds the secondary index for all Single items defined in the model
+        and the inverted query index for the items in SecondaryDBs from the current
+        entries.
+        """
+        self._index = {item: {} for item in self.model.items}
+        self._postings = {item: {} for item in self.model.secondaryDBs}
+        self._sort_keys = {}
+        self._ordered = {}
+        self._completion = None
+        self._samplers = {}
+        self.hashes = ContentHashes()
+        for entry in self.entries:
+            self.add_to_index(entry)
+
+    def get_postings(self, item_name: str) -> dict[str, dict[int, int]]:
+        """
+        Returns the inverted index (token -> ID -> count) of item item_name. Items
+        that are not in SecondaryDBs are indexed on first request and kept up to date
+        afterwards.
+        """
+        if item_name not in self._postings:
+            postings = {}
+            for entry in self.entries:
+                self._add_postings(
+                    postings, entry.key, self.get_tokens(entry, item_name)
+                )
+            self._postings[item_name] = postings
+        return self._postings[item_name]
+
+    @staticmethod
+    def get_tokens(
+        entry: EntryBase, item_name: str, values: list[str] | None = None
+    ) -> set[str]:
+        """
+        Returns the set of tokens for the values of item_name in the entry (or the
+        passed values). Values with whitespace are split like in query.
+        """
+        if values is None:
+            values = entry.get_item_value(item_name)
+            if not isinstance(values, list):
+                values = [values]
+        tokens = set()
+        for value in values:
+            if " " in value:
+                tokens.update(value.split(" "))
+            else:
+                tokens.add(value)
+        return tokens
+
+    def get_completion_tokens(self, entry: EntryBase) -> set[str]:
+        """Returns the tokens of the Name and Path of entry for the prefix index"""
+        return self._completion.tokenize([entry.Name, entry.Path])
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Returns the IDs of all entries with a word in the Name or a component of the
+        Path starting with prefix (case insensitive). If prefix contains whitespace
+        all words have to match. Use for search-as-you-type lookups. The prefix index
+        is built on the first call and kept up to date afterwards.
+
+        Args:
+            prefix (str) : Start of a word in Name or Path
+            limit (int) : Maximum number of returned IDs
+
+        Returns:
+            list : IDs ordered by the matching word
+        """
+        if self._completion is None:
+            self._completion = PrefixIndex(self.model.separators)
+            for entry in self.entries:
+                self._completion.add(entry.key, self.get_completion_tokens(entry))
+            logger.debug("Built prefix index with %s tokens", len(self._completion))
+        return [
+            self.entries[key].ID for key in self._completion.complete(prefix, limit)
+        ]
+
+    @staticmethod
+    def _add_postings(
+        postings: dict[str, dict[int, int]], key: int, tokens: Iterable[str]
+    ) -> None:
+        for token in tokens:
+            keys = postings.setdefault(token, {})
+            keys[key] = keys.get(key, 0) + 1
+
+    @staticmethod
+    def _remove_postings(
+        postings: dict[str, dict[int, int]], key: int, tokens: Iterable[str]
+    ) -> None:
+        for token in tokens:
+            keys = postings.get(token)
+            if keys is None or key not in keys:
+                continue
+            keys[key] -= 1
+            if keys[key] == 0:
+                del keys[key]
+                if not keys:
+                    del postings[token]
+
+    def add_to_index(self, entry: EntryBase) -> None:
+        """
+        Add an entry to the secondary index and register the database as observer
+        of the entry so the index follows all later value changes.
+        """
+        entry.observer = self.entry_changed
+        self._changed_entries[entry.key] = entry
+        self.hashes.mark(entry)
+        for item_name, counts in self.cachedValues.items():
+            if entry.has_item(item_name):
+                if self._increment_counts(
+                    counts, self._distinct_values(entry, item_name)
+                ):
+                    self._values_changed(item_name)
+        for item_name, index in self._index.items():
+            if entry.has_item(item_name):
+                index.setdefault(entry.get_item_value(item_name), {})[entry.key] = entry
+        for item_name, postings in self._postings.items():
+            self._add_postings(postings, entry.key, self.get_tokens(entry, item_name))
+        for item_name in list(self._sort_keys):
+            self._add_sort_value(entry, item_name)
+        if self._completion is not None:
+            self._completion.add(entry.key, self.get_completion_tokens(entry))
+        for method, sampler in self._samplers.items():
+            sampler.set(entry.key, self.get_random_weight(entry, method))
+        if self.columns is not None:
+            self.columns.add(entry)
+
+    def remove_from_index(self, entry: EntryBase) -> None:
+        """Remove an entry from the secondary index"""
+        entry.observer = None
+        self._changed_entries.pop(entry.key, None)
+        self.hashes.remove(entry.key)
+        self._removed_ids.add(entry.ID)
+        if self.file_keys.pop(entry.Path, None) is not None:
+            self._file_keys_changed = True
+        for item_name, counts in self.cachedValues.items():
+            if entry.has_item(item_name):
+                if self._decrement_counts(
+                    counts, self._distinct_values(entry, item_name)
+                ):
+                    self._values_changed(item_name)
+        for item_name, index in self._index.items():
+            if entry.has_item(item_name):
+                self._remove_from_bucket(index, entry.get_item_value(item_name), entry)
+        for item_name, postings in self._postings.items():
+            self._remove_postings(
+                postings, entry.key, self.get_tokens(entry, item_name)
+            )
+        for item_name in self._sort_keys:
+            self._remove_sort_value(entry, item_name)
+        if self._completion is not None:
+            self._completion.remove(entry.key, self.get_completion_tokens(entry))
+        for sampler in self._samplers.values():
+            sampler.set(entry.key, 0.0)
+        if self.columns is not None:
+            self.columns.remove(entry)
+
+    def entry_changed(
+        self, entry: EntryBase, item_name: str, removed: list[str], added: list[str]
+    ) -> None:
+        """
+        Observer function called by DataBaseEntry after a value has changed
+
+        Args:
+            entry (DataBaseEntry) : Modified entry
+            item_name (str) : Name of the modified item
+            removed (list) : Values removed from the item
+            added (list) : Values added to the item
+        """
+        self._changed_entries[entry.key] = entry
+        self.hashes.mark(entry)
+        if item_name == "ID":
+            self._removed_ids.update(removed)
+        if item_name == "Path":
+            for old_path in removed:
+                file_key = self.file_keys.pop(old_path, None)
+                if file_key is not None:
+                    self.file_keys[entry.Path] = file_key
+                    self._file_keys_changed = True
+        if item_name in self.cachedValues:
+            counts = self.cachedValues[item_name]
+            dropped = self._decrement_counts(counts, removed)
+            if self._increment_counts(counts, added) or dropped:
+                self._values_changed(item_name)
+        if item_name in self._index:
+            index = self._index[item_name]
+            for value in removed:
+                self._remove_from_bucket(index, value, entry)
+            for value in added:
+                index.setdefault(value, {})[entry.key] = entry
+        if item_name in self._sort_keys:
+            self._remove_sort_value(entry, item_name)
+            self._add_sort_value(entry, item_name)
+        if self.columns is not None:
+            self.columns.update(entry, item_name)
+        if self._completion is not None and item_name in ("Name", "Path"):
+            new_tokens = self.get_completion_tokens(entry)
+            other = "Path" if item_name == "Name" else "Name"
+            old_tokens = self._completion.tokenize(
+                [*removed, entry.get_item_value(other)]
+            )
+            self._completion.remove(entry.key, old_tokens - new_tokens)
+            self._completion.add(entry.key, new_tokens - old_tokens)
+        if item_name == "Opened":
+            for method, sampler in self._samplers.items():
+                sampler.set(entry.key, self.get_random_weight(entry, method))
+        if item_name == "ID":
+            # The ordered indexes use the ID for sorting entries with equal values
+            for ordered_item in list(self._ordered):
+                self._remove_sort_value(entry, ordered_item, removed[0])
+                self._add_sort_value(entry, ordered_item)
+        if item_name in self._postings:
+            postings = self._postings[item_name]
+            new_tokens = self.get_tokens(entry, item_name)
+            current = entry.get_item_value(item_name)
+            if not isinstance(current, list):
+                current = [current]
+            old_tokens = self.get_tokens(
+                entry, item_name, [v for v in current if v not in added] + removed
+            )
+            self._remove_postings(postings, entry.key, old_tokens - new_tokens)
+            self._add_postings(postings, entry.key, new_tokens - old_tokens)
+
+    @staticmethod
+    def _distinct_values(entry: EntryBase, item_name: str) -> set[str]:
+        """Returns the distinct values of item_name in entry"""
+        value = entry.get_item_value(item_name)
+        if isinstance(value, list):
+            return set(value)
+        return {value}
+
+    @staticmethod
+    def _increment_counts(counts: Counter, values: Iterable[str]) -> bool:
+        """Helper incrementing the counts of values. Returns True if a value is new"""
+        new_value = False
+        for value in values:
+            if value not in counts:
+                new_value = True
+            counts[value] += 1
+        return new_value
+
+    @staticmethod
+    def _decrement_counts(counts: Counter, values: Iterable[str]) -> bool:
+        """
+        Helper decrementing the counts of values and dropping unused values. Returns
+        True if a value was dropped
+        """
+        dropped = False
+        for value in values:
+            if value not in counts:
+                continue
+            counts[value] -= 1
+            if counts[value] <= 0:
+                del counts[value]
+                dropped = True
+        return dropped
+
+    def _values_changed(self, item_name: str) -> None:
+        """Helper invalidating the structures built from the values of item_name"""
+        if item_name in self.model.secondaryDBs:
+            self._path_matcher = None
+
+    @staticmethod
+    def _remove_from_bucket(index: dict, value: str, entry: EntryBase) -> None:
+        """Helper removing a entry (by key) from the bucket of value in index"""
+        bucket = index.get(value)
+        if bucket is None:
+            return
+        bucket.pop(entry.key, None)
+        if not bucket:
+            del index[value]
 
     @property
-    def model(self):
+    def model(self) -> "Model":
         """Returns the model variable"""
         return self._model
 
-    def get_all_files_matching_model(self, start_dir="") -> list[str]:
+    def enable_columns(
+        self, items: list[str] | None = None
+    ) -> mimir.backend.columnar.ColumnarStore:
+        """
+        Build a columnar representation of the entries (requires NumPy) that is kept
+        up to date on all changes. See mimir.backend.columnar.ColumnarStore.
+
+        Args:
+            items (list) : Items stored in columns. Defaults to all Single items and
+                           datetime ListItems
+
+        Returns:
+            ColumnarStore : The columns (also set as columns attribute)
+        """
+        self.columns = mimir.backend.columnar.ColumnarStore(self, items)
+        return self.columns
+
+    def disable_columns(self) -> None:
+        """Stop maintaining the columnar representation of the entries"""
+        self.columns = None
+
+    def get_all_files_matching_model(self, start_dir: str = "") -> list[str]:
         """
         Returns all files matching the file extentions defined in model starting
         from database root dir.
         Returns list with all matching file w/o database root dir
         """
-        if not start_dir.endswith("/") and start_dir != "":
-            start_dir = start_dir + "/"
-        allfiles = glob(self.databaseRoot + "/" + start_dir + "**/*.*", recursive=True)
-        logger.debug("All files from glob: %s", len(allfiles))
-        matchingfiles = []
-        matchingfiles_full = []
-        for f in allfiles:
-            for ext in self.model.extentions:
-                if f.endswith(ext):
-                    matchingfiles.append(f.replace(self.databaseRoot + "/", ""))
-                    logger.debug("Found file %s", f)
-                    matchingfiles_full.append(f)
-                    continue
-        if len(allfiles) > len(matchingfiles_full):
-            for f in set(allfiles).difference(set(matchingfiles_full)):
-                logger.debug("Removed file %s", f)
-        logger.debug("Matching files: %s", len(matchingfiles))
-        return matchingfiles
+        return self.scanner.scan(start_dir)
+
+    def watch(self, **kwargs: object) -> mimir.backend.watcher.DataBaseWatcher:
+        """
+        Returns a DataBaseWatcher keeping the database up to date with the
+        filesystem. See mimir.backend.watcher.DataBaseWatcher for the arguments.
+        """
+        return mimir.backend.watcher.DataBaseWatcher(self, **kwargs)
 
-    def create_new_entry(self, path, c_id, skip_caching=False):
+    def get_paths_below(self, directory: str) -> list[str]:
+        """
+        Returns the paths of all entries in directory (relative to the database
+        root) and its subdirectories. Only the Path index is searched, not the
+        filesystem.
+        """
+        directory = directory.strip("/")
+        if not directory:
+            return list(self._index["Path"])
+        prefix = directory + "/"
+        return [path for path in self._index["Path"] if path.startswith(prefix)]
+
+    def _get_files(self, start_dir: str, files: list[str] | None) -> list[str]:
+        """Returns files if passed or scans the filesystem"""
+        if files is None:
+            return self.get_all_files_matching_model(start_dir)
+        return files
+
+    def create_new_entries(self, pairs: list[tuple[str, int]]) -> list[EntryBase]:
+        """
+        Create entries for multiple files. The plugins of the model are run for all
+        files in parallel (see plugin_workers, plugin_chunk_size) and the entries are
+        created in order of their IDs. Entries for files where the plugins fail are
+        created with the default values.
+
+        Args:
+            pairs (list) : List of tuples with path and ID of the new entries
+
+        Return:
+            list of new DataBaseEntry objects
+        """
+        pairs = sorted(pairs, key=lambda pair: int(pair[1]))
+        if self.model.pluginDefinitions:
+            all_plugin_values = mimir.backend.plugin.getPluginValues_parallel(
+                [self.databaseRoot + "/" + path for path, _ in pairs],
+                self.model.pluginDefinitions,
+                workers=self.plugin_workers,
+                chunk_size=self.plugin_chunk_size,
+                cache=self.plugin_cache,
+            )
+            if self.plugin_cache is not None:
+                logger.info(
+                    "Plugin cache hits: %s, misses: %s",
+                    self.plugin_cache.hits,
+                    self.plugin_cache.misses,
+                )
+        else:
+            all_plugin_values = [{}] * len(pairs)
+        new_entries = []
+        for (path, c_id), plugin_values in zip(pairs, all_plugin_values):
+            if plugin_values is None:
+                logger.warning("Using default values for plugins of %s", path)
+                plugin_values = {}
+            new_entries.append(self.create_new_entry(path, c_id, plugin_values))
+        return new_entries
+
+    def create_new_entry(
+        self, path: str, c_id: int, plugin_values: dict | None = None
+    ) -> EntryBase:
         """Create an entry for a file with path and ID.
         Called for each file that is found on filesystem
         Args:
             path (str) : Path to file added to DB on filesystem\n
             cID (int) : ID that is used for this entry
+            plugin_values (dict) : Values of the plugins (see
+                                   plugin.getPluginValues). If None the plugins are
+                                   run for the file
 
         Return:
             new DataBaseEntry object
@@ -190,9 +654,12 @@ class DataBase:
 
         # If items with for plugins are degined run the pluging functions
         if self.model.pluginDefinitions:
-            plugin_values = mimir.backend.plugin.getPluginValues(
-                self.databaseRoot + "/" + path, self.model.pluginDefinitions
-            )
+            if plugin_values is None:
+                plugin_values = mimir.backend.plugin.getPluginValues(
+                    self.databaseRoot + "/" + path,
+                    self.model.pluginDefinitions,
+                    cache=self.plugin_cache,
+                )
             for plugin in plugin_values:
                 e_type, e_value = entryinit[self.model.pluginMap[plugin]]
                 entryinit[self.model.pluginMap[plugin]] = (
@@ -204,79 +671,153 @@ class DataBase:
         for entry in entryinit:
             _entryinit.append((entry, entryinit[entry][0], entryinit[entry][1]))
 
-        e = DataBaseEntry(_entryinit)
-        if not skip_caching:
-            self.cachedValuesChanged["ID"] = True
-        self.entries.append(e)
-        self.entrydict[str(c_id)] = e
+        e = self.model.create_entry(_entryinit)
+        self.entries.add(e)
+        self.add_to_index(e)
+        self.record_file_key(path)
         return e
 
-    def save_main(self):
+    def record_file_key(self, path: str) -> None:
+        """Save device, inode and size of the file of the entry with path"""
+        file_key = mimir.backend.scanner.get_file_key(self.databaseRoot + "/" + path)
+        if file_key is not None:
+            self.file_keys[path] = file_key
+            self._file_keys_changed = True
+
+    def save_file_keys(self) -> None:
+        """Save file_keys as file_keys.json in the .mimir folder if changed"""
+        if not self._file_keys_changed:
+            return
+        file_keys_path = self.mimirdir + "/file_keys.json"
+        with open(file_keys_path + ".tmp", "w") as outfile:
+            json.dump(self.file_keys, outfile)
+        os.replace(file_keys_path + ".tmp", file_keys_path)
+        self._file_keys_changed = False
+
+    def load_file_keys(self) -> None:
+        """Load file_keys from the .mimir folder (only for paths in the database)"""
+        file_keys_path = self.mimirdir + "/file_keys.json"
+        if not os.path.exists(file_keys_path):
+            return
+        with open(file_keys_path) as infile:
+            saved_file_keys = json.load(infile)
+        paths = self._index["Path"]
+        self.file_keys = {
+            path: tuple(file_key)
+            for path, file_key in saved_file_keys.items()
+            if path in paths
+        }
+
+    def save_main(self) -> bool:
         """
-        Save the main database (json file with all entries)
-        as mainDB.json in the .mimir folder of the DB.
-        Before saving it will create a backup of the current
-        state. Backups are save for days. Will overwrite if already
-        present.
+        Save the main database with the storage backend of the database (by default
+        as mainDB.json in the .mimir folder of the DB). Before saving it will create
+        a backup of the current state. Backups are save for days. Will overwrite if
+        already present.
         """
         if self.isdummy:
             logger.error("Database isDummy - Saving disabled")
             return False
-        status = False
-        # Copy current DBfile and save it as backup
-        if os.path.exists(self.savepath):
-            logger.debug("Making backup")
-            backup_date = mimir.backend.helper.getTimeFormatted(
-                "Date", "-", inverted=True
-            )
-            copy2(
-                self.savepath,
-                self.savepath.replace(".json", ".{0}.backup".format(backup_date)),
-            )
-        # Convert database to dict so json save can be used
-        output = OrderedDict()
-        for entry in self.entries:
-            output.update({entry.Path: entry.getDictRepr()})
-        logger.debug("Saving database at %s", self.savepath)
-        with open(self.savepath, "w") as outfile:
-            json.dump(output, outfile, indent=4)
-            status = True
+        current_ids = self._index["ID"].keys()
+        status = self.storage.save(
+            self.entries,
+            changed_entries=list(self._changed_entries.values()),
+            removed_ids={i for i in self._removed_ids if i not in current_ids},
+        )
+        if status:
+            self.clear_changes()
+            self.save_file_keys()
+            self.save_root_hash()
         return status
 
-    def load_main(self):
-        """Load the main DB from the .mimir folder"""
-        with open(self.savepath) as save_file:
-            saved_db = json.load(save_file)
-        for filepath in saved_db:
-            saved_entry = saved_db[filepath]
-            entryinit = []
-            for item in saved_entry:
-                if not (item in self.model.items or item in self.model.listitems):
-                    logger.warning(
-                        "Found item in saved json not in model. Item will be ignored"
-                    )
-                    logger.warning(
-                        "Currently this will result in loss of data when saving"
-                    )
-                    continue
-                entryinit.append(
-                    (item, saved_entry[item]["type"], saved_entry[item]["value"])
-                )
-            e = DataBaseEntry(entryinit)
-            self.entries.append(e)
+    def compact(self) -> bool:
+        """
+        Write the full database with the storage backend. For the default json
+        backend this folds the journal into mainDB.json.
+        """
+        if self.isdummy:
+            logger.error("Database isDummy - Saving disabled")
+            return False
+        status = self.storage.compact(self.entries)
+        if status:
+            self.clear_changes()
+            self.save_file_keys()
+            self.save_root_hash()
+        return status
+
+    def get_root_hash(self) -> str:
+        """
+        Returns the root hash (hex) of the content of all entries. Databases with
+        equal entries have the same root hash independent of the order of entries.
+        """
+        return self.hashes.root_hash()
+
+    def save_root_hash(self) -> None:
+        """
+        Save the root hash and the number of entries next to the saved database
+        together with the stamp of the saved files (see StorageBackend.get_stamp)
+        """
+        with open(self.hash_path + ".tmp", "w") as outfile:
+            json.dump(
+                {
+                    "root": self.get_root_hash(),
+                    "entries": len(self.entries),
+                    "stamp": self.storage.get_stamp(),
+                },
+                outfile,
+            )
+        os.replace(self.hash_path + ".tmp", self.hash_path)
+
+    def load_root_hash(self) -> tuple[str, int] | None:
+        """
+        Returns the saved root hash and number of entries as tuple. Returns None if
+        no hash is saved or the saved database was changed after the hash was saved.
+        """
+        if not os.path.exists(self.hash_path):
+            return None
+        with open(self.hash_path) as infile:
+            saved = json.load(infile)
+        if saved["stamp"] != self.storage.get_stamp():
+            logger.info("Ignoring outdated root hash %s", self.hash_path)
+            return None
+        return saved["root"], saved["entries"]
+
+    def clear_changes(self) -> None:
+        """Reset the tracking of entries modified since the last save/load"""
+        self._changed_entries = {}
+        self._removed_ids = set()
+
+    def load_main(self, progress: Callable[[int, int], None] | None = None) -> None:
+        """
+        Load the main DB from the .mimir folder. Entries are created while the
+        saved database is read.
+
+        Args:
+            progress (callable) : Called as progress(done, total) during loading (see
+                                  StorageBackend.load)
+        """
+        for saved_entry in self.storage.load(progress=progress):
+            e = self.model.entry_from_dict(saved_entry)
+            self.entries.add(e)
+            self.add_to_index(e)
             self.maxID += 1
-            self.entrydict[saved_entry["ID"]["value"]] = e
         self.maxID -= 1
+        self.clear_changes()
+        logger.info("Loaded %s entries", len(self.entries))
 
-    def find_new_files(self, start_dir=""):
+    def find_new_files(
+        self, start_dir: str = "", files: list[str] | None = None
+    ) -> tuple[list[str], list[tuple[str, int]]]:
         """
         Find new files in starting from the root directory.
 
         Args:
             startdir (str) : Specifiy a subdirectory to start from
+            files (list) : Result of get_all_files_matching_model. If passed, the
+                           filesystem is not scanned again
         """
         new_files = []
-        allfiles = self.get_all_files_matching_model(start_dir)
+        allfiles = self._get_files(start_dir, files)
         ids = []
         existing_files = []
         missing_ids = []
@@ -310,54 +851,153 @@ class DataBase:
             else:
                 self.maxID += 1
                 cid = self.maxID
-            self.create_new_entry(new_file, cid)
             pairs.append((new_file, cid))
+        self.create_new_entries(pairs)
 
         return toret, pairs
 
-    def check_changed_paths(self, start_dir=""):
+    def check_changed_paths(
+        self, start_dir: str = "", files: list[str] | None = None
+    ) -> list[tuple[str, str, str]]:
+        """
+        Function that finds if files changed their path (see detect_moves) and
+        updates the Path of the entries.
+
+        Args:
+            startdir (str) : Specifiy a subdirectory to start from
+            files (list) : Result of get_all_files_matching_model. If passed, the
+                           filesystem is not scanned again
+
+        Returns:
+            list : Tuples of (ID, old path, new path) for all updated entries
         """
-        Function that finds if files changed their path
+        return self.apply_moves(self.detect_moves(start_dir, files))
+
+    def detect_moves(
+        self, start_dir: str = "", files: list[str] | None = None
+    ) -> list[tuple[EntryBase, str]]:
         """
-        existing_files = []
-        existing_files_names = []
-        allfiles = self.get_all_files_matching_model(start_dir)
-        nameids = {}
-        for entry in self.entries:
-            existing_files.append(entry.Path)
-            existing_files_names.append(entry.Path.split("/")[-1])
-            nameids[entry.Path.split("/")[-1]] = entry.ID
+        Find entries whose file was moved. New files on the filesystem are matched
+        with entries whose file is missing by device, inode and size (see
+        file_keys). Entries without matching inode (e.g. moved to another device or
+        created before the inodes were recorded) are matched by file name if the
+        name is unique. Renamed files and moved directories are found that way.
 
+        Args:
+            startdir (str) : Specifiy a subdirectory to start from
+            files (list) : Result of get_all_files_matching_model. If passed, the
+                           filesystem is not scanned again
+
+        Returns:
+            list : Tuples of (DataBaseEntry, new path)
+        """
+        allfiles = self._get_files(start_dir, files)
+        fs_files = set(allfiles)
+        existing_files = self._index["Path"]
+        new_files = [file_ for file_ in allfiles if file_ not in existing_files]
+        missing_entries = [e for e in self.entries if e.Path not in fs_files]
         logger.debug(
-            "Found %s files in FS. Entries in database: %s",
-            len(allfiles),
-            len(existing_files),
+            "Found %s new files and %s entries with missing files",
+            len(new_files),
+            len(missing_entries),
         )
+        return self.match_moves(new_files, missing_entries)
 
-        changed_files = []
-        changed_file_paths = {}
-        for file_ in allfiles:
-            if file_ not in existing_files:
-                changed_files.append(file_)
-                changed_file_paths[file_.split("/")[-1]] = file_
+    def match_moves(
+        self, new_files: list[str], missing_entries: list[EntryBase]
+    ) -> list[tuple[EntryBase, str]]:
+        """
+        Match files that are not in the database with entries whose file is missing
+        (see detect_moves)
 
-        updated_files = []
-        for file_ in changed_files:
-            name_ = file_.split("/")[-1]
-            if name_ in existing_files_names:
-                this_id = nameids[name_]
-                this_entry = self.get_entry_by_item_name("ID", this_id)[0]
-                old_path = this_entry.Path
-                logger.info(
-                    "Updated path of entry %s to %s", this_id, changed_file_paths[name_]
+        Args:
+            new_files (list) : Paths of files without entry
+            missing_entries (list) : DataBaseEntry objects whose file is missing
+
+        Returns:
+            list : Tuples of (DataBaseEntry, new path)
+        """
+        if not new_files or not missing_entries:
+            return []
+
+        moves = []
+        missing_by_key = {}
+        for entry in missing_entries:
+            file_key = self.file_keys.get(entry.Path)
+            if file_key is not None:
+                missing_by_key[tuple(file_key)] = entry
+        unmatched_files = {}
+        for file_ in new_files:
+            file_key = mimir.backend.scanner.get_file_key(
+                self.databaseRoot + "/" + file_
+            )
+            entry = None
+            if file_key is not None:
+                entry = missing_by_key.pop(file_key, None)
+            if entry is None:
+                unmatched_files[file_] = file_key
+            else:
+                moves.append((entry, file_))
+
+        # Fall back to unique file names
+        moved_entries = {entry.key for entry, _ in moves}
+        files_by_name = {}
+        for file_ in unmatched_files:
+            files_by_name.setdefault(file_.split("/")[-1], []).append(file_)
+        entries_by_name = {}
+        for entry in missing_entries:
+            if entry.key not in moved_entries:
+                entries_by_name.setdefault(entry.Path.split("/")[-1], []).append(entry)
+        for name_, name_entries in entries_by_name.items():
+            name_files = files_by_name.get(name_, [])
+            if not name_files:
+                continue
+            if len(name_entries) > 1 or len(name_files) > 1:
+                logger.warning(
+                    "Can not match moved files with name %s. Name is not unique", name_
                 )
-                this_entry.change_item_value("Path", changed_file_paths[name_])
-                updated_files.append((this_id, old_path, changed_file_paths[name_]))
+                continue
+            entry, file_ = name_entries[0], name_files[0]
+            old_key = self.file_keys.get(entry.Path)
+            new_key = unmatched_files[file_]
+            if old_key is not None and new_key is not None and old_key[2] != new_key[2]:
+                continue
+            moves.append((entry, file_))
+        return moves
+
+    def apply_moves(
+        self, moves: list[tuple[EntryBase, str]]
+    ) -> list[tuple[str, str, str]]:
+        """
+        Update the Path of moved entries
+
+        Args:
+            moves (list) : Tuples of (DataBaseEntry, new path) (see detect_moves)
 
+        Returns:
+            list : Tuples of (ID, old path, new path)
+        """
+        updated_files = []
+        for entry, new_path in moves:
+            old_path = entry.Path
+            logger.info("Updated path of entry %s to %s", entry.ID, new_path)
+            entry.change_item_value("Path", new_path)
+            self.record_file_key(new_path)
+            updated_files.append((entry.ID, old_path, new_path))
         return updated_files
 
-    def get_missing_files(self, start_dir=""):
-        allfiles = self.get_all_files_matching_model(start_dir)
+    def get_missing_files(
+        self, start_dir: str = "", files: list[str] | None = None
+    ) -> list[str]:
+        """
+        Returns the paths of all entries whose file is missing on the filesystem
+
+        Args:
+            startdir (str) : Specifiy a subdirectory to start from
+            files (list) : Result of get_all_files_matching_model. If passed, the
+                           filesystem is not scanned again
+        """
+        allfiles = self._get_files(start_dir, files)
         nameids = {}
         existing_files = []
         existing_files_names = []
@@ -373,14 +1013,16 @@ class DataBase:
         )
 
         missing_files = []
-        if len(allfiles) != len(existing_files):
-            for file_ in existing_files:
-                if file_ not in allfiles:
-                    missing_files.append(file_)
+        allfiles = set(allfiles)
+        for file_ in existing_files:
+            if file_ not in allfiles:
+                missing_files.append(file_)
 
         return missing_files
 
-    def check_missing_files(self, start_dir="", mod_id=True):
+    def check_missing_files(
+        self, start_dir: str = "", mod_id: bool = True, files: list[str] | None = None
+    ) -> list[tuple[str, str]]:
         """
         This function compares the files on the filesystem (from the db rootdir) to the
         existing path in the database. If one is missing, the Entry is deleted and the
@@ -389,61 +1031,176 @@ class DataBase:
         NOTE: This does not ask for permission! But the backup funcitonality on saving
         should help with accidents....
         """
-        missing_files = self.get_missing_files(start_dir)
+        missing_files = self.get_missing_files(start_dir, files)
         logger.debug("Missing files: %s", missing_files)
         id_changes = []
         if missing_files:
-            for missing_file in missing_files:
-                missing_id = (
-                    self.get_entry_by_item_name("Path", missing_file)[0]
-                    .get_item("ID")
-                    .value
-                )
-                self.remove(missing_id, by_id=True)
-                if mod_id:
-                    self.modify_single_entry(self.maxID, "ID", missing_id, by_id=True)
-                    id_changes.append((self.maxID, missing_id))
-                    logger.info("Change ID of entry %s to %s", self.maxID, missing_id)
-                    self.maxID -= 1
+            missing_ids = [
+                self.get_entry_by_item_name("Path", missing_file)[0].ID
+                for missing_file in missing_files
+            ]
+            self.remove_many(missing_ids)
+            if mod_id:
+                id_changes = self.fill_free_ids(missing_ids)
 
         return id_changes
 
-    def reset_entry_ids(self):
-        i_id = 0
-        for entry_id in [e.ID for e in self.entries]:
-            logger.debug("Change ID of entry %s to %s", entry_id, i_id)
-            self.modify_single_entry(entry_id, "ID", str(i_id), by_id=True)
-            i_id += 1
+    def fill_free_ids(self, free_ids: list[str | int]) -> list[tuple[str, str]]:
+        """
+        Move the entries with the highest IDs in the places of removed entries
+
+        Args:
+            free_ids (list) : IDs of removed entries
 
-    def get_all_value_by_item_name(self, item_name):
-        """Return a set of all values of name itemName"""
+        Returns:
+            list : Tuples of (old ID, new ID) of the renumbered entries
+        """
+        n_entries = len(self.entries)
+        free_ids = [i for i in free_ids if int(i) < n_entries]
+        moved_ids = sorted(
+            (int(e.ID) for e in self.entries if int(e.ID) >= n_entries),
+            reverse=True,
+        )
+        id_changes = list(zip(moved_ids, free_ids))
+        for old_id, new_id in id_changes:
+            logger.info("Change ID of entry %s to %s", old_id, new_id)
+        self.renumber(dict(id_changes))
+        return id_changes
+
+    def reset_entry_ids(self) -> None:
+        """Set the IDs of the entries to 0..n-1 in the order of the entries"""
+        self.renumber(
+            {
+                entry.ID: str(i_id)
+                for i_id, entry in enumerate(self.entries)
+                if entry.ID != str(i_id)
+            }
+        )
+
+    def compact_ids(self) -> list[tuple[str, str]]:
+        """
+        Close the gaps in the IDs left by removed entries. The order of the IDs is
+        kept. Nothing is changed if the IDs are already 0..n-1, so this can be
+        called lazily (e.g. before saving or displaying IDs).
+
+        Returns:
+            list : Tuples of (old ID, new ID) of the renumbered entries
+        """
+        ids = sorted(int(entry_id) for entry_id in self._index["ID"])
+        if not ids or ids[-1] == len(ids) - 1:
+            return []
+        id_changes = [
+            (str(old_id), str(new_id))
+            for new_id, old_id in enumerate(ids)
+            if old_id != new_id
+        ]
+        self.renumber(dict(id_changes))
+        return id_changes
+
+    def remove_many(self, ids: Iterable[str | int]) -> list[EntryBase]:
+        """
+        Remove multiple entries by ID. The entries are taken out of the entry store
+        and the indexes by their key. IDs of the other entries are not changed (see
+        renumber). maxID is updated if the entry with the highest ID is removed.
+
+        Args:
+            ids (list) : IDs (str or int) of the entries to remove
+
+        Returns:
+            list : Removed DataBaseEntry objects
+
+        Raises:
+            IndexError : If an ID is not in the database
+        """
+        removed = {}
+        for entry_id in ids:
+            entries = self._index["ID"].get(str(entry_id))
+            if not entries:
+                raise IndexError("Index {0} is out of range of DB".format(entry_id))
+            for entry in entries.values():
+                removed[entry.key] = entry
+        for entry in removed.values():
+            self.remove_from_index(entry)
+            self.entries.remove(entry)
+        if any(int(entry.ID) >= self.maxID for entry in removed.values()):
+            self.maxID = max((int(i) for i in self._index["ID"]), default=-1)
+        logger.debug("Removed %s entries", len(removed))
+        return list(removed.values())
+
+    def renumber(self, mapping: dict[str | int, str | int]) -> None:
+        """
+        Change the IDs of multiple entries at once. In contrast to modifying the ID
+        with modify_single_entry, the Changed item of the entries is not updated.
+
+        Args:
+            mapping (dict) : Old ID -> new ID (str or int). IDs of entries not in
+                             mapping are kept
+
+        Raises:
+            IndexError : If an old ID is not in the database
+            RuntimeError : If the IDs are not unique after renumbering
+        """
+        mapping = {str(old): str(new) for old, new in mapping.items()}
+        ids = self._index["ID"]
+        for old_id in mapping:
+            if old_id not in ids:
+                raise IndexError("Index {0} is out of range of DB".format(old_id))
+        kept_ids = {i for i in ids if i not in mapping}
+        new_ids = set(mapping.values())
+        if len(new_ids) != len(mapping) or not kept_ids.isdisjoint(new_ids):
+            raise RuntimeError("IDs are not unique after renumbering")
+        renumbered = [
+            (self.get_entry_by_id(old_id), new_id) for old_id, new_id in mapping.items()
+        ]
+        for entry, new_id in renumbered:
+            entry.change_item_value("ID", new_id)
+        self.maxID = max((int(e.ID) for e in self.entries), default=-1)
+
+    def get_all_value_by_item_name(self, item_name: str) -> KeysView[str]:
+        """
+        Return a set of all values of name itemName. The returned object is a
+        (set-like) view on the value counts and always up to date.
+        """
         if item_name not in self.model.allItems:
             raise KeyError("Arg {0} not in model items".format(item_name))
-        if self.cachedValuesChanged[item_name]:
-            self.cache_all_value_by_item_name(item_name)
-        return self.cachedValues[item_name]
+        return self.cachedValues[item_name].keys()
 
-    def cache_all_value_by_item_name(self, item_name):
+    def get_value_counts(self, item_name: str) -> Counter:
         """
-        Function for filling the cached Value objects of the database
+        Return a Counter with the number of entries that have a value for item
+        itemName
         """
-        retlist = []
-        for entry in self.entries:
-            to_add = getattr(entry, item_name)
-            if isinstance(to_add, list):
-                retlist += to_add
-            else:
-                retlist.append(to_add)
-        self.cachedValuesChanged[item_name] = False
-        self.cachedValues[item_name] = set(retlist)
+        if item_name not in self.model.allItems:
+            raise KeyError("Arg {0} not in model items".format(item_name))
+        return Counter(self.cachedValues[item_name])
 
-    def get_sorted_ids(self, sort_by, reverse_order=True):
+    def cache_all_value_by_item_name(self, item_name: str) -> None:
+        """
+        Function for (re)building the cached value counts of the database from all
+        entries. This is only necessary if the entries were modified without the
+        database being notified.
         """
-        Returns a list of database ids sorted by itemName sortBy.
+        counts = Counter()
+        for entry in self.entries:
+            if entry.has_item(item_name):
+                counts.update(self._distinct_values(entry, item_name))
+        self.cachedValues[item_name] = counts
+        self._values_changed(item_name)
+
+    def get_sorted_ids(
+        self, sort_by: str, reverse_order: bool = True, limit: int | None = None
+    ) -> list[str]:
+        """
+        Returns a list of database ids sorted by itemName sortBy. Entries with the
+        same value are sorted by ID (ascending). The parsed values are cached (see
+        get_sort_keys). Datetime items are read from an ordered index and for other
+        items only the first limit IDs are selected (heap based).
 
         Args:
             sortBy (str) : itemName that will be used for sorting. The exact sorting \n
                            depends on the type set in the model (str, int, datetime)
+            reverse_order (bool) : Sort descending
+            limit (int) : Only return the first limit IDs. All if None
         Return:
             sortedEntries (list[str]) : List of all id sorted by sortBy newValue
 
@@ -452,59 +1209,117 @@ class DataBase:
         """
         if sort_by not in self.model.allItems:
             raise KeyError("Arg {0} not in model items".format(sort_by))
-        all_ids = self.get_all_value_by_item_name("ID")
-        map_id_sortby = {}
-        for this_id in all_ids:
-            map_id_sortby[this_id] = (
-                self.get_entry_by_id(this_id).get_item(sort_by).value
-            )
-        item_type = self.model.get_item_type(sort_by)
-        # If sortBy is a ListItem we need to figure out the value to sort by
-        if sort_by in self.model.listitems:
-            for this_id in map_id_sortby:
-                if item_type == "datetime":
-                    map_id_sortby[this_id] = mimir.backend.helper.sortDateTime(
-                        map_id_sortby[this_id]
-                    )[0]
-                else:
-                    # TODO: Think about a way to sort ListItems of type str/int
-                    raise NotImplementedError(
-                        "Sorting for none datetime listitems not implemented"
-                    )
+        sort_keys = self.get_sort_keys(sort_by)
+        if sort_by in self._ordered:
+            if reverse_order:
+                ordered = self._iter_ordered_reversed(self._ordered[sort_by])
+            else:
+                ordered = iter(self._ordered[sort_by])
+            if limit is not None:
+                ordered = itertools.islice(ordered, limit)
+            return [self.entries[key].ID for _, _, key in ordered]
+
+        ids = self.get_sort_keys("ID")
+        if reverse_order:
+            sort_key = lambda key: (sort_keys[key], -ids[key])
+        else:
+            sort_key = lambda key: (sort_keys[key], ids[key])
+        if limit is None:
+            sorted_keys = sorted(sort_keys, key=sort_key, reverse=reverse_order)
+        elif reverse_order:
+            sorted_keys = heapq.nlargest(limit, sort_keys, key=sort_key)
+        else:
+            sorted_keys = heapq.nsmallest(limit, sort_keys, key=sort_key)
+        return [self.entries[key].ID for key in sorted_keys]
 
-        pairs = []
-        for this_id in map_id_sortby:
-            pairs.append((this_id, map_id_sortby[this_id]))
+    @staticmethod
+    def _iter_ordered_reversed(ordered: list[tuple]) -> Iterator[tuple]:
+        """
+        Helper iterating over an ordered index in descending order of the values
+        with entries of equal value in ascending order of the IDs
+        """
+        i_end = len(ordered)
+        while i_end > 0:
+            i_start = i_end - 1
+            value = ordered[i_start][0]
+            while i_start > 0 and ordered[i_start - 1][0] == value:
+                i_start -= 1
+            yield from ordered[i_start:i_end]
+            i_end = i_start
+
+    def get_sort_keys(self, item_name: str) -> dict[int, str | int | float]:
+        """
+        Returns the sort values (key -> value) of item_name used by get_sorted_ids.
+        Values are converted to the type of the item in the model (see
+        Model.get_sort_value). Items are processed on first request and kept up to
+        date afterwards. For datetime items an ordered index is built as well.
 
-        if item_type == "datetime":
-            sorted_pairs = sorted(
-                pairs,
-                key=lambda x: (
-                    mimir.backend.helper.convertToDateTime(x[1]),
-                    -int(x[0]) if reverse_order else int(x[0]),
-                ),
-                reverse=reverse_order,
-            )
-        elif item_type == "int":
-            sorted_pairs = sorted(
-                pairs,
-                key=lambda x: (int(x[1]), -int(x[0]) if reverse_order else int(x[0])),
-                reverse=reverse_order,
-            )
-        elif item_type == "float":
-            sorted_pairs = sorted(
-                pairs,
-                key=lambda x: (float(x[1]), -int(x[0]) if reverse_order else int(x[0])),
-                reverse=reverse_order,
+        Raises:
+            NotImplementedError : For ListItems that are not of type datetime
+            ValueError : If a value can not be converted to the type of the item
+        """
+        if item_name not in self._sort_keys:
+            if (
+                item_name in self.model.listitems
+                and self.model.get_item_type(item_name) != "datetime"
+            ):
+                # TODO: Think about a way to sort ListItems of type str/int
+                raise NotImplementedError(
+                    "Sorting for none datetime listitems not implemented"
+                )
+            self._sort_keys[item_name] = {
+                entry.key: self.model.get_sort_value(
+                    item_name, entry.get_item_value(item_name)
+                )
+                for entry in self.entries
+            }
+            if self.model.get_item_type(item_name) == "datetime":
+                self._ordered[item_name] = sorted(
+                    (value, int(self.entries[key].ID), key)
+                    for key, value in self._sort_keys[item_name].items()
+                )
+        return self._sort_keys[item_name]
+
+    def _add_sort_value(self, entry: EntryBase, item_name: str) -> None:
+        """
+        Helper adding an entry to the sort keys (and ordered index) of item_name.
+        If the value can not be converted the item is dropped and processed again
+        on the next request.
+        """
+        try:
+            value = self.model.get_sort_value(
+                item_name, entry.get_item_value(item_name)
             )
-        else:
-            sorted_pairs = sorted(
-                pairs,
-                key=lambda x: (x[1], -int(x[0]) if reverse_order else int(x[0])),
-                reverse=reverse_order,
+        except ValueError:
+            logger.warning(
+                "Can not convert %s of %s. Dropping sort keys",
+                item_name,
+                entry.ID,
             )
-
-        return [x[0] for x in sorted_pairs]
+            del self._sort_keys[item_name]
+            self._ordered.pop(item_name, None)
+            return
+        self._sort_keys[item_name][entry.key] = value
+        if item_name in self._ordered:
+            bisect.insort(self._ordered[item_name], (value, int(entry.ID), entry.key))
+
+    def _remove_sort_value(
+        self, entry: EntryBase, item_name: str, entry_id: str | None = None
+    ) -> None:
+        """
+        Helper removing an entry from the sort keys (and ordered index) of item_name.
+        entry_id is the ID the entry had when it was added
+        """
+        value = self._sort_keys[item_name].pop(entry.key, None)
+        if item_name not in self._ordered or value is None:
+            return
+        if entry_id is None:
+            entry_id = entry.ID
+        ordered = self._ordered[item_name]
+        elem = (value, int(entry_id), entry.key)
+        i_elem = bisect.bisect_left(ordered, elem)
+        if i_elem < len(ordered) and ordered[i_elem] == elem:
+            del ordered[i_elem]
 
     def get_entry_by_item_name(
         self, item_name: str, item_value: str
@@ -512,9 +1327,11 @@ class DataBase:
         """Get all entries that have value itemValue in Item with itemName"""
         if item_name not in self.model.allItems:
             raise KeyError("Arg {0} not in model items".format(item_name))
+        if item_name in self._index:
+            return list(self._index[item_name].get(item_value, {}).values())
         machting_entries = []
         for entry in self.entries:
-            item = entry.getItem(item_name)
+            item = entry.get_item(item_name)
             if isinstance(item, Item):
                 if item.value == item_value:
                     machting_entries.append(entry)
@@ -525,7 +1342,13 @@ class DataBase:
                     machting_entries.append(entry)
         return machting_entries
 
-    def remove(self, identifier, by_id=False, by_name=False, by_path=False):
+    def remove(
+        self,
+        identifier: str | int,
+        by_id: bool = False,
+        by_name: bool = False,
+        by_path: bool = False,
+    ) -> None:
         """
         Remove a entry from the databse by specifing indentifier. Indentifier can be ID,
         Name or Path (vector). When calling the function only one can be set to True
@@ -558,21 +1381,21 @@ class DataBase:
         if remove_type is None:
             raise RuntimeError
         entry2remove = self.get_entry_by_item_name(remove_type, str(identifier))[0]
+        self.remove_from_index(entry2remove)
         self.entries.remove(entry2remove)
-        self.entrydict.pop(entry2remove.Path, None)
         logger.debug("Removed entry:")
         for line in str(entry2remove).split("\n"):
             logger.debug("  %s", line)
 
     def modify_single_entry(
         self,
-        identifier,
-        item_name,
-        new_value,
-        by_id=False,
-        by_name=False,
-        by_path=False,
-    ):
+        identifier: str | int,
+        item_name: str,
+        new_value: str,
+        by_id: bool = False,
+        by_name: bool = False,
+        by_path: bool = False,
+    ) -> None:
         """
         Modify an entry of the Database
 
@@ -597,16 +1420,13 @@ class DataBase:
         if id_type is None:
             raise RuntimeError
         mod_entry = self.get_entry_by_item_name(id_type, str(identifier))[0]
-        if (
-            not type(mod_entry.items[item_name]) == Item
-        ):  # pylint: disable=unidiomatic-typecheck
+        if isinstance(mod_entry.items[item_name], ListItem):
             raise TypeError(
                 "Called modifySingleEntry with a Entry of type {0}".format(
                     type(mod_entry.items[item_name])
                 )
             )
         mod_entry.change_item_value(item_name, new_value)
-        self.cachedValuesChanged[item_name] = True
         # Update the Changed date of the entry
         if (
             (by_id and item_name == "ID")
@@ -626,15 +1446,15 @@ class DataBase:
 
     def modify_list_entry(
         self,
-        identifier,
-        item_name,
-        new_value,
-        method="Append",
-        old_value=None,
-        by_id=False,
-        by_name=False,
-        by_path=False,
-    ):
+        identifier: str | int,
+        item_name: str,
+        new_value: str | None,
+        method: str = "Append",
+        old_value: str | None = None,
+        by_id: bool = False,
+        by_name: bool = False,
+        by_path: bool = False,
+    ) -> None:
         """
         Modify an entry of the Database.
 
@@ -666,25 +1486,7 @@ class DataBase:
                     type(mod_entry.items[item_name])
                 )
             )
-        if method == "Append":
-            if len(mod_entry.get_item(item_name).value) == 1 and mod_entry.get_item(
-                item_name
-            ).value[0] == self.model.get_default_value(item_name):
-                default = self.model.get_default_value(item_name)
-                mod_entry.replace_item_value(item_name, new_value, default)
-            else:
-                mod_entry.add_item_value(item_name, new_value)
-        elif method == "Replace":
-            mod_entry.replace_item_value(item_name, new_value, old_value)
-        elif method == "Remove":
-            mod_entry.remove_item_value(item_name, old_value)
-            if len(mod_entry.get_item(item_name).value) == 0:
-                mod_entry.add_item_value(
-                    item_name, self.model.get_default_value(item_name)
-                )
-        else:
-            raise NotImplementedError
-        self.cachedValuesChanged[item_name] = True
+        self._modify_list_item(mod_entry, item_name, new_value, method, old_value)
         # Update the Changed date of the entry
         if item_name not in ("Changed", "Opened"):
             # Exclude changed item since this would lead to inf. loop
@@ -698,9 +1500,168 @@ class DataBase:
                 by_path=by_path,
             )
 
+    def _modify_list_item(
+        self,
+        entry: EntryBase,
+        item_name: str,
+        new_value: str | None,
+        method: str,
+        old_value: str | None,
+    ) -> None:
+        """
+        Helper applying a modification (Append, Replace, Remove) to ListItem
+        item_name of entry. The default value is replaced by the first appended value
+        and set again if the last value is removed.
+        """
+        if method == "Append":
+            if len(entry.get_item(item_name).value) == 1 and entry.get_item(
+                item_name
+            ).value[0] == self.model.get_default_value(item_name):
+                default = self.model.get_default_value(item_name)
+                entry.replace_item_value(item_name, new_value, default)
+            else:
+                entry.add_item_value(item_name, new_value)
+        elif method == "Replace":
+            entry.replace_item_value(item_name, new_value, old_value)
+        elif method == "Remove":
+            entry.remove_item_value(item_name, old_value)
+            if len(entry.get_item(item_name).value) == 0:
+                entry.add_item_value(item_name, self.model.get_default_value(item_name))
+        else:
+            raise NotImplementedError
+
+    def batch(self) -> mimir.backend.batch.MutationBatch:
+        """
+        Returns a MutationBatch. Modifications added to the batch are applied with
+        apply_mutations when the with block exits::
+
+            with database.batch() as batch:
+                for entry_id in ids:
+                    batch.set(entry_id, "Rating", "5")
+                    batch.append(entry_id, "ListItem", "Blue")
+        """
+        return mimir.backend.batch.MutationBatch(self)
+
+    def apply_mutations(self, mutations: list[tuple]) -> list[EntryBase]:
+        """
+        Apply multiple modifications at once. All mutations are validated before
+        anything is changed and the entries are found with the ID index. The Changed
+        item of each modified entry is updated once (not for ID, Opened and Changed
+        modifications). The indexes and value counts are updated after all
+        modifications are applied. If a modification fails all entries are restored.
+
+        Args:
+            mutations (list) : Tuples of (ID, item name, method, new value, old
+                               value). method is Set for Single items and Append,
+                               Replace or Remove for ListItems (see
+                               modify_list_entry)
+
+        Returns:
+            list : Modified DataBaseEntry objects
+
+        Raises:
+            IndexError : If an ID is not in the database
+            KeyError : If an item name is not in the model
+            TypeError : If the method does not fit the type of the item
+            NotImplementedError : For invalid methods
+            ValueError : If a value to be removed/replaced is not in the ListItem
+            RuntimeError : If the IDs are not unique after the modifications
+        """
+        by_entry = {}
+        id_mapping = {}
+        for identifier, item_name, method, new_value, old_value in mutations:
+            entries = self._index["ID"].get(str(identifier))
+            if not entries:
+                raise IndexError("Index {0} is out of range of DB".format(identifier))
+            if item_name not in self.model.allItems:
+                raise KeyError("Arg {0} not in model items".format(item_name))
+            entry = next(iter(entries.values()))
+            item = entry.items[item_name]
+            if method == "Set":
+                if isinstance(item, ListItem):
+                    raise TypeError(
+                        "Set is not supported for {0} items".format(type(item))
+                    )
+            elif method in ("Append", "Replace", "Remove"):
+                if not isinstance(item, ListItem):
+                    raise TypeError(
+                        "{0} is not supported for {1} items".format(method, type(item))
+                    )
+            else:
+                raise NotImplementedError("Invalid method {0}".format(method))
+            if item_name == "ID":
+                id_mapping[entry.ID] = str(new_value)
+            by_entry.setdefault(entry.key, (entry, []))[1].append(
+                (item_name, method, new_value, old_value)
+            )
+        if id_mapping:
+            kept_ids = {i for i in self._index["ID"] if i not in id_mapping}
+            new_ids = set(id_mapping.values())
+            if len(new_ids) != len(id_mapping) or not kept_ids.isdisjoint(new_ids):
+                raise RuntimeError("IDs are not unique after the modifications")
+
+        time_stamp = mimir.backend.helper.getTimeFormatted("Full")
+        snapshots = []
+        try:
+            for entry, entry_mutations in by_entry.values():
+                entry.observer = None
+                snapshot = {
+                    item_name: copy.copy(entry.get_item_value(item_name))
+                    for item_name, _, _, _ in entry_mutations
+                }
+                snapshot["Changed"] = copy.copy(entry.items["Changed"].value)
+                snapshots.append((entry, snapshot))
+                for item_name, method, new_value, old_value in entry_mutations:
+                    if method == "Set":
+                        entry.change_item_value(item_name, new_value)
+                    else:
+                        self._modify_list_item(
+                            entry, item_name, new_value, method, old_value
+                        )
+                if any(
+                    item_name not in ("ID", "Changed", "Opened")
+                    for item_name, _, _, _ in entry_mutations
+                ):
+                    self._modify_list_item(entry, "Changed", time_stamp, "Append", None)
+        except Exception:
+            logger.error("Modification failed. Restoring %s entries", len(snapshots))
+            for entry, snapshot in snapshots:
+                for item_name, value in snapshot.items():
+                    entry.items[item_name].replace(value)
+                    setattr(entry, item_name, value)
+                entry.observer = self.entry_changed
+            raise
+
+        for entry, snapshot in snapshots:
+            entry.observer = self.entry_changed
+            self._changed_entries[entry.key] = entry
+            for item_name, old_value in snapshot.items():
+                new_value = entry.get_item_value(item_name)
+                if isinstance(old_value, list):
+                    old_set, new_set = set(old_value), set(new_value)
+                    removed = [v for v in old_set if v not in new_set]
+                    added = [v for v in new_set if v not in old_set]
+                elif old_value != new_value:
+                    removed, added = [old_value], [new_value]
+                else:
+                    continue
+                if removed or added:
+                    self.entry_changed(entry, item_name, removed, added)
+        if id_mapping:
+            self.maxID = max((int(e.ID) for e in self.entries), default=-1)
+        logger.debug(
+            "Applied %s modifications to %s entries", len(mutations), len(snapshots)
+        )
+        return [entry for entry, _ in snapshots]
+
     def get_count(
-        self, identifier, item_name, by_id=False, by_name=False, by_path=False
-    ):
+        self,
+        identifier: str | int,
+        item_name: str,
+        by_id: bool = False,
+        by_name: bool = False,
+        by_path: bool = False,
+    ) -> int:
         """
         Method for counting the number of values in a ListItem. This need to be a
         database operation, because the Entry is not aware of it's default value which
@@ -745,7 +1706,13 @@ class DataBase:
         else:
             return len(mod_entry.get_item(item_name).value)
 
-    def update_opened(self, identifier, by_id=False, by_name=False, by_path=False):
+    def update_opened(
+        self,
+        identifier: str | int,
+        by_id: bool = False,
+        by_name: bool = False,
+        by_path: bool = False,
+    ) -> None:
         """
         Wrapper for modifyListEntry that is supposed to be called after a file has been
         openend. For this function the byID is enable on default when none of the
@@ -770,7 +1737,12 @@ class DataBase:
             by_path=by_path,
         )
 
-    def query(self, item_names, item_values, return_ids=False):
+    def query(
+        self,
+        item_names: str | list[str],
+        item_values: str | list[str],
+        return_ids: bool = False,
+    ) -> list:
         """
         Query database: Will get all values for items with names itemNames and searches
         for all values given in the itemValues parameter. Leading ! on a value will be
@@ -783,7 +1755,7 @@ class DataBase:
                                entries
 
         Return:
-            result (list) : list of all entries (ids) matching the query
+            result (list) : list of all entries (ids) matching the query sorted by ID
         """
         if isinstance(item_names, str):
             item_names = [item_names]
@@ -792,7 +1764,6 @@ class DataBase:
         for name in item_names:
             if name not in self.model.allItems:
                 raise KeyError("Arg {0} not in model items".format(name))
-        result = []
         hit_values = []
         veto_values = []
         for value in item_values:
@@ -803,75 +1774,124 @@ class DataBase:
         logger.debug("Processing Query with:")
         logger.debug("  hitValues: %s", hit_values)
         logger.debug("  vetoValues: %s", veto_values)
-        for entry in self.entries:
-            entry_values = entry.getAllValuesbyName(item_names, split=True)
-            hit = 0
-            veto = False
-            for value in hit_values:
-                if value in entry_values:
-                    hit += 1
-            for value in veto_values:
-                if value in entry_values:
-                    veto = True
-            add_entry = False
-            # Decide if entry will be returned. Options:
-            # No vetoValue and hit: Return Entry
-            # No vetoValue and no hit: Not Retrun Entry
-            if len(veto_values) == 0:
-                if hit == len(item_values):
-                    add_entry = True
-            # Set vetoValue and No hitValue and veto: Not return Entry
-            # Set vetoValue and No hitValue and not veto: Return Entry
-            elif len(veto_values) >= 1 and len(hit_values) == 0:
-                if not veto:
-                    add_entry = True
-            # Set vetoValue and Set hitValue and veto: Not return Entry
-            # Set vetoValue and Set hitValue and not veto and not hit: Not return Entry
-            # Set vetoValue and Set hitValue and not veto and hit: Return Entry
+        # Decide if entry will be returned. Options:
+        # No vetoValue: Return entries with all hitValues
+        # Set vetoValue and No hitValue: Return all entries w/o any vetoValue
+        # Set vetoValue and Set hitValue: Return entries with all hitValues and w/o
+        #                                 any vetoValue
+        matching_keys = None
+        for value in hit_values:
+            value_keys = self._get_keys_with_token(item_names, value)
+            if matching_keys is None:
+                matching_keys = value_keys
             else:
-                if not veto and hit == len(hit_values):
-                    add_entry = True
-            if add_entry:
-                if return_ids:
-                    result.append(entry.ID)
-                else:
-                    result.append(entry)
+                matching_keys &= value_keys
+            if not matching_keys:
+                break
+        if matching_keys is None:
+            matching_keys = set(self.entries.keys())
+        for value in veto_values:
+            if not matching_keys:
+                break
+            matching_keys -= self._get_keys_with_token(item_names, value)
+        result = sorted(
+            (self.entries[key] for key in matching_keys), key=lambda x: int(x.ID)
+        )
+        if return_ids:
+            return [entry.ID for entry in result]
         return result
 
-    def get_entry_by_id(self, ret_id):
+    def _get_keys_with_token(self, item_names: list[str], token: str) -> set[int]:
+        """Returns the set of keys that have token in any of the items item_names"""
+        keys = set()
+        for name in item_names:
+            keys.update(self.get_postings(name).get(token, ()))
+        return keys
+
+    def get_entry_by_id(self, ret_id: str | int) -> EntryBase:
         """Faster method for getting entry by ID"""
-        return self.get_entry_by_item_name("ID", ret_id)[0]
+        return self.get_entry_by_item_name("ID", str(ret_id))[0]
 
-    def __eq__(self, other):
-        """Implementation of the equality relation"""
+    def get_entry_by_key(self, key: int) -> EntryBase:
+        """
+        Returns the entry with row key key (see EntryStore). In contrast to the ID,
+        the key of an entry never changes while the database is loaded.
+
+        Raises:
+            KeyError : If no entry has the key
+        """
+        return self.entries[key]
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Implementation of the equality relation. Databases are equal if they
+        contain the same entries (compared by content hash, independent of order).
+        """
         if isinstance(other, self.__class__):
             if len(self.entries) != len(other.entries):
                 return False
-            for entry in self.entries:
-                foundequivalent = False
-                for otherentry in other.entries:
-                    # print("comparing",entry, otherentry)
-                    if entry == otherentry:
-                        foundequivalent = True
-                        break
-                if not foundequivalent:
-                    return False
-            return True
+            if self.get_root_hash() != other.get_root_hash():
+                return False
+            return Counter(self.hashes.hashes.values()) == Counter(
+                other.hashes.hashes.values()
+            )
         else:
             return NotImplemented
 
-    def get_status(self):
-        """Check if current status of the database is saved"""
+    def diff(self, other: "DataBase") -> DataBaseDiff:
+        """
+        Compare the entries with the entries of another database by ID
+
+        Args:
+            other (DataBase) : Database to compare with
+
+        Returns:
+            DataBaseDiff : Entries added (only in this database), removed (only in
+                           other) and changed (same ID but different content)
+        """
+        result = DataBaseDiff()
+        other_entries = {entry.ID: entry for entry in other.entries}
+        for entry in self.entries:
+            other_entry = other_entries.pop(entry.ID, None)
+            if other_entry is None:
+                result.added.append(entry)
+            elif self.hashes.get(entry.key) != other.hashes.get(other_entry.key):
+                result.changed.append((entry, other_entry))
+        result.removed = list(other_entries.values())
+        return result
+
+    def get_status(self) -> bool:
+        """
+        Check if current status of the database is saved. The root hash is compared
+        with the hash saved with the database. If it is not available the saved
+        entries are compared by ID using a ReadOnlyDataBase (json backend).
+        """
         if not os.path.exists(self.savepath):
             logger.info("No database saved yet")
             return False
-        dummy_db = DataBase(self.databaseRoot, "load", dummy=True)
-        if self == dummy_db:  # pylint: disable=simplifiable-if-statement
-            return True
-        else:
-            return False
+        saved_hash = self.load_root_hash()
+        if saved_hash is not None:
+            return saved_hash == (self.get_root_hash(), len(self.entries))
+        if not isinstance(self.storage, JSONStorage):
+            dummy_db = DataBase(self.databaseRoot, "load", dummy=True)
+            return self == dummy_db
+        with mimir.backend.readonly.ReadOnlyDataBase(
+            self.databaseRoot, model_conf=self.model.fileName, cache_size=1
+        ) as saved_db:
+            if len(saved_db) != len(self.entries):
+                return False
+            for entry in self.entries:
+                try:
+                    saved_entry = saved_db.get_entry_by_id(entry.ID)
+                except IndexError:
+                    return False
+                if entry != saved_entry:
+                    return False
+        return True
 
-    def check_mod_vector(self, value, by_id, by_name, by_path):
+    def check_mod_vector(
+        self, value: str | int, by_id: bool, by_name: bool, by_path: bool
+    ) -> None:
         """Common function for modification methods input chekcing"""
         n_vectors_active = 0
         for vector in [by_id, by_name, by_path]:
@@ -894,39 +1914,47 @@ class DataBase:
                 )
             )
         if by_id:
-            if str(value) not in self.get_all_value_by_item_name("ID"):
+            if str(value) not in self._index["ID"]:
                 raise IndexError("Index {0} is out of range of DB".format(value))
         else:
             if by_name:
                 query = "Name"
             if by_path:
                 query = "Path"
-            if value not in self.get_all_value_by_item_name(query):
-                print(value, self.get_all_value_by_item_name(query))
+            if value not in self._index[query]:
                 raise KeyError("Value w/ {0} {1} not in Database".format(query, value))
 
     def get_random_entry(
         self,
-        choose_from: Union[List[str], Set[str]],
+        choose_from: Union[List[str], Set[str], None] = None,
         weighted: bool = False,
         method: RandomWeightingMethod = RandomWeightingMethod.TIMES_OPENED,
     ) -> str:
         """
         Get a random entry from the database out of the ID passed in the chooseFrom
-        variable
+        variable. Entries in last_executed_ids are not chosen. If all entries are
+        passed (choose_from is None), the entry is drawn in O(log n) from a sampler
+        that is kept up to date with the entries.
 
         Args:
-            choose_from (list, set) : List of ID to choose a random ID from
-            weighted (bool) : Weighted random function (to be implemented)
+            choose_from (list, set) : List of ID to choose a random ID from. All
+                                      entries if None
+            weighted (bool) : Weighted random function (see get_random_weight)
             method (RandomWeightingMethod) : Method for the weighting
         Return: Random ID
         """
-        if isinstance(choose_from, set):
-            choose_from = list(choose_from)
+        if weighted and method != RandomWeightingMethod.TIMES_OPENED:
+            raise NotImplementedError
+        if not weighted:
+            method = None
+        if choose_from is None:
+            exclude = []
+            for id_ in self.last_executed_ids:
+                exclude.extend(self._index["ID"].get(str(id_), ()))
+            key = self.get_sampler(method).sample(exclude)
+            return self.entries[key].ID
 
-        choose_from = [
-            e for e in choose_from if not self.last_executed_ids.containes(e)
-        ]
+        choose_from = [e for e in choose_from if e not in self.last_executed_ids]
 
         if not weighted:
             return random.choice(choose_from)
@@ -936,18 +1964,48 @@ class DataBase:
     def _get_weighted_random_entry(
         self, choose_from: List[str], method: RandomWeightingMethod
     ) -> str:
-        entries = [self.get_entry_by_item_name("ID", i)[0] for i in choose_from]
+        sampler = self.get_sampler(method)
+        weights = [sampler.get(self.get_entry_by_id(i).key) for i in choose_from]
+        return random.choices(choose_from, weights)[0]
+
+    def get_sampler(self, method: RandomWeightingMethod) -> WeightedSampler:
+        """
+        Returns the sampler with the weights (see get_random_weight) of all entries
+        for method. It is built on the first request and kept up to date afterwards.
+        """
+        if method not in self._samplers:
+            self._samplers[method] = WeightedSampler(
+                {
+                    entry.key: self.get_random_weight(entry, method)
+                    for entry in self.entries
+                }
+            )
+        return self._samplers[method]
+
+    @staticmethod
+    def get_random_weight(
+        entry: EntryBase, method: RandomWeightingMethod | None
+    ) -> float:
+        """
+        Returns the weight of entry for weighted random selection
+
+            - None : 1 for all entries (uniform)
+            - TIMES_OPENED : 5 for entries never opened, 1/(2n+1) for entries
+                             opened n times
+
+        Raises:
+            NotImplementedError : For other methods
+        """
+        if method is None:
+            return 1.0
         if method == RandomWeightingMethod.TIMES_OPENED:
-            weights = [
-                1 / (2 * len([elem for elem in entry.Opened if "|" in elem]) + 1)
-                for entry in entries
-            ]
-            weights = [(5 if w == 1 else w) for w in weights]
-            return random.choices(choose_from, weights)[0]
-        else:
-            raise NotImplementedError
+            times_opened = sum(1 for elem in entry.Opened if "|" in elem)
+            if times_opened == 0:
+                return 5.0
+            return 1 / (2 * times_opened + 1)
+        raise NotImplementedError
 
-    def get_random_rntry_all(self, weighted=False):
+    def get_random_rntry_all(self, weighted: bool = False) -> str:
         """
         Get a random entry from the database out of all ids. This is just a wrapper for
         getRandomEntry
@@ -957,132 +2015,68 @@ class DataBase:
         Returns:
             retID (str) : Random ID
         """
-        return self.get_random_entry(
-            list(self.get_all_value_by_item_name("ID")), weighted
-        )
+        return self.get_random_entry(None, weighted)
 
-    def get_items_by_path(self, full_file_name, fast=False, whitespace_match=True):
+    def get_path_matcher(self) -> PathMatcher:
+        """
+        Returns the PathMatcher for the values of the SecondaryDBs items. The matcher
+        is cached and rebuilt after the set of values of one of the items changed.
+        """
+        if self._path_matcher is None:
+            self._path_matcher = PathMatcher(
+                {
+                    item: self.get_all_value_by_item_name(item)
+                    for item in self._model.secondaryDBs
+                },
+                self._model.separators,
+                self._model.extentions,
+            )
+        return self._path_matcher
+
+    def get_items_by_path(
+        self, full_file_name: str, fast: bool = False, whitespace_match: bool = True
+    ) -> dict[str, set[str]]:
         """
         Function will parse the filename for values pesent in the Items defined in
         SecondaryDBs. The passed file name will be split by separators define in model.
         Implemented as a two stage process.
         1. Split at / and try to identify full know values
-        2.
+        2. Split the last remaining element by the separators and find all (partial)
+           values in the parts (skipped if fast is set)
 
         Args:
             fullFileName (str) : Expects full file name starting from the mimir
                                  base dictRepr
+            fast (bool) : Skip the partial matches
+            whitespace_match (bool) : Match values with whitespace replaced by a
+                                      separator
 
         Returns:
             foundOptions (dict) : List of values that could be matched to the path
                                   by Item
         """
-        found_options = {}
-        items_2_check = self._model.secondaryDBs
-        values = {}
-        values_orig = {}
-        for item in items_2_check:
-            values_orig[item] = list(self.get_all_value_by_item_name(item))
-            values[item] = set(
-                [x.lower() for x in self.get_all_value_by_item_name(item)]
-            )
-            found_options[item] = []
-        whitewpace_matches = {}
-        if whitespace_match:
-            # Add all values that have a whitespace with all possible sparators to list
-            # so exact matches can be found
-            for item in items_2_check:
-                orig_vals = list(values[item])
-                for value in orig_vals:
-                    if " " in value:
-                        for sep in self._model.separators:
-                            values[item].add(value.replace(" ", sep))  # Add since set
-                            whitewpace_matches[value.replace(" ", sep)] = value
-        # Remove file endings from model
-        for file_type in self._model.extentions:
-            if full_file_name.endswith(file_type):
-                full_file_name = full_file_name.replace("." + file_type, "")
-                break
-        full_file_name = full_file_name.lower()
-        path_elements = full_file_name.split("/")
-        rem_unsplit_elements = copy.copy(path_elements)
-        for elem in path_elements:
-            for item in items_2_check:
-                if elem in values[item]:
-                    if whitespace_match:
-                        if elem in whitewpace_matches.keys():
-                            found_options[item].append(whitewpace_matches[elem])
-                        else:
-                            found_options[item].append(elem)
-                    else:
-                        found_options[item].append(elem)
-                    rem_unsplit_elements.remove(elem)
-        if whitespace_match:
-            # For partial matched this is not needed.
-            for item in items_2_check:
-                values[item] = set(
-                    [x.lower() for x in self.get_all_value_by_item_name(item)]
-                )
-        # Now we need to split elements with whitespace into
-        # two element to match partial matches
-        partial_whitespaces = {}
-        for item in items_2_check:
-            new_value_list = []
-            for value in values[item]:
-                if " " in value:
-                    split_values = value.split(" ")
-                    new_value_list += split_values
-                    for val in split_values:
-                        if val not in partial_whitespaces.keys():
-                            partial_whitespaces[val] = [value]
-                        else:
-                            partial_whitespaces[val].append(value)
-                else:
-                    new_value_list.append(value)
-            values[item] = set(new_value_list)
-        rem_split_elements = []
-        for elem in rem_unsplit_elements:
-            rem_split_elements = list(self.split_str(elem))
-        if not fast:
-            for element in rem_split_elements:
-                for item in items_2_check:
-                    for value in values[item]:
-                        # If a single character is in whitespace name
-                        # it will be skipped.
-                        if len(value) == 1:
-                            continue
-                        if value in element:
-                            if value in partial_whitespaces.keys():
-                                found_options[item] += partial_whitespaces[value]
-                                logger.debug(
-                                    "Adding %s for %s because %s in %s",
-                                    partial_whitespaces[value],
-                                    item,
-                                    value,
-                                    element,
-                                )
-                            else:
-                                found_options[item].append(value)
-                                logger.debug(
-                                    "Adding %s for %s because %s in %s",
-                                    value,
-                                    item,
-                                    value,
-                                    element,
-                                )
-
-        # Replace the lowercase versions of the options with the original
-        # case sensitive ones
-        for item in items_2_check:
-            for ioption, option in enumerate(found_options[item]):
-                for i_orig_option, orig_option in enumerate(values_orig[item]):
-                    if option == orig_option.lower():
-                        found_options[item][ioption] = values_orig[item][i_orig_option]
-        for item in items_2_check:
-            found_options[item] = set(found_options[item])
-        return found_options
-
-    def split_str(self, inputStr):
+        return self.get_path_matcher().match(full_file_name, fast, whitespace_match)
+
+    def get_items_by_paths(
+        self,
+        full_file_names: Iterable[str],
+        fast: bool = False,
+        whitespace_match: bool = True,
+    ) -> dict[str, dict[str, set[str]]]:
+        """
+        Batch version of get_items_by_path. The matcher is only built once for all
+        paths.
+
+        Returns:
+            foundOptions (dict) : Path -> found options (see get_items_by_path)
+        """
+        matcher = self.get_path_matcher()
+        return {
+            full_file_name: matcher.match(full_file_name, fast, whitespace_match)
+            for full_file_name in full_file_names
+        }
+
+    def split_str(self, inputStr: str) -> set[str]:
         """
         Splits a passed sting by all separators defined in the model
 
@@ -1100,7 +2094,7 @@ class DataBase:
         return set(found_elements)
 
     @staticmethod
-    def split_by_eep(separator, elementList):
+    def split_by_eep(separator: str, elementList: list[str]) -> list[str]:
         """Helper function to make splitStr nicer"""
         ret_list = []
         for elem in elementList:
@@ -1122,7 +2116,7 @@ class Model:
         extentions : File extentions that are used as criterion for searching files
     """
 
-    def __init__(self, config) -> None:
+    def __init__(self, config: str) -> None:
         logger.debug("Loading model from %s", config)
         self.fileName = config
         modelDict = None
@@ -1175,10 +2169,63 @@ class Model:
                         "There should only be on Item with any given plugin"
                     )
         self.pluginDefinitions = set(self.pluginDefinitions)
+        self.entry_class = make_entry_class(
+            "ModelEntry",
+            [(item, "Single") for item in self._items]
+            + [(item, "List") for item in self._listitems],
+        )
 
         # TODO Check if required items are in model
 
-    def update_model(self):
+    def create_entry(self, init_items: list[Item | ListItem]) -> EntryBase:
+        """
+        Create an entry from the initialization list (see DataBaseEntry). Entries
+        with all items of the model are created with the compact entry class
+        generated from the model (see entry.make_entry_class). The items are
+        reordered to the order of the model. Entries with other items are created
+        as DataBaseEntry (logged).
+        """
+        if self.entry_class is None:
+            return DataBaseEntry(init_items)
+        DataBaseEntry.check_init_items(init_items)
+        if self.entry_class.accepts(init_items):
+            return self.entry_class(init_items)
+        items_by_name = {item[0]: item for item in init_items}
+        ordered_items = [
+            items_by_name[name]
+            for name in self.entry_class.names
+            if name in items_by_name
+        ]
+        if len(ordered_items) == len(init_items) and self.entry_class.accepts(
+            ordered_items
+        ):
+            return self.entry_class(ordered_items)
+        logger.warning(
+            "Items %s do not match model %s. Creating DataBaseEntry",
+            [item[0] for item in init_items],
+            self.modelName,
+        )
+        return DataBaseEntry(init_items)
+
+    def entry_from_dict(self, saved_entry: dict) -> EntryBase:
+        """
+        Create a DataBaseEntry from its dictionary representation (as saved by the
+        storage backends). Items not defined in the model are ignored.
+        """
+        entryinit = []
+        for item in saved_entry:
+            if not (item in self.items or item in self.listitems):
+                logger.warning(
+                    "Found item in saved json not in model. Item will be ignored"
+                )
+                logger.warning("Currently this will result in loss of data when saving")
+                continue
+            entryinit.append(
+                (item, saved_entry[item]["type"], saved_entry[item]["value"])
+            )
+        return self.create_entry(entryinit)
+
+    def update_model(self) -> None:
         """
         Function for updating the model
 
@@ -1188,7 +2235,7 @@ class Model:
         """
         pass
 
-    def get_default_value(self, itemName):
+    def get_default_value(self, itemName: str) -> str:
         """Returns the default item name of the modlue"""
         if itemName in self._items.keys():
             defVal = self._items[itemName]["default"]
@@ -1203,7 +2250,42 @@ class Model:
         else:
             raise TypeError
 
-    def get_item_type(self, itemName):
+    def get_sort_value(
+        self, item_name: str, value: str | list[str]
+    ) -> str | int | float:
+        """
+        Convert a value of item item_name to the type of the item (itemType) for
+        sorting and comparisons: int, float or for datetime the seconds since epoch
+        (the latest date for ListItems). Dates that can not be parsed (e.g. the
+        default value) are converted to 01.01.00|00:00:00. Values of other items are
+        returned unchanged. Entries always store the string values, the converted
+        values are only used as sort keys (see DataBase.get_sort_keys) and by the
+        columnar store.
+
+        Raises:
+            ValueError : If the value is not a valid int/float
+        """
+        item_type = self.get_item_type(item_name)
+        if item_type == "datetime":
+            if isinstance(value, list):
+                return max(map(self._date_to_epoch, value))
+            return self._date_to_epoch(value)
+        if item_type == "int":
+            return int(value)
+        if item_type == "float":
+            return float(value)
+        return value
+
+    @staticmethod
+    def _date_to_epoch(value: str) -> int:
+        """Helper converting a date (DD.MM.YY|HH:MM:SS) to seconds since epoch"""
+        try:
+            return mimir.backend.datecodec.to_epoch(value)
+        except ValueError:
+            logger.debug("Converting %s to 01.01.00|00:00:00", value)
+            return mimir.backend.datecodec.to_epoch("01.01.00|00:00:00")
+
+    def get_item_type(self, itemName: str) -> str:
         """Returns the default item name of the modlue"""
         if itemName in self._items.keys():
             return self._items[itemName]["itemType"]
@@ -1213,11 +2295,11 @@ class Model:
             raise KeyError
 
     @property
-    def items(self):
+    def items(self) -> dict:
         """Retruns all item demfinitons in the model"""
         return self._items
 
     @property
-    def listitems(self):
+    def listitems(self) -> dict:
         """Retruns all listitem demfinitons in the model"""
         return self._listitems
@@ -0,0 +1,129 @@
+"""
+Codec for the date format used in the entries (DD.MM.YY|HH:MM:SS, see
+helper.getTimeFormatted). Dates are converted to seconds since epoch (UTC) and back.
+Dates in the canonical format are parsed by slicing at fixed offsets, the days of
+each distinct date are memoized and complete timestamps are kept in a memo table
+since the same timestamps (e.g. of one modification run) occur in many entries.
+"""
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Maximum number of timestamps in the memo tables. The tables are cleared when full
+memo_size = 2**16
+
+_day_memo = {}
+_parse_memo = {}
+_format_memo = {}
+
+
+def _days(date_str: str) -> int:
+    """Returns the days since epoch for DD.MM.YY. Raises ValueError if invalid"""
+    days = _day_memo.get(date_str)
+    if days is None:
+        if len(_day_memo) >= memo_size:
+            _day_memo.clear()
+        day, month, year = date_str.split(".")
+        days = (
+            datetime.date(2000 + int(year), int(month), int(day)).toordinal()
+            - _EPOCH_ORDINAL
+        )
+        _day_memo[date_str] = days
+    return days
+
+
+def _seconds(hour: int, minute: int, sec: int) -> int:
+    """Returns the seconds since midnight. Raises ValueError if invalid"""
+    if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= sec < 60):
+        raise ValueError("Invalid time {0}:{1}:{2}".format(hour, minute, sec))
+    return hour * 3600 + minute * 60 + sec
+
+
+def to_epoch(value: str) -> int:
+    """
+    Convert a date DD.MM.YY|HH:MM:SS to seconds since epoch. Dates that are not
+    zero-padded are supported as well (slower).
+
+    Raises:
+        ValueError : If value is not a valid date
+    """
+    epoch = _parse_memo.get(value)
+    if epoch is not None:
+        return epoch
+    try:
+        if (
+            len(value) == 17
+            and value[8] == "|"
+            and value[11] == ":"
+            and value[14] == ":"
+        ):
+            epoch = _days(value[0:8]) * 86400 + _seconds(
+                int(value[9:11]), int(value[12:14]), int(value[15:17])
+            )
+        else:
+            date_str, time_str = value.split("|")
+            hour, minute, sec = time_str.split(":")
+            epoch = _days(date_str) * 86400 + _seconds(int(hour), int(minute), int(sec))
+    except (ValueError, TypeError, AttributeError) as error:
+        raise ValueError("Invalid date {0}: {1}".format(value, error)) from error
+    if len(_parse_memo) >= memo_size:
+        _parse_memo.clear()
+    _parse_memo[value] = epoch
+    return epoch
+
+
+def from_epoch(epoch: int) -> str:
+    """Convert seconds since epoch to a date DD.MM.YY|HH:MM:SS"""
+    value = _format_memo.get(epoch)
+    if value is None:
+        days, seconds = divmod(int(epoch), 86400)
+        date = datetime.date.fromordinal(days + _EPOCH_ORDINAL)
+        minutes, sec = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        value = "{0:02}.{1:02}.{2:02}|{3:02}:{4:02}:{5:02}".format(
+            date.day, date.month, date.year - 2000, hour, minute, sec
+        )
+        if len(_format_memo) >= memo_size:
+            _format_memo.clear()
+        _format_memo[epoch] = value
+    return value
+
+
+def to_datetime(value: str) -> datetime.datetime:
+    """Convert a date DD.MM.YY|HH:MM:SS to a (naive) datetime object"""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=to_epoch(value))
+
+
+def to_epochs(values: list[str], default: int | None = None) -> list[int]:
+    """
+    Convert a list of dates to seconds since epoch. Invalid dates are replaced by
+    default or raise a ValueError if default is None.
+    """
+    epochs = []
+    for value in values:
+        epoch = _parse_memo.get(value)
+        if epoch is None:
+            try:
+                epoch = to_epoch(value)
+            except ValueError:
+                if default is None:
+                    raise
+                logger.debug("Converting %s to default %s", value, default)
+                epoch = default
+        epochs.append(epoch)
+    return epochs
+
+
+def from_epochs(epochs: list[int]) -> list[str]:
+    """Convert a list of seconds since epoch to dates"""
+    return [from_epoch(epoch) for epoch in epochs]
+
+
+def clear_memo() -> None:
+    """Clear all memo tables"""
+    _day_memo.clear()
+    _parse_memo.clear()
+    _format_memo.clear()
@@ -1,29 +1,27 @@
 """
 Entry Module. Includes definitons for DatabaseEnties and item of these entries
 """
+import keyword
 import logging
+from collections.abc import Iterator, Mapping
+from typing import ClassVar
 
 logger = logging.getLogger(__name__)
 
 
-class DataBaseEntry:
+class EntryBase:
     """
-    The Entry class describes all information stored in an database entry
-
-    Args:
-        initItems (list) : Each Item has to be a tuple of ItemName, ItemType ("Single"
-                           or "List") and InitValues
-    Attributes:
-        names (list) : List of all item names in entry\n
-        items (dict) : Dictionary with all Item/ListItem objects
-    Raises:
-        TypeError : If initItems is not of type list\n
-        TypeError : If initItems is no list of tuples\n
-        RuntimeError : If the tuple of initItems is invalid (not exactly three of type
-                       str, typ, str/int/float
+    Base class with the methods shared by DataBaseEntry and the entry classes
+    generated from a model (see CompactEntry). Subclasses provide names, items,
+    observer and key. The class has no slots itself, so the subclasses decide how
+    the values are stored.
     """
 
-    def __init__(self, init_items) -> None:
+    __slots__ = ()
+
+    @classmethod
+    def check_init_items(cls: type["EntryBase"], init_items: list) -> None:
+        """Helper checking the format of the initialization list"""
         if not isinstance(init_items, list):
             raise TypeError("Entry initialization need to be a list")
         for initial_item in init_items:
@@ -38,19 +36,11 @@ class DataBaseEntry:
                     )
                 else:
                     name_, type_, value_ = initial_item
-                    self.check_passed_items(name_, type_, value_)
-        self.names = []
-        self.items = {}
-        for item_name, item_type, item_value in init_items:
-            self.names.append(item_name)
-            if item_type == "List":
-                self.items[item_name] = ListItem(item_name, item_value)
-            else:
-                self.items[item_name] = Item(item_name, item_value)
-        for item in self.names:
-            setattr(self, item, self.items[item].value)
+                    cls.check_passed_items(name_, type_, value_)
 
-    def get_all_values_by_name(self, names, split=False):
+    def get_all_values_by_name(
+        self, names: str | list[str], split: bool = False
+    ) -> set[str]:
         """
         Return all values matching items with name in names.
         Args:
@@ -65,7 +55,7 @@ class DataBaseEntry:
 
         result = []
         for name in names:
-            value = self.items[name].value
+            value = self.get_item_value(name)
             if isinstance(value, list):
                 result += value
             else:
@@ -81,7 +71,7 @@ class DataBaseEntry:
             result = result_
         return set(result)
 
-    def get_item(self, itemName):
+    def get_item(self, itemName: str) -> "Item":
         """Returns an item of the Database entry
 
         Raises:
@@ -91,44 +81,32 @@ class DataBaseEntry:
             raise RuntimeError("Entry has no item with name -- {0} --".format(itemName))
         return self.items[itemName]
 
-    def has_item(self, itemName):
-        """
-        Check if a entry has an item with name itemName
-        """
-        return str(itemName) in self.names
+    def get_item_value(self, itemName: str) -> str | list[str]:
+        """Returns the value of item itemName (KeyError if not in entry)"""
+        return self.items[itemName].value
 
-    def add_item(self, newItem_name, newItem_type, newItem_value):
+    def has_item(self, itemName: str) -> bool:
         """
-        Add a new item to the DataBaseEntry
+        Check if a entry has an item with name itemName
         """
-        self.check_passed_items(newItem_name, newItem_type, newItem_value)
-        if newItem_name in self.names:
-            raise RuntimeError(
-                "Entry already has item with name {0}".format(newItem_name)
-            )
-        self.names.append(newItem_name)
-        if newItem_type == "List":
-            self.items[newItem_name] = ListItem(newItem_name, newItem_value)
-        else:
-            self.items[newItem_name] = Item(newItem_name, newItem_value)
+        return str(itemName) in self.items
 
-        setattr(self, newItem_name, self.items[newItem_name].value)
-
-    def change_item_value(self, itemName, newValue):
+    def change_item_value(self, itemName: str, newValue: str) -> None:
         """
         Change value if a Item
         """
         self.check_passed_items(itemName)
         if not self.has_item(itemName):
             raise KeyError("Name {0} is not in names".format(itemName))
-        if (
-            not type(self.items[itemName]) == Item
-        ):  # pylint: disable=unidiomatic-typecheck
+        if isinstance(self.items[itemName], ListItem):
             raise RuntimeError("Item {0} is not if type Item".format(itemName))
+        old_value = self.items[itemName].value
         self.items[itemName].replace(newValue)
         setattr(self, itemName, self.items[itemName].value)
+        if old_value != newValue:
+            self.notify(itemName, [old_value], [newValue])
 
-    def add_item_value(self, itemName, newValue):
+    def add_item_value(self, itemName: str, newValue: str | list[str]) -> None:
         """
         Add a value to a ListItem
         """
@@ -137,10 +115,12 @@ class DataBaseEntry:
             raise KeyError("Name {0} is not in names".format(itemName))
         if not isinstance(self.items[itemName], ListItem):
             raise RuntimeError("Item {0} is not if type ListItem".format(itemName))
+        old_values = list(self.items[itemName].value)
         self.get_item(itemName).add(newValue)
         setattr(self, itemName, self.items[itemName].value)
+        self.notify_list_change(itemName, old_values)
 
-    def remove_item_value(self, itemName, oldValue):
+    def remove_item_value(self, itemName: str, oldValue: str | int) -> None:
         """
         Remove a Value from a ListItem
         """
@@ -149,9 +129,12 @@ class DataBaseEntry:
             raise KeyError("Name {0} is not in names".format(itemName))
         if not isinstance(self.items[itemName], ListItem):
             raise RuntimeError("Item {0} is not if type ListItem".format(itemName))
+        old_values = list(self.items[itemName].value)
         self.get_item(itemName).remove(oldValue)
+        setattr(self, itemName, self.items[itemName].value)
+        self.notify_list_change(itemName, old_values)
 
-    def replace_item_value(self, itemName, newValue, oldValue):
+    def replace_item_value(self, itemName: str, newValue: str, oldValue: str) -> None:
         """
         Replace value oldValue with new Value
         """
@@ -160,13 +143,43 @@ class DataBaseEntry:
             raise KeyError("Name {0} is not in names".format(itemName))
         if not isinstance(self.items[itemName], ListItem):
             raise RuntimeError("Item {0} is not if type ListItem".format(itemName))
+        old_values = list(self.items[itemName].value)
         self.get_item(itemName).remove(oldValue)
         self.get_item(itemName).add(newValue)
         setattr(self, itemName, self.items[itemName].value)
+        self.notify_list_change(itemName, old_values)
         # self.removeItemValue(itemName, oldValue)
         # self.addItemValue(itemName, newValue)
 
-    def get_dict_repr(self):
+    def notify(self, itemName: str, removed: list[str], added: list[str]) -> None:
+        """
+        Pass a value change of item itemName to the observer (if one is set)
+
+        Args:
+            itemName (str) : Name of the changed item
+            removed (list) : Values no longer present in the item
+            added (list) : Values new to the item
+        """
+        if self.observer is not None and (removed or added):
+            self.observer(self, itemName, removed, added)
+
+    def notify_list_change(self, itemName: str, old_values: list[str]) -> None:
+        """
+        Helper that compares the values of ListItem itemName before a change with
+        the current ones and notifies the observer about the difference
+        """
+        if self.observer is None:
+            return
+        new_values = self.items[itemName].value
+        old_set = set(old_values)
+        new_set = set(new_values)
+        self.notify(
+            itemName,
+            [v for v in old_set if v not in new_set],
+            [v for v in new_set if v not in old_set],
+        )
+
+    def get_dict_repr(self) -> dict:
         """
         Convert Database entry to a dictionary representation
         """
@@ -177,18 +190,22 @@ class DataBaseEntry:
                 dictRepr[name]["type"] = "List"
             else:
                 dictRepr[name]["type"] = "Single"
-            dictRepr[name]["value"] = self.items[name].value
+            dictRepr[name]["value"] = self.get_item_value(name)
         return dictRepr
 
-    def __eq__(self, other):
+    def __eq__(self, other: object) -> bool:
         """
-        Implementation of equalitiy relation for DataBaseEntry class
+        Implementation of equalitiy relation for entries. Entries are equal if they
+        have the same items with the same values (independent of the order of the
+        items and of the entry class)
         """
-        if isinstance(other, self.__class__):
-            if self.names != other.names:
+        if isinstance(other, EntryBase):
+            if len(self.names) != len(other.names) or set(self.names) != set(
+                other.names
+            ):
                 return False
-            for item in self.items:
-                if self.items[item].getValue() != other.items[item].getValue():
+            for item in self.names:
+                if self.get_item_value(item) != other.get_item_value(item):
                     return False
             return True
         else:
@@ -202,7 +219,11 @@ class DataBaseEntry:
         return repres
 
     @staticmethod
-    def check_passed_items(passedName=None, passedType=None, passedValue=None):
+    def check_passed_items(
+        passedName: str | None = None,
+        passedType: str | None = None,
+        passedValue: str | list[str] | None = None,
+    ) -> None:
         """
         Helper function for checking items passed to DataBaseEntry and raising
         exceptions
@@ -222,6 +243,63 @@ class DataBaseEntry:
             raise TypeError(msg)
 
 
+class DataBaseEntry(EntryBase):
+    """
+    The Entry class describes all information stored in an database entry
+
+    Args:
+        initItems (list) : Each Item has to be a tuple of ItemName, ItemType ("Single"
+                           or "List") and InitValues
+    Attributes:
+        names (list) : List of all item names in entry\n
+        items (dict) : Dictionary with all Item/ListItem objects\n
+        observer (callable) : Called as observer(entry, itemName, removed, added)
+                              after every value change. Used by the DataBase to
+                              keep its indexes up to date
+        key (int) : Row key assigned by the EntryStore of a database (None if the
+                    entry is not in a database)
+    Raises:
+        TypeError : If initItems is not of type list\n
+        TypeError : If initItems is no list of tuples\n
+        RuntimeError : If the tuple of initItems is invalid (not exactly three of type
+                       str, typ, str/int/float
+    """
+
+    def __init__(self, init_items: list[tuple[str, str, str | list[str]]]) -> None:
+        self.check_init_items(init_items)
+        self.names = []
+        self.items = {}
+        self.observer = None
+        self.key = None
+        for item_name, item_type, item_value in init_items:
+            self.names.append(item_name)
+            if item_type == "List":
+                self.items[item_name] = ListItem(item_name, item_value)
+            else:
+                self.items[item_name] = Item(item_name, item_value)
+        for item in self.names:
+            setattr(self, item, self.items[item].value)
+
+    def add_item(
+        self, newItem_name: str, newItem_type: str, newItem_value: str | list[str]
+    ) -> None:
+        """
+        Add a new item to the DataBaseEntry
+        """
+        self.check_passed_items(newItem_name, newItem_type, newItem_value)
+        if newItem_name in self.names:
+            raise RuntimeError(
+                "Entry already has item with name {0}".format(newItem_name)
+            )
+        self.names.append(newItem_name)
+        if newItem_type == "List":
+            self.items[newItem_name] = ListItem(newItem_name, newItem_value)
+        else:
+            self.items[newItem_name] = Item(newItem_name, newItem_value)
+
+        setattr(self, newItem_name, self.items[newItem_name].value)
+
+
 class Item:
     """
     Entry that contains a list of specs
@@ -233,11 +311,13 @@ class Item:
         name (str) : This is the name of the Item
     """
 
-    def __init__(self, name, value) -> None:
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str, value: str) -> None:
         self.name = name
         self.value = value
 
-    def replace(self, newValue):
+    def replace(self, newValue: str) -> None:
         """
         Replace value of Item
 
@@ -246,7 +326,7 @@ class Item:
         """
         self.value = newValue
 
-    def get_value(self):
+    def get_value(self) -> str | list[str]:
         """Returns the value of the entry"""
         return self.value
 
@@ -269,7 +349,9 @@ class ListItem(Item):
         TypError: Raises error when valies is not str or list
     """
 
-    def __init__(self, name, values) -> None:
+    __slots__ = ()
+
+    def __init__(self, name: str, values: str | list[str]) -> None:
         super().__init__(name, None)
         if not isinstance(values, (str, list)):
             raise TypeError
@@ -277,7 +359,7 @@ class ListItem(Item):
             values = [values]
         self.value = values
 
-    def add(self, val_2_add):
+    def add(self, val_2_add: str | list[str]) -> bool:
         """
         Add a value to the list of values in ListItem
 
@@ -304,7 +386,7 @@ class ListItem(Item):
             self.value = self.value + unique_elem
             return True
 
-    def remove(self, to_remove):
+    def remove(self, to_remove: str | int) -> None:
         """
         Removes a value for the ListItem
 
@@ -334,3 +416,189 @@ class ListItem(Item):
             if to_remove > len(self.value) - 1:
                 raise IndexError
             self.value.pop(to_remove)
+
+
+class BoundItem(Item):
+    """
+    Item view on the value of a CompactEntry. Reading and writing value accesses
+    the attribute of the entry, so all methods of Item work on the entry. Item.__init__
+    is not called because it would overwrite the value of the entry.
+    """
+
+    __slots__ = ("entry",)
+
+    def __init__(self, entry: "CompactEntry", name: str) -> None:
+        self.entry = entry
+        self.name = name
+
+    @property
+    def value(self) -> str | list[str]:
+        return getattr(self.entry, self.name)
+
+    @value.setter
+    def value(self, newValue: str | list[str]) -> None:
+        setattr(self.entry, self.name, newValue)
+
+
+class BoundListItem(BoundItem, ListItem):
+    """ListItem view on the values of a CompactEntry (see BoundItem)"""
+
+    __slots__ = ()
+
+
+class ItemsView(Mapping):
+    """
+    Read-only mapping item name -> BoundItem/BoundListItem of a CompactEntry. Used
+    in place of the items dict of a DataBaseEntry.
+    """
+
+    __slots__ = ("entry",)
+
+    def __init__(self, entry: "CompactEntry") -> None:
+        self.entry = entry
+
+    def __getitem__(self, itemName: str) -> BoundItem:
+        if itemName not in self.entry.item_types:
+            raise KeyError(itemName)
+        if self.entry.item_types[itemName] == "List":
+            return BoundListItem(self.entry, itemName)
+        return BoundItem(self.entry, itemName)
+
+    def __contains__(self, itemName: object) -> bool:
+        return itemName in self.entry.item_types
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entry.names)
+
+    def __len__(self) -> int:
+        return len(self.entry.names)
+
+
+class CompactEntry(EntryBase):
+    """
+    Base class for the entry classes generated from a model (see make_entry_class).
+    The values are stored in slots named after the items, so an entry needs no
+    names list, items dict, Item objects and __dict__. The items attribute is a
+    view creating Item objects bound to the entry on access, so the API of
+    DataBaseEntry is unchanged. Items can not be added to compact entries.
+
+    Attributes:
+        names (list) : Item names of the model (class attribute)
+        item_types (dict) : Item name -> Single or List (class attribute)
+    """
+
+    __slots__ = ("observer", "key")
+    names: ClassVar[list[str]] = []
+    item_types: ClassVar[dict[str, str]] = {}
+
+    def __init__(self, init_items: list[tuple[str, str, str | list[str]]]) -> None:
+        self.check_init_items(init_items)
+        if [name for name, _, _ in init_items] != self.names:
+            raise RuntimeError(
+                "Items {0} do not match the items of the entry class".format(
+                    [name for name, _, _ in init_items]
+                )
+            )
+        self.observer = None
+        self.key = None
+        for item_name, item_type, item_value in init_items:
+            if item_type != self.item_types[item_name]:
+                raise RuntimeError(
+                    "Item {0} is not of type {1}".format(item_name, item_type)
+                )
+            if item_type == "List":
+                item_value = ListItem(item_name, item_value).value
+            setattr(self, item_name, item_value)
+
+    @property
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def __reduce__(self) -> tuple:
+        """Generated classes are not importable, so the class is rebuilt on unpickle"""
+        state = {name: getattr(self, name) for name in ["observer", "key", *self.names]}
+        return (
+            _restore_entry,
+            (type(self).__name__, list(self.item_types.items()), state),
+        )
+
+    def get_item_value(self, itemName: str) -> str | list[str]:
+        if itemName not in self.item_types:
+            raise KeyError(itemName)
+        return getattr(self, itemName)
+
+    def has_item(self, itemName: str) -> bool:
+        return str(itemName) in self.item_types
+
+    def get_dict_repr(self) -> dict:
+        return {
+            name: {"type": item_type, "value": getattr(self, name)}
+            for name, item_type in self.item_types.items()
+        }
+
+    def add_item(
+        self, newItem_name: str, newItem_type: str, newItem_value: str | list[str]
+    ) -> None:
+        raise RuntimeError("Items of {0} are fixed".format(type(self).__name__))
+
+    @classmethod
+    def accepts(
+        cls: type["CompactEntry"], init_items: list[tuple[str, str, str | list[str]]]
+    ) -> bool:
+        """Returns True if init_items (see DataBaseEntry) match the entry class"""
+        return len(init_items) == len(cls.names) and all(
+            name == item_name and cls.item_types[name] == item_type
+            for (name, item_type, _), item_name in zip(init_items, cls.names)
+        )
+
+
+_entry_classes = {}
+
+
+def _restore_entry(
+    class_name: str, items: list[tuple[str, str]], state: dict
+) -> CompactEntry:
+    """Helper restoring a pickled CompactEntry"""
+    entry = object.__new__(make_entry_class(class_name, items))
+    for name, value in state.items():
+        setattr(entry, name, value)
+    return entry
+
+
+def make_entry_class(
+    class_name: str, items: list[tuple[str, str]]
+) -> type[CompactEntry] | None:
+    """
+    Generate a CompactEntry class with slots for the passed items
+
+    Args:
+        class_name (str) : Name of the generated class
+        items (list) : Tuples of (item name, Single or List) in order of the items
+
+    Returns:
+        type : Generated class or None if an item name can not be used as slot
+    """
+    cache_key = (class_name, tuple(items))
+    if cache_key in _entry_classes:
+        return _entry_classes[cache_key]
+    names = [name for name, _ in items]
+    for name in names:
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name.startswith("__")
+            or hasattr(CompactEntry, name)
+        ):
+            logger.warning("Item %s can not be used for a compact entry class", name)
+            return None
+    _entry_classes[cache_key] = type(
+        class_name,
+        (CompactEntry,),
+        {
+            "__slots__": tuple(names),
+            "__doc__": "Entry with the items {0}".format(", ".join(names)),
+            "names": names,
+            "item_types": dict(items),
+        },
+    )
+    return _entry_classes[cache_key]
@@ -0,0 +1,80 @@
+"""
+Key-addressed container for the entries of a database. Every entry gets an internal
+integer row key that is independent of its (user-visible) ID item.
+"""
+from collections.abc import Iterable, Iterator, KeysView
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mimir.backend.entry import EntryBase
+
+
+class EntryStore:
+    """
+    Ordered store of DataBaseEntry objects addressed by row keys. Keys are assigned
+    on insertion and never reused or changed, so the internal structures of the
+    database can reference entries by key while the ID of an entry changes. Adding
+    and removing entries is O(1). Iteration follows the insertion order.
+
+    Args:
+        entries (iterable) : Initial entries
+
+    Attributes:
+        next_key (int) : Key assigned to the next added entry
+        _entries (dict) : Key -> DataBaseEntry
+    """
+
+    def __init__(self, entries: Iterable["EntryBase"] = ()) -> None:
+        self.next_key = 0
+        self._entries = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: "EntryBase") -> int:
+        """Add an entry and set its key attribute. Returns the key of the entry"""
+        key = self.next_key
+        self.next_key += 1
+        entry.key = key
+        self._entries[key] = entry
+        return key
+
+    def remove(self, entry: "EntryBase") -> None:
+        """
+        Remove an entry and reset its key attribute
+
+        Raises:
+            KeyError : If the entry is not in the store
+        """
+        if entry not in self:
+            raise KeyError("Entry with key {0} not in store".format(entry.key))
+        del self._entries[entry.key]
+        entry.key = None
+
+    def keys(self) -> KeysView[int]:
+        """Returns a view on the keys of all entries"""
+        return self._entries.keys()
+
+    def __getitem__(self, key: int) -> "EntryBase":
+        """Returns the entry with key. Raises KeyError if the key is not used"""
+        return self._entries[key]
+
+    def __contains__(self, entry: object) -> bool:
+        key = getattr(entry, "key", None)
+        return key is not None and self._entries.get(key) is entry
+
+    def __iter__(self) -> Iterator["EntryBase"]:
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __eq__(self, other: object) -> bool:
+        """Stores compare equal to stores and lists with equal entries in order"""
+        if isinstance(other, (EntryStore, list, tuple)):
+            return len(self) == len(other) and all(
+                entry == other_entry for entry, other_entry in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "EntryStore({0} entries)".format(len(self))
@@ -0,0 +1,111 @@
+"""
+Content hashes of database entries. Used to compare databases and to detect
+unsaved changes without reading the saved database (see DataBase.get_status).
+"""
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mimir.backend.entry import EntryBase
+
+logger = logging.getLogger(__name__)
+
+# The root hash is the sum of all entry hashes modulo 2**HASH_BITS
+HASH_BITS = 128
+
+
+def entry_hash(entry: "EntryBase") -> int:
+    """Returns the content hash (int) of the dict representation of entry"""
+    digest = hashlib.blake2b(
+        json.dumps(entry.get_dict_repr(), separators=(",", ":")).encode("utf-8"),
+        digest_size=HASH_BITS // 8,
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ContentHashes:
+    """
+    Content hashes of all entries of a database (by row key) and the root hash
+    combining them. The root is the sum of the entry hashes, so it does not depend
+    on the order of the entries and is updated in O(1) when one entry changes.
+    Entries are only marked as changed on modification and rehashed when a hash is
+    requested.
+
+    Attributes:
+        hashes (dict) : Row key -> content hash
+        root (int) : Sum of all hashes in hashes (without pending entries)
+        _pending (dict) : Row key -> entry that have to be (re)hashed
+    """
+
+    def __init__(self) -> None:
+        self.hashes = {}
+        self.root = 0
+        self._pending = {}
+
+    def mark(self, entry: "EntryBase") -> None:
+        """Mark entry as added or changed"""
+        self._pending[entry.key] = entry
+
+    def remove(self, key: int) -> None:
+        """Remove the hash of the entry with row key key"""
+        self._pending.pop(key, None)
+        old_hash = self.hashes.pop(key, None)
+        if old_hash is not None:
+            self.root = (self.root - old_hash) % (1 << HASH_BITS)
+
+    def flush(self) -> None:
+        """Hash all pending entries"""
+        mask = 1 << HASH_BITS
+        for key, entry in self._pending.items():
+            new_hash = entry_hash(entry)
+            self.root = (self.root + new_hash - self.hashes.get(key, 0)) % mask
+            self.hashes[key] = new_hash
+        self._pending = {}
+
+    def get(self, key: int) -> int:
+        """Returns the content hash of the entry with row key key"""
+        if key in self._pending:
+            self.flush()
+        return self.hashes[key]
+
+    def root_hash(self) -> str:
+        """Returns the root hash as hex string"""
+        self.flush()
+        return "{0:0{1}x}".format(self.root, HASH_BITS // 4)
+
+
+class DataBaseDiff:
+    """
+    Differences between two databases with entries matched by ID (see DataBase.diff)
+
+    Attributes:
+        added (list) : Entries only in the database
+        removed (list) : Entries only in the other database
+        changed (list) : Tuples of (entry, other entry) with the same ID but
+                         different content
+    """
+
+    def __init__(self) -> None:
+        self.added = []
+        self.removed = []
+        self.changed = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        """Returns a human readable summary of the differences"""
+        lines = [
+            "Added: {0}, Removed: {1}, Changed: {2}".format(
+                len(self.added), len(self.removed), len(self.changed)
+            )
+        ]
+        for entry in self.added:
+            lines.append("  Added {0}: {1}".format(entry.ID, entry.Path))
+        for entry in self.removed:
+            lines.append("  Removed {0}: {1}".format(entry.ID, entry.Path))
+        for entry, _ in self.changed:
+            lines.append("  Changed {0}: {1}".format(entry.ID, entry.Path))
+        return "\n".join(lines)
@@ -1,22 +1,47 @@
 """Helper functions for mimir modules"""
 import datetime
 import logging
+from collections import Counter, deque
+from collections.abc import Iterator
+
+import mimir.backend.datecodec
 
 logger = logging.getLogger(__name__)
 
 
 class IdQueue:
+    """
+    Queue of the last max_len appended elements with O(1) append and membership
+    test (deque + counts of the contained elements)
+    """
+
     def __init__(self, max_len: int) -> None:
-        self.container = []
+        self.container = deque(maxlen=max_len)
         self.max_len = max_len
+        self._counts = Counter()
 
     def append(self, elem) -> None:
+        if not self.max_len:
+            return
+        if len(self.container) == self.max_len:
+            dropped = self.container[0]
+            self._counts[dropped] -= 1
+            if self._counts[dropped] <= 0:
+                del self._counts[dropped]
         self.container.append(elem)
-        if len(self.container) > self.max_len:
-            self.container.pop(0)
+        self._counts[elem] += 1
 
     def containes(self, elem) -> bool:
-        return elem in self.container
+        return elem in self._counts
+
+    def __contains__(self, elem: object) -> bool:
+        return elem in self._counts
+
+    def __iter__(self) -> Iterator:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self.container)
 
 
 def getTimeFormatted(retFormat, delimDate=".", inverted=False):
@@ -57,36 +82,35 @@ def getTimeFormatted(retFormat, delimDate=".", inverted=False):
 def sortDateTime(list2Sort):
     """
     Helper function to convert the datetime values from getTimeFormatted() back
-    to datetime objects and return them in a sorted list
+    to datetime objects and return them in a sorted list. Values without date and
+    time (e.g. default values) are sorted as 01.01.00|00:00:00.
+
+    Raises:
+        RuntimeError : If a value with date and time is not a valid date
     """
-    datetimeObj = []
+    default = mimir.backend.datecodec.to_epoch("01.01.00|00:00:00")
+    epochs = []
     for elem in list2Sort:
         try:
-            datetimeObj.append(convertToDateTime(elem))
-        except TypeError:
-            logger.debug("Converting %s to 01.01.00|00:00:00" % elem)
-            datetimeObj.append(convertToDateTime("01.01.00|00:00:00"))
-    datetimeObj = sorted(datetimeObj, reverse=True)
-    retList = []
-    for elem in datetimeObj:
-        retList.append(
-            "{0:02}.{1:02}.{2:02}|{3:02}:{4:02}:{5:02}".format(
-                elem.day,
-                elem.month,
-                elem.year - 2000,
-                elem.hour,
-                elem.minute,
-                elem.second,
-            )
-        )
-
-    return retList
+            epochs.append(mimir.backend.datecodec.to_epoch(elem))
+        except ValueError as error:
+            if len(elem.split("|")) == 2:
+                raise RuntimeError(
+                    "Date is expected as DD.MM.YY|HH:MM:SS but is {0}".format(elem)
+                ) from error
+            logger.debug("Converting %s to 01.01.00|00:00:00", elem)
+            epochs.append(default)
+    return mimir.backend.datecodec.from_epochs(sorted(epochs, reverse=True))
 
 
 def convertToDateTime(internalString):
     """
     Helper function to convert an internal datestring back to a datetime object
     """
+    try:
+        return mimir.backend.datecodec.to_datetime(internalString)
+    except ValueError:
+        pass
     if len(internalString.split("|")) != 2:
         raise TypeError(
             "Element is expected to be of form DD.MM.YY|HH:MM:SS but is %s"
@@ -0,0 +1,121 @@
+"""
+Append-only change journal for the Mimir database. The journal is written next to
+the saved database (checkpoint) and contains the changes since the checkpoint was
+written. Each line is one json record. The changes of one save are terminated by a
+commit record so a partially written save (e.g. after a crash) is ignored on replay.
+"""
+import json
+import logging
+import os
+from collections.abc import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Journal of changes on top of a checkpoint file. The first record of the journal
+    identifies the checkpoint (inode, size and modification time). A journal that
+    does not match the current checkpoint is outdated and will not be replayed.
+
+    Args:
+        path (str) : Path of the journal file
+
+    Records:
+        {"op": "checkpoint", "ino": .., "size": .., "mtime_ns": ..} : Header
+        {"op": "put", "entry": {..}} : Entry (dict representation) added or changed
+        {"op": "delete", "id": ".."} : Entry with ID removed
+        {"op": "commit"} : All records since the last commit are valid
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def exists(self) -> bool:
+        """Returns True if a journal file exists"""
+        return os.path.exists(self.path)
+
+    def size(self) -> int:
+        """Size of the journal file in bytes"""
+        if not self.exists():
+            return 0
+        return os.path.getsize(self.path)
+
+    @staticmethod
+    def get_checkpoint_header(checkpoint_path: str) -> dict:
+        """Returns the header record identifying the checkpoint file"""
+        stat = os.stat(checkpoint_path)
+        return {
+            "op": "checkpoint",
+            "ino": stat.st_ino,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def matches(self, checkpoint_path: str) -> bool:
+        """Returns True if the journal was started for the current checkpoint"""
+        if not self.exists() or not os.path.exists(checkpoint_path):
+            return False
+        with open(self.path) as journal_file:
+            header = journal_file.readline()
+        try:
+            header_record = json.loads(header)
+        except json.JSONDecodeError:
+            return False
+        return header_record == self.get_checkpoint_header(checkpoint_path)
+
+    def start(self, checkpoint_path: str) -> None:
+        """Start a new (empty) journal for the checkpoint"""
+        self._write([self.get_checkpoint_header(checkpoint_path)], "w")
+
+    def append(self, records: Iterable[dict]) -> None:
+        """
+        Append records followed by a commit record to the journal. The data is
+        flushed to disk before returning.
+        """
+        self._write([*records, {"op": "commit"}], "a")
+
+    def _write(self, records: list[dict], mode: str) -> None:
+        lines = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        )
+        with open(self.path, mode) as journal_file:
+            journal_file.write(lines)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def replay(self) -> Iterator[dict]:
+        """
+        Iterate over all committed records (without header and commit records).
+        Records after the last commit are skipped.
+        """
+        if not self.exists():
+            return
+        pending = []
+        with open(self.path) as journal_file:
+            for i_line, line in enumerate(journal_file):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        "Journal %s is truncated at line %s. Ignoring the rest",
+                        self.path,
+                        i_line,
+                    )
+                    break
+                if record["op"] == "checkpoint":
+                    continue
+                if record["op"] == "commit":
+                    yield from pending
+                    pending = []
+                else:
+                    pending.append(record)
+        if pending:
+            logger.warning(
+                "Ignoring %s uncommitted records in %s", len(pending), self.path
+            )
+
+    def clear(self) -> None:
+        """Remove the journal"""
+        if self.exists():
+            os.remove(self.path)
@@ -0,0 +1,190 @@
+"""
+Matching of known item values in file paths. Used for suggesting values of the
+SecondaryDBs items for new files (see DataBase.get_items_by_path).
+"""
+import logging
+from collections import deque
+from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton finding all patterns that occur in a text with one pass
+    over the text (independent of the number of patterns).
+
+    Args:
+        patterns (iterable) : Patterns (str) to search for
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        """Add a pattern to the trie"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        self._out[node] = (pattern,)
+
+    def _build(self) -> None:
+        """Set the failure links and merge the outputs along them (BFS)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == next_node:
+                    fail = 0
+                self._fail[next_node] = fail
+                self._out[next_node] = self._out[next_node] + self._out[fail]
+
+    def find(self, text: str) -> set[str]:
+        """Returns the set of patterns that occur in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class PathMatcher:
+    """
+    Compiled form of the values of multiple items for matching them in file paths.
+    All lookup tables and the automaton for partial matches are built once, so
+    matching many paths only costs time proportional to the length of the paths.
+
+    Matching (see match):
+
+        1. Path elements (split at /) equal to a value (case insensitive) are
+           matched. With whitespace_match values with whitespace also match if the
+           whitespace is replaced by one of the separators
+        2. The last path element not matched in 1. is split at the separators and
+           all values occurring in the parts are matched (not with fast). Values
+           with whitespace are matched if one of their words occurs. Single
+           characters are ignored
+
+    Args:
+        values (dict) : Item -> iterable of values
+        separators (list) : Separators used in file names
+        extentions (list) : File extentions removed from the paths
+
+    Attributes:
+        exact (dict) : Item -> set of lowercase values
+        exact_whitespace (dict) : Item -> lowercase values and their variants with
+                                  the whitespace replaced by the separators
+        whitespace_variants (dict) : Variant -> lowercase value
+        words (dict) : Item -> lowercase values with whitespace split into words
+        word_values (dict) : Word -> lowercase values with whitespace containing it
+        original (dict) : Item -> lowercase value -> value
+    """
+
+    def __init__(
+        self,
+        values: dict[str, Iterable[str]],
+        separators: list[str],
+        extentions: list[str],
+    ) -> None:
+        self.separators = separators
+        self.extentions = extentions
+        self.exact = {}
+        self.exact_whitespace = {}
+        self.whitespace_variants = {}
+        self.words = {}
+        self.word_values = {}
+        self.original = {}
+        for item, item_values in values.items():
+            item_values = list(item_values)
+            self.original[item] = {value.lower(): value for value in item_values}
+            self.exact[item] = set(self.original[item])
+            self.exact_whitespace[item] = set(self.exact[item])
+            self.words[item] = set()
+            for value in self.exact[item]:
+                if " " in value:
+                    for sep in separators:
+                        variant = value.replace(" ", sep)
+                        self.exact_whitespace[item].add(variant)
+                        self.whitespace_variants[variant] = value
+                    for word in value.split(" "):
+                        self.words[item].add(word)
+                        self.word_values.setdefault(word, []).append(value)
+                else:
+                    self.words[item].add(value)
+        self.automaton = AhoCorasick(
+            {word for words in self.words.values() for word in words if len(word) > 1}
+        )
+        self._word_items = {}
+        for item, words in self.words.items():
+            for word in words:
+                self._word_items.setdefault(word, []).append(item)
+        logger.debug("Built path matcher with %s words", len(self._word_items))
+
+    def split(self, element: str) -> set[str]:
+        """Returns the set of parts of element split at all separators"""
+        parts = [element]
+        for separator in self.separators:
+            parts = [part for elem in parts for part in elem.split(separator)]
+        return set(parts)
+
+    def match(
+        self, full_file_name: str, fast: bool = False, whitespace_match: bool = True
+    ) -> dict[str, set[str]]:
+        """
+        Returns the values (item -> set) matched in the passed path
+
+        Args:
+            full_file_name (str) : Path of a file
+            fast (bool) : Only match complete path elements
+            whitespace_match (bool) : Match values with whitespace replaced by a
+                                      separator in complete path elements
+        """
+        found_options = {item: [] for item in self.exact}
+        for file_type in self.extentions:
+            if full_file_name.endswith(file_type):
+                full_file_name = full_file_name.replace("." + file_type, "")
+                break
+        path_elements = full_file_name.lower().split("/")
+        exact = self.exact_whitespace if whitespace_match else self.exact
+        rem_unsplit_elements = list(path_elements)
+        for elem in path_elements:
+            for item in found_options:
+                if elem in exact[item]:
+                    if whitespace_match:
+                        found_options[item].append(
+                            self.whitespace_variants.get(elem, elem)
+                        )
+                    else:
+                        found_options[item].append(elem)
+                    if elem in rem_unsplit_elements:
+                        rem_unsplit_elements.remove(elem)
+        if not fast and rem_unsplit_elements:
+            for element in self.split(rem_unsplit_elements[-1]):
+                for word in self.automaton.find(element):
+                    for item in self._word_items[word]:
+                        found_options[item] += self.word_values.get(word, [word])
+        return {
+            item: {self.original[item].get(option, option) for option in options}
+            for item, options in found_options.items()
+        }
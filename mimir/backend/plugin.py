@@ -1,17 +1,23 @@
 """
 Module for processing plugins set for certain Items in the model definition
 """
+import json
 import logging
 import os
 import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 
 import hachoir.metadata
 import hachoir.parser
+import hachoir.stream
 
 logger = logging.getLogger(__name__)
 
 
-def get_VideoMetaData(fileName):
+def get_VideoMetaData(fileName: str) -> dict[str, str]:
     """
     Get video metadata for height, weight and duration using hachior.
 
@@ -54,7 +60,7 @@ def get_VideoMetaData(fileName):
     }
 
 
-def get_osData(filename, SF=1e9):
+def get_osData(filename: str, SF: float = 1e9) -> dict[str, str]:
     """
     Get information of the file from the os
 
@@ -70,22 +76,19 @@ def get_osData(filename, SF=1e9):
     return {"size": "{0:.2f}".format(filesize)}
 
 
-def getPluginValues(fileName, pluginDefs, modules=["VideoMetaData", "osData"]):
+def checkPluginDefinitions(
+    pluginDefs: list[str], modules: list[str] = ["VideoMetaData", "osData"]
+) -> None:
     """
-    Wrapper that can decode the definitions in the database model for the plugin
+    Check the plugin definitions of the database model
 
     Args:
-        fileName (str) : Path to a file
         pluginDefs (list) : List of plugins (in form module:value)
-                            -> Get from model.pluginDefinitions
-        modules (list) : Not intended to be passed by user. Just defines the plugins
-                         usable
+        modules (list) : Plugins modules that can be used
 
-    Returns:
-        dict : Dict keys are module:value and values are the plugin return values
+    Raises:
+        ValueError : If a definition is invalid or uses an unknown module
     """
-    runVideoMetaData = False
-    runosData = False
     for definition in pluginDefs:
         check = re.search("[a-zA-Z0-9]+:[a-zA-Z0-9]+", definition)
         if check is None:
@@ -100,6 +103,39 @@ def getPluginValues(fileName, pluginDefs, modules=["VideoMetaData", "osData"]):
         module, value = definition.split(":")
         if module not in modules:
             raise ValueError("Module %s not defined")
+
+
+def getPluginValues(
+    fileName: str,
+    pluginDefs: list[str],
+    modules: list[str] = ["VideoMetaData", "osData"],
+    cache: "PluginCache | None" = None,
+) -> dict[str, str]:
+    """
+    Wrapper that can decode the definitions in the database model for the plugin
+
+    Args:
+        fileName (str) : Path to a file
+        pluginDefs (list) : List of plugins (in form module:value)
+                            -> Get from model.pluginDefinitions
+        modules (list) : Not intended to be passed by user. Just defines the plugins
+                         usable
+        cache (PluginCache) : If passed, the values are taken from the cache if the
+                              file did not change and stored otherwise
+
+    Returns:
+        dict : Dict keys are module:value and values are the plugin return values
+    """
+    checkPluginDefinitions(pluginDefs, modules)
+    if cache is not None:
+        values = cache.get_many([fileName], pluginDefs)[0]
+        if values is None:
+            values = getPluginValues(fileName, pluginDefs, modules)
+            cache.put_many([(fileName, values)], pluginDefs)
+        return values
+    runVideoMetaData = False
+    runosData = False
+    for definition in pluginDefs:
         if "VideoMetaData" in definition:
             runVideoMetaData = True
         if "osData" in definition:
@@ -118,3 +154,224 @@ def getPluginValues(fileName, pluginDefs, modules=["VideoMetaData", "osData"]):
         else:
             raise NotImplementedError
     return values
+
+
+def getPluginValues_or_none(
+    fileName: str, pluginDefs: list[str]
+) -> dict[str, str] | None:
+    """
+    Same as getPluginValues but returns None if the plugins fail for the file (the
+    file can not be read or its metadata can not be parsed). Used in the worker
+    processes of getPluginValues_parallel.
+    """
+    try:
+        return getPluginValues(fileName, pluginDefs)
+    except (OSError, ValueError, KeyError, TypeError, hachoir.stream.StreamError):
+        logger.exception("Plugins failed for %s", fileName)
+        return None
+
+
+def getPluginValues_parallel(
+    fileNames: list[str],
+    pluginDefs: list[str],
+    workers: int | None = None,
+    chunk_size: int = 16,
+    cache: "PluginCache | None" = None,
+) -> list[dict[str, str] | None]:
+    """
+    Run getPluginValues for multiple files in a pool of processes.
+
+    Args:
+        fileNames (list) : Paths to the files
+        pluginDefs (list) : List of plugins (in form module:value)
+                            -> Get from model.pluginDefinitions
+        workers (int) : Number of worker processes. Defaults to the number of CPUs.
+                        With one worker the plugins run in the current process
+        chunk_size (int) : Number of files send to a worker at once
+        cache (PluginCache) : If passed, only files without valid cache record are
+                              processed and their results are added to the cache
+
+    Returns:
+        list : Plugin values (see getPluginValues) in the order of fileNames. The
+               element is None for files where the plugins failed
+
+    Raises:
+        ValueError : If a plugin definition is invalid
+    """
+    checkPluginDefinitions(pluginDefs)
+    fileNames = list(fileNames)
+    if cache is not None:
+        values = cache.get_many(fileNames, pluginDefs)
+        missing = [i for i, file_values in enumerate(values) if file_values is None]
+        computed = getPluginValues_parallel(
+            [fileNames[i] for i in missing], pluginDefs, workers, chunk_size
+        )
+        for i, file_values in zip(missing, computed):
+            values[i] = file_values
+        cache.put_many(
+            [(fileNames[i], values[i]) for i in missing if values[i] is not None],
+            pluginDefs,
+        )
+        return values
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(fileNames))
+    if workers <= 1:
+        return [getPluginValues_or_none(f, pluginDefs) for f in fileNames]
+    values = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_values in executor.map(
+                getPluginValues_or_none,
+                fileNames,
+                repeat(pluginDefs),
+                chunksize=chunk_size,
+            ):
+                values.append(file_values)
+    except BrokenProcessPool:
+        logger.error(
+            "Plugin worker died. Using defaults for %s files",
+            len(fileNames) - len(values),
+        )
+    return values + [None] * (len(fileNames) - len(values))
+
+
+class PluginCache:
+    """
+    Persistent cache of plugin values (SQLite file, by default .mimir/plugin_cache).
+    There is one record per file identified by device and inode. A record is only
+    used if size and modification time of the file and the plugin definitions are
+    unchanged. Otherwise it is stale and will be replaced.
+
+    Args:
+        path (str) : Path of the cache file
+
+    Attributes:
+        hits (int) : Number of lookups answered by the cache
+        misses (int) : Number of lookups without valid record
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS records ("
+        "dev INTEGER NOT NULL, ino INTEGER NOT NULL, size INTEGER NOT NULL, "
+        "mtime_ns INTEGER NOT NULL, definitions TEXT NOT NULL, path TEXT NOT NULL, "
+        "plugin_values TEXT NOT NULL, PRIMARY KEY (dev, ino))"
+    )
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache (creates the file if not existing)"""
+        connection = sqlite3.connect(self.path)
+        connection.execute(self.schema)
+        return connection
+
+    @staticmethod
+    def get_definitions_key(pluginDefs: list[str]) -> str:
+        """Returns the string identifying a set of plugin definitions"""
+        return ",".join(sorted(pluginDefs))
+
+    @staticmethod
+    def get_file_key(fileName: str) -> tuple[int, int, int, int] | None:
+        """Returns (dev, ino, size, mtime_ns) of the file or None if it is missing"""
+        try:
+            stat = os.stat(fileName)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def get_many(
+        self, fileNames: list[str], pluginDefs: list[str]
+    ) -> list[dict[str, str] | None]:
+        """
+        Look up the plugin values of multiple files
+
+        Returns:
+            list : Plugin values of the files (None if no valid record exists)
+        """
+        definitions = self.get_definitions_key(pluginDefs)
+        values = []
+        connection = self.connect()
+        try:
+            for fileName in fileNames:
+                file_key = self.get_file_key(fileName)
+                record = None
+                if file_key is not None:
+                    record = connection.execute(
+                        "SELECT plugin_values FROM records WHERE dev = ? AND ino = ? "
+                        "AND size = ? AND mtime_ns = ? AND definitions = ?",
+                        (*file_key, definitions),
+                    ).fetchone()
+                if record is None:
+                    self.misses += 1
+                    values.append(None)
+                else:
+                    self.hits += 1
+                    values.append(json.loads(record[0]))
+        finally:
+            connection.close()
+        logger.debug("Plugin cache: %s hits, %s misses", self.hits, self.misses)
+        return values
+
+    def put_many(
+        self, values: list[tuple[str, dict[str, str]]], pluginDefs: list[str]
+    ) -> None:
+        """
+        Store plugin values. Existing records for the same files are replaced.
+
+        Args:
+            values (list) : List of tuples with file name and plugin values
+            pluginDefs (list) : Plugin definitions used for the values
+        """
+        definitions = self.get_definitions_key(pluginDefs)
+        connection = self.connect()
+        try:
+            with connection:
+                for fileName, file_values in values:
+                    file_key = self.get_file_key(fileName)
+                    if file_key is None:
+                        continue
+                    connection.execute(
+                        "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (*file_key, definitions, fileName, json.dumps(file_values)),
+                    )
+        finally:
+            connection.close()
+
+    def evict(self, fileNames: list[str]) -> int:
+        """
+        Remove stale records. Records are identified by device and inode, so they
+        stay valid if a file is moved or renamed (or the root is mounted elsewhere).
+        A record is stale if no file of the passed scan has its device, inode, size
+        and modification time.
+
+        Args:
+            fileNames (list) : All files of the current scan
+
+        Returns:
+            int : Number of removed records
+        """
+        file_keys = set()
+        for fileName in fileNames:
+            file_key = self.get_file_key(fileName)
+            if file_key is not None:
+                file_keys.add(file_key)
+        connection = self.connect()
+        try:
+            stale = []
+            for dev, ino, size, mtime_ns in connection.execute(
+                "SELECT dev, ino, size, mtime_ns FROM records"
+            ).fetchall():
+                if (dev, ino, size, mtime_ns) not in file_keys:
+                    stale.append((dev, ino))
+            with connection:
+                connection.executemany(
+                    "DELETE FROM records WHERE dev = ? AND ino = ?", stale
+                )
+        finally:
+            connection.close()
+        logger.debug("Evicted %s records from plugin cache", len(stale))
+        return len(stale)
@@ -0,0 +1,212 @@
+"""
+Read-only access to a saved Mimir database without loading all entries. Only the
+position of each entry in mainDB.json is kept in memory and entries are decoded
+on first access.
+"""
+import json
+import logging
+import mmap
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Iterator
+
+import mimir.backend.database
+from mimir.backend.entry import EntryBase, ListItem
+from mimir.backend.storage import JSONStorage, get_storage_backend, iter_json_object
+
+logger = logging.getLogger(__name__)
+
+
+class ReadOnlyDataBase:
+    """
+    Read-only view of a database saved with the json backend. mainDB.json is memory
+    mapped and only a ID/Path -> byte range index is built on initialization. The
+    byte ranges are taken from the offsets written together with mainDB.json (see
+    JSONStorage.load_offsets) or, if they are outdated, by scanning mainDB.json once.
+    Changes in the journal are applied on top. Decoded entries are kept in a LRU
+    cache of size cache_size.
+
+    Modifying the returned entries has no effect on the saved database.
+
+    Args:
+        root (str) : Root directory of the database
+        model_conf (str) : Path to a model. If not set the model of the database is
+                           used
+        cache_size (int) : Maximum number of decoded entries kept in memory
+
+    Raises:
+        RuntimeError : Raised if the folder has no initialized database or the
+                       database is not saved with the json backend
+
+    Attributes:
+        databaseRoot (str) : Points to the root of the database
+        mimirdir (str) : Points to the .mimir dir of the DB
+        savepath (str) : Path of mainDB.json
+        model (Model) : Model of the database
+        cache_size (int) : Maximum number of decoded entries kept in memory
+        _ranges (OrderedDict) : ID -> (start, end) in mainDB.json or dictionary
+                                representation for entries changed in the journal
+        _paths (dict) : Path -> ID
+        _id_paths (dict) : ID -> Path
+        _cache (OrderedDict) : ID -> DataBaseEntry. Most recently used last
+    """
+
+    def __init__(
+        self, root: str, model_conf: str | None = None, cache_size: int = 1000
+    ) -> None:
+        logger.info("Initializing read-only DataBase")
+        self.databaseRoot = root
+        self.mimirdir = root + "/.mimir"
+        if not os.path.exists(self.mimirdir):
+            raise RuntimeError("No .mimir dir existant in {0}".format(root))
+        storage = get_storage_backend(self.mimirdir)
+        if not isinstance(storage, JSONStorage):
+            raise RuntimeError(
+                "Read-only mode requires the json backend (found {0})".format(
+                    storage.name
+                )
+            )
+        self.savepath = storage.savepath
+        if model_conf is None:
+            model_conf = self.mimirdir + "/model.json"
+        self.model = mimir.backend.database.Model(model_conf)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._paths = {}
+        self._id_paths = {}
+        self._ranges = OrderedDict()
+
+        with open(self.savepath, "rb") as save_file:
+            self._mmap = mmap.mmap(save_file.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = storage.load_offsets()
+        if offsets is None:
+            offsets = self._scan_offsets()
+        for entry_id, path, start, end in offsets:
+            self._ranges[entry_id] = (start, end)
+            self._paths[path] = entry_id
+            self._id_paths[entry_id] = path
+
+        if storage.journal.matches(self.savepath):
+            for record in storage.journal.replay():
+                if record["op"] == "put":
+                    entry_id = record["entry"]["ID"]["value"]
+                    self._drop(entry_id)
+                    self._ranges[entry_id] = record["entry"]
+                    self._paths[record["entry"]["Path"]["value"]] = entry_id
+                    self._id_paths[entry_id] = record["entry"]["Path"]["value"]
+                elif record["op"] == "delete":
+                    self._drop(record["id"])
+                else:
+                    raise RuntimeError("Invalid journal record {0}".format(record))
+        logger.info("Indexed %s entries", len(self._ranges))
+
+    def _scan_offsets(self) -> list[list]:
+        """Get the byte range of each entry by scanning mainDB.json"""
+        if re.search(rb"[\x80-\xff]", self._mmap):
+            raise RuntimeError(
+                "{0} is not ascii encoded. Rewrite it with DataBase.compact".format(
+                    self.savepath
+                )
+            )
+        logger.info("Scanning %s for entry positions", self.savepath)
+        offsets = []
+        with open(self.savepath, "rb") as save_file:
+            for path, saved_entry, start, end in iter_json_object(
+                save_file, offsets=True
+            ):
+                offsets.append([saved_entry["ID"]["value"], path, start, end])
+        return offsets
+
+    def _drop(self, entry_id: str) -> None:
+        """Remove an entry from the index (used for journal records)"""
+        self._ranges.pop(entry_id, None)
+        self._cache.pop(entry_id, None)
+        path = self._id_paths.pop(entry_id, None)
+        if self._paths.get(path) == entry_id:
+            del self._paths[path]
+
+    def close(self) -> None:
+        """Release the memory map of mainDB.json"""
+        self._mmap.close()
+
+    def __enter__(self) -> "ReadOnlyDataBase":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __iter__(self) -> Iterator[EntryBase]:
+        """Iterate over all entries in the saved order"""
+        for entry_id in list(self._ranges):
+            yield self.get_entry_by_id(entry_id)
+
+    @property
+    def ids(self) -> list[str]:
+        """IDs of all entries"""
+        return list(self._ranges.keys())
+
+    @property
+    def paths(self) -> list[str]:
+        """Paths of all entries"""
+        return list(self._paths.keys())
+
+    @property
+    def maxID(self) -> int:  # noqa: N802
+        """Highest ID in the database"""
+        return max((int(entry_id) for entry_id in self._ranges), default=-1)
+
+    def get_entry_by_id(self, ret_id: str | int) -> EntryBase:
+        """
+        Returns the entry with the passed ID. Raises IndexError if the ID is not in
+        the database
+        """
+        entry_id = str(ret_id)
+        if entry_id in self._cache:
+            self._cache.move_to_end(entry_id)
+            return self._cache[entry_id]
+        if entry_id not in self._ranges:
+            raise IndexError("Index {0} is out of range of DB".format(entry_id))
+        saved_entry = self._ranges[entry_id]
+        if isinstance(saved_entry, tuple):
+            start, end = saved_entry
+            saved_entry = json.loads(self._mmap[start:end])
+        entry = self.model.entry_from_dict(saved_entry)
+        self._cache[entry_id] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def get_entry_by_path(self, path: str) -> EntryBase:
+        """Returns the entry with the passed path. Raises KeyError if not found"""
+        return self.get_entry_by_id(self._paths[path])
+
+    def get_entry_by_item_name(
+        self, item_name: str, item_value: str
+    ) -> list[EntryBase]:
+        """
+        Returns a list of entries with the passed value for item_name. Lookups of
+        ID and Path use the index, all other items decode all entries.
+        """
+        if item_name not in self.model.allItems:
+            raise KeyError("Arg {0} not in model items".format(item_name))
+        if item_name == "ID":
+            if str(item_value) not in self._ranges:
+                return []
+            return [self.get_entry_by_id(item_value)]
+        if item_name == "Path":
+            if item_value not in self._paths:
+                return []
+            return [self.get_entry_by_path(item_value)]
+        machting_entries = []
+        for entry in self:
+            item = entry.get_item(item_name)
+            if isinstance(item, ListItem):
+                if item_value in item.value:
+                    machting_entries.append(entry)
+            elif item.value == item_value:
+                machting_entries.append(entry)
+        return machting_entries
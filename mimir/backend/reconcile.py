@@ -0,0 +1,160 @@
+"""
+Reconciliation of a database with the filesystem. One scan of the filesystem is
+compared with the database to find moved, missing and new files. The changes can
+be applied in bulk or only reported (dry run).
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mimir.backend.database import DataBase
+
+logger = logging.getLogger(__name__)
+
+
+class ReconcileResult:
+    """
+    Changes found (and applied) by reconcile
+
+    Attributes:
+        moved (list) : Tuples of (ID, old path, new path)
+        missing (list) : Tuples of (ID, path) of entries whose file is missing
+        new_files (list) : Paths of files not in the database
+        id_changes (list) : Tuples of (old ID, new ID) from the ID compaction
+        added (list) : Tuples of (path, ID) of added entries
+        timings (OrderedDict) : Phase -> time in seconds
+        dry_run (bool) : True if the changes were not applied
+    """
+
+    def __init__(self, dry_run: bool) -> None:
+        self.moved = []
+        self.missing = []
+        self.new_files = []
+        self.id_changes = []
+        self.added = []
+        self.timings = OrderedDict()
+        self.dry_run = dry_run
+
+    def summary(self) -> str:
+        """Returns a human readable summary of the changes and timings"""
+        lines = [
+            "Moved: {0}, Missing: {1}, New: {2}, ID changes: {3}, Added: {4}".format(
+                len(self.moved),
+                len(self.missing),
+                len(self.new_files),
+                len(self.id_changes),
+                len(self.added),
+            )
+        ]
+        if self.dry_run:
+            lines[0] = "[Dry run] " + lines[0]
+        for entry_id, old_path, new_path in self.moved:
+            lines.append("  Moved {0}: {1} -> {2}".format(entry_id, old_path, new_path))
+        for entry_id, path in self.missing:
+            lines.append("  Missing {0}: {1}".format(entry_id, path))
+        for path in self.new_files:
+            lines.append("  New: {0}".format(path))
+        lines.append(
+            "Timings: "
+            + ", ".join(
+                "{0} {1:.3f}s".format(phase, seconds)
+                for phase, seconds in self.timings.items()
+            )
+        )
+        return "\n".join(lines)
+
+
+class _PhaseTimer:
+    """Context manager adding the duration of a phase to the timings"""
+
+    def __init__(self, timings: dict[str, float], phase: str) -> None:
+        self.timings = timings
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self) -> "_PhaseTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.timings[self.phase] = time.perf_counter() - self.start
+        logger.info("Phase %s took %.3fs", self.phase, self.timings[self.phase])
+
+
+def reconcile(
+    database: "DataBase",
+    dry_run: bool = False,
+    compact_ids: bool = True,
+    add_new: bool = False,
+) -> ReconcileResult:
+    """
+    Reconcile the database with the filesystem:
+
+        1. scan: Find all files matching the model (once)
+        2. diff: Detect moved files (see DataBase.detect_moves), entries with
+           missing files and new files
+        3. move: Update the Path of moved entries
+        4. remove: Remove the entries with missing files
+        5. renumber: Assign the IDs 0..n-1 in the order of the entries (see
+           DataBase.remove_many and DataBase.renumber)
+        6. add: Create entries for new files
+
+    Steps 3-6 are skipped for dry runs (the ID changes are still computed).
+
+    Args:
+        database (DataBase) : Database to reconcile
+        dry_run (bool) : Only find the changes
+        compact_ids (bool) : Renumber the entries after removing
+        add_new (bool) : Add entries for new files
+
+    Returns:
+        ReconcileResult : Found (and applied) changes
+    """
+    result = ReconcileResult(dry_run)
+    timings = result.timings
+
+    with _PhaseTimer(timings, "scan"):
+        files = database.get_all_files_matching_model()
+
+    with _PhaseTimer(timings, "diff"):
+        moves = database.detect_moves(files=files)
+        moved_entries = {entry.key: new_path for entry, new_path in moves}
+        fs_files = set(files)
+        missing_entries = [
+            entry
+            for entry in database.entries
+            if entry.Path not in fs_files and entry.key not in moved_entries
+        ]
+        db_paths = {entry.Path for entry in database.entries}
+        db_paths.update(moved_entries.values())
+        result.new_files = [file_ for file_ in files if file_ not in db_paths]
+        result.missing = [(entry.ID, entry.Path) for entry in missing_entries]
+        missing_keys = {entry.key for entry in missing_entries}
+        remaining = [e for e in database.entries if e.key not in missing_keys]
+        if compact_ids:
+            result.id_changes = [
+                (entry.ID, str(new_id))
+                for new_id, entry in enumerate(remaining)
+                if entry.ID != str(new_id)
+            ]
+
+    if dry_run:
+        result.moved = [(entry.ID, entry.Path, new_path) for entry, new_path in moves]
+        return result
+
+    with _PhaseTimer(timings, "move"):
+        result.moved = database.apply_moves(moves)
+
+    with _PhaseTimer(timings, "remove"):
+        database.remove_many([entry_id for entry_id, _ in result.missing])
+
+    with _PhaseTimer(timings, "renumber"):
+        database.renumber(dict(result.id_changes))
+
+    if add_new:
+        with _PhaseTimer(timings, "add"):
+            _, result.added = database.find_new_files(files=files)
+
+    return result
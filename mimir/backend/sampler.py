@@ -0,0 +1,129 @@
+"""
+Weighted random selection of entries (see DataBase.get_random_entry).
+"""
+import logging
+import random
+from collections.abc import Iterable
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+
+class WeightedSampler:
+    """
+    Sampler for row keys with non-negative weights based on a Fenwick tree (binary
+    indexed tree) over the keys. Changing a weight and drawing a key are O(log n),
+    so the weights can be kept up to date with every modification of the entries.
+
+    The tree is rebuilt from the exact weights after as many updates as it has
+    rows, so rounding errors of the incremental float updates do not accumulate.
+
+    Args:
+        weights (dict) : Initial weights by row key (tree is built in O(n))
+
+    Attributes:
+        weights (list) : Weight by row key
+        tree (list) : Fenwick tree of the weights (1-based)
+    """
+
+    min_capacity = 1024
+
+    def __init__(self, weights: dict[int, float] | None = None) -> None:
+        weights = weights or {}
+        size = max(self.min_capacity, max(weights, default=-1) + 1)
+        self.weights = [0.0] * size
+        for key, weight in weights.items():
+            if weight < 0:
+                raise ValueError("Weights can not be negative")
+            self.weights[key] = weight
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Helper building the tree from the weights in O(n)"""
+        tree = [0.0, *self.weights]
+        size = len(self.weights)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self._updates = 0
+
+    def set(self, key: int, weight: float) -> None:
+        """Set the weight of row key"""
+        if weight < 0:
+            raise ValueError("Weights can not be negative")
+        size = len(self.weights)
+        if key >= size:
+            self.weights += [0.0] * (max(key + 1, 2 * size) - size)
+            self.weights[key] = weight
+            self._rebuild()
+            return
+        delta = weight - self.weights[key]
+        if not delta:
+            return
+        self.weights[key] = weight
+        self._updates += 1
+        if self._updates > size:
+            self._rebuild()
+            return
+        i = key + 1
+        while i <= size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def get(self, key: int) -> float:
+        """Returns the weight of row key"""
+        if key >= len(self.weights):
+            return 0.0
+        return self.weights[key]
+
+    def total(self) -> float:
+        """Returns the sum of all weights"""
+        total = 0.0
+        i = len(self.weights)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def sample(
+        self, exclude: Iterable[int] = (), rng: random.Random | ModuleType = random
+    ) -> int:
+        """
+        Draw a row key with probability proportional to its weight
+
+        Args:
+            exclude (iterable) : Row keys that are not drawn
+            rng (random.Random) : Random number generator
+
+        Raises:
+            IndexError : If all weights are zero
+        """
+        excluded = {key: self.get(key) for key in exclude if self.get(key)}
+        for key in excluded:
+            self.set(key, 0.0)
+        try:
+            return self._sample(rng)
+        finally:
+            for key, weight in excluded.items():
+                self.set(key, weight)
+
+    def _sample(self, rng: random.Random | ModuleType) -> int:
+        """Helper descending the tree to the key of a uniform point in [0, total)"""
+        size = len(self.weights)
+        for _ in range(3):
+            target = rng.random() * self.total()
+            pos = 0
+            step = 1 << (size.bit_length() - 1)
+            while step:
+                nxt = pos + step
+                if nxt <= size and self.tree[nxt] <= target:
+                    pos = nxt
+                    target -= self.tree[nxt]
+                step >>= 1
+            # pos is the 0-based key. Rounding can end on a key with zero weight
+            if pos < size and self.weights[pos] > 0:
+                return pos
+            self._rebuild()
+        raise IndexError("Can not sample from empty weights")
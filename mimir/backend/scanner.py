@@ -0,0 +1,172 @@
+"""
+Filesystem scanner finding all files of a database. The content of each directory
+is cached together with its modification time so unchanged directories are not
+listed again on rescans.
+"""
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def get_file_key(path: str) -> tuple[int, int, int] | None:
+    """
+    Returns (device, inode, size) identifying a file independent of its path or
+    None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_size
+
+
+class FileScanner:
+    """
+    Scanner for files with one of the passed extentions starting from the root
+    directory. Hidden files and directories (starting with .) are ignored. If a
+    cache path is passed the matching files and subdirectories of each directory
+    are saved with the directory mtime. On the next scan directories with unchanged
+    mtime are taken from the cache instead of being listed (their subdirectories
+    are still checked).
+
+    Args:
+        root (str) : Root directory of the database
+        extentions (list) : File extentions (without leading .) to match
+        cache_path (str) : Path of the directory mtime cache. No cache is used if None
+
+    Attributes:
+        suffixes (set) : Matched extentions
+        dir_cache (dict) : Relative directory -> {"mtime_ns", "files", "dirs"}
+        n_listed (int) : Number of directories listed in the last scan
+        n_cached (int) : Number of directories taken from the cache in the last scan
+        _dirty (bool) : True if dir_cache changed since it was saved/loaded
+    """
+
+    # Directories modified less than this many seconds before the scan are not
+    # cached because a change in the same mtime tick would go unnoticed
+    min_age = 2
+
+    def __init__(
+        self, root: str, extentions: list[str], cache_path: str | None = None
+    ) -> None:
+        self.root = root
+        self.suffixes = set(extentions)
+        self.cache_path = cache_path
+        self.dir_cache = {}
+        self._dirty = False
+        self.n_listed = 0
+        self.n_cached = 0
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path) as cache_file:
+                saved_cache = json.load(cache_file)
+            if set(saved_cache["extentions"]) == self.suffixes:
+                self.dir_cache = saved_cache["dirs"]
+            else:
+                logger.info("Extentions changed. Ignoring scan cache")
+
+    def matches(self, file_name: str) -> bool:
+        """Returns True if the file name has one of the extentions"""
+        _, dot, suffix = file_name.rpartition(".")
+        return bool(dot) and suffix in self.suffixes
+
+    def scan(self, start_dir: str = "") -> list[str]:
+        """
+        Find all matching files in start_dir (relative to root).
+
+        Returns:
+            list : Paths of all matching files relative to root
+        """
+        start_dir = start_dir.strip("/")
+        self.n_listed = 0
+        self.n_cached = 0
+        max_mtime_ns = (time.time() - self.min_age) * 1e9
+        matching_files = []
+        visited = set()
+        dirs = [start_dir]
+        while dirs:
+            rel_dir = dirs.pop()
+            visited.add(rel_dir)
+            abs_dir = self.root + "/" + rel_dir if rel_dir else self.root
+            prefix = rel_dir + "/" if rel_dir else ""
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                self._drop_dir(rel_dir)
+                continue
+            cached = self.dir_cache.get(rel_dir)
+            if cached is not None and cached["mtime_ns"] == mtime_ns:
+                self.n_cached += 1
+                files, sub_dirs = cached["files"], cached["dirs"]
+            else:
+                self.n_listed += 1
+                files, sub_dirs = self._list_dir(abs_dir)
+                if mtime_ns < max_mtime_ns:
+                    self.dir_cache[rel_dir] = {
+                        "mtime_ns": mtime_ns,
+                        "files": files,
+                        "dirs": sub_dirs,
+                    }
+                    self._dirty = True
+                else:
+                    self._drop_dir(rel_dir)
+            matching_files.extend(prefix + file_name for file_name in files)
+            # Reversed so directories are processed in listing order
+            dirs.extend(prefix + sub_dir for sub_dir in reversed(sub_dirs))
+        if not start_dir:
+            # Remove directories that do not exist anymore
+            for rel_dir in set(self.dir_cache) - visited:
+                self._drop_dir(rel_dir)
+        logger.debug(
+            "Scanned %s: %s matching files, %s directories listed, %s from cache",
+            start_dir,
+            len(matching_files),
+            self.n_listed,
+            self.n_cached,
+        )
+        self.save()
+        return matching_files
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        """Helper removing a directory from the cache"""
+        if self.dir_cache.pop(rel_dir, None) is not None:
+            self._dirty = True
+
+    def _list_dir(self, abs_dir: str) -> tuple[list[str], list[str]]:
+        """Returns the matching files and the subdirectories of a directory"""
+        files = []
+        sub_dirs = []
+        try:
+            with os.scandir(abs_dir) as dir_entries:
+                for dir_entry in dir_entries:
+                    if dir_entry.name.startswith("."):
+                        continue
+                    try:
+                        is_dir = dir_entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        sub_dirs.append(dir_entry.name)
+                    elif self.matches(dir_entry.name):
+                        files.append(dir_entry.name)
+        except OSError as error:
+            logger.warning("Could not list %s: %s", abs_dir, error)
+        return files, sub_dirs
+
+    def save(self) -> None:
+        """Save the directory cache (if a cache path is set and it changed)"""
+        if (
+            not self._dirty
+            or self.cache_path is None
+            or not os.path.exists(os.path.dirname(self.cache_path))
+        ):
+            return
+        with open(self.cache_path + ".tmp", "w") as cache_file:
+            json.dump(
+                {"extentions": sorted(self.suffixes), "dirs": self.dir_cache},
+                cache_file,
+            )
+        os.replace(self.cache_path + ".tmp", self.cache_path)
+        self._dirty = False
@@ -0,0 +1,608 @@
+"""
+Storage backends for the Mimir database. A backend is responsible for persisting
+the entries of a DataBase in the .mimir folder and reading them back. Entries are
+exchanged in their dictionary representation (see DataBaseEntry.get_dict_repr).
+"""
+import codecs
+import json
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from shutil import copy2
+from typing import IO, TYPE_CHECKING, ClassVar
+
+import mimir.backend.helper
+from mimir.backend.journal import Journal
+
+if TYPE_CHECKING:
+    from mimir.backend.entry import EntryBase
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """
+    Base class for all storage backends
+
+    Args:
+        mimirdir (str) : Path to the .mimir folder of the database
+
+    Attributes:
+        name (str) : Name used to select the backend
+        filename (str) : Name of the file in the .mimir folder
+        backup_suffix (str) : Suffix of the daily backup files
+        savepath (str) : Full path of the database file
+    """
+
+    name = ""
+    filename = ""
+    backup_suffix = ".backup"
+
+    def __init__(self, mimirdir: str) -> None:
+        self.mimirdir = mimirdir
+        self.savepath = mimirdir + "/" + self.filename
+
+    def exists(self) -> bool:
+        """Returns True if the database was saved with this backend before"""
+        return os.path.exists(self.savepath)
+
+    def get_stamp(self) -> list[list]:
+        """
+        Returns size and modification time of the files written by the backend.
+        Changes if the saved database is modified (by this or another process).
+        """
+        stamp = []
+        for path in self.get_files():
+            if os.path.exists(path):
+                stat = os.stat(path)
+                stamp.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return stamp
+
+    def get_files(self) -> list[str]:
+        """Returns the paths of all files written by the backend"""
+        return [self.savepath]
+
+    def backup_path(self) -> str:
+        """Returns the path of the backup for the current day"""
+        backup_date = mimir.backend.helper.getTimeFormatted("Date", "-", inverted=True)
+        return "{0}.{1}{2}".format(
+            os.path.splitext(self.savepath)[0], backup_date, self.backup_suffix
+        )
+
+    def load(
+        self, progress: Callable[[int, int], None] | None = None
+    ) -> Iterator[dict]:
+        """
+        Iterate over all saved entries.
+
+        Args:
+            progress (callable) : Called as progress(done, total) while loading. The
+                                  unit (bytes, entries) depends on the backend
+
+        Returns:
+            iterator of dicts : Dictionary representation of each entry
+        """
+        raise NotImplementedError
+
+    def save(
+        self,
+        entries: list["EntryBase"],
+        changed_entries: list["EntryBase"] | None = None,
+        removed_ids: set[str] | None = None,
+    ) -> bool:
+        """
+        Save the database.
+
+        Args:
+            entries (list) : All DataBaseEntry objects of the database
+            changed_entries (list) : Entries changed since the last save. If None all
+                                     entries are considered changed
+            removed_ids (set) : IDs that were saved before but are not present in the
+                                database anymore
+
+        Returns:
+            bool : True if saving was successful
+        """
+        raise NotImplementedError
+
+    def compact(self, entries: list["EntryBase"]) -> bool:
+        """
+        Write the full database so no further information (e.g. a journal) is
+        required for loading it.
+
+        Args:
+            entries (list) : All DataBaseEntry objects of the database
+        """
+        return self.save(entries)
+
+
+class JSONStorage(StorageBackend):
+    """
+    Default backend saving all entries in one json file (mainDB.json). Changes are
+    appended to a journal (see mimir.backend.journal) on save. The journal is
+    folded into mainDB.json (compaction) once it exceeds compact_ratio times the
+    size of mainDB.json or when compact is called. A daily backup is created before
+    mainDB.json is rewritten.
+
+    Attributes:
+        journal (Journal) : Journal of the changes since mainDB.json was written
+        offsets_path (str) : Path of the byte ranges of the entries in mainDB.json
+                             (written on compaction, see load_offsets)
+        compact_ratio (float) : Size of the journal relative to mainDB.json that
+                                triggers a compaction on save
+    """
+
+    name = "json"
+    filename = "mainDB.json"
+    compact_ratio = 0.5
+
+    def __init__(self, mimirdir: str) -> None:
+        super().__init__(mimirdir)
+        self.journal = Journal(mimirdir + "/journal")
+        self.offsets_path = mimirdir + "/mainDB.offsets.json"
+
+    def get_files(self) -> list[str]:
+        return [self.savepath, self.journal.path]
+
+    def load(
+        self, progress: Callable[[int, int], None] | None = None
+    ) -> Iterator[dict]:
+        overrides = OrderedDict()
+        if self.journal.matches(self.savepath):
+            n_records = 0
+            for record in self.journal.replay():
+                n_records += 1
+                if record["op"] == "put":
+                    entry_id = record["entry"]["ID"]["value"]
+                    if overrides.get(entry_id, 0) is None:
+                        del overrides[entry_id]
+                    overrides[entry_id] = record["entry"]
+                elif record["op"] == "delete":
+                    overrides.pop(record["id"], None)
+                    overrides[record["id"]] = None
+                else:
+                    raise RuntimeError("Invalid journal record {0}".format(record))
+            logger.debug("Replayed %s records from journal", n_records)
+        elif self.journal.exists():
+            logger.warning("Ignoring outdated journal %s", self.journal.path)
+        with open(self.savepath, "rb") as save_file:
+            for _, saved_entry in iter_json_object(save_file, progress=progress):
+                entry_id = saved_entry["ID"]["value"]
+                if entry_id in overrides:
+                    saved_entry = overrides.pop(entry_id)
+                    if saved_entry is None:
+                        continue
+                yield saved_entry
+        for saved_entry in overrides.values():
+            if saved_entry is not None:
+                yield saved_entry
+
+    def save(
+        self,
+        entries: list["EntryBase"],
+        changed_entries: list["EntryBase"] | None = None,
+        removed_ids: set[str] | None = None,
+    ) -> bool:
+        if changed_entries is None or not self.exists():
+            return self.compact(entries)
+        if not self.journal.matches(self.savepath):
+            self.journal.start(self.savepath)
+        records = [{"op": "delete", "id": entry_id} for entry_id in removed_ids or []]
+        records += [
+            {"op": "put", "entry": entry.get_dict_repr()} for entry in changed_entries
+        ]
+        if records:
+            logger.debug("Appending %s records to journal", len(records))
+            self.journal.append(records)
+        if self.journal.size() > self.compact_ratio * os.path.getsize(self.savepath):
+            return self.compact(entries)
+        if not os.path.exists(self.backup_path()):
+            logger.debug("Making backup")
+            copy2(self.savepath, self.backup_path())
+        return True
+
+    def compact(self, entries: list["EntryBase"]) -> bool:
+        # Copy current DBfile and save it as backup
+        if self.exists():
+            logger.debug("Making backup")
+            copy2(self.savepath, self.backup_path())
+        # Only the last entry for each path is saved (same as saving as a dict)
+        output = OrderedDict()
+        for entry in entries:
+            output.update({entry.Path: entry})
+        logger.debug("Saving database at %s", self.savepath)
+        offsets = []
+        with open(self.savepath + ".tmp", "wb") as outfile:
+            outfile.write(b"{")
+            for i_entry, (path, entry) in enumerate(output.items()):
+                dict_repr = entry.get_dict_repr()
+                # Same layout as json.dump(output, indent=4)
+                prefix = "{0}\n    {1}: ".format(
+                    "," if i_entry else "", json.dumps(path)
+                )
+                outfile.write(prefix.encode("utf-8"))
+                start = outfile.tell()
+                outfile.write(
+                    json.dumps(dict_repr, indent=4)
+                    .replace("\n", "\n    ")
+                    .encode("utf-8")
+                )
+                offsets.append([dict_repr["ID"]["value"], path, start, outfile.tell()])
+            outfile.write(b"\n}" if output else b"}")
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(self.savepath + ".tmp", self.savepath)
+        self.journal.clear()
+        with open(self.offsets_path + ".tmp", "w") as outfile:
+            json.dump(
+                {
+                    "checkpoint": Journal.get_checkpoint_header(self.savepath),
+                    "entries": offsets,
+                },
+                outfile,
+            )
+        os.replace(self.offsets_path + ".tmp", self.offsets_path)
+        return True
+
+    def load_offsets(self) -> list[list] | None:
+        """
+        Returns the byte range of each entry in mainDB.json written together with
+        the file as list of [ID, Path, start, end]. Returns None if the offsets are
+        missing or do not belong to the current mainDB.json.
+        """
+        if not os.path.exists(self.offsets_path) or not self.exists():
+            return None
+        with open(self.offsets_path) as offsets_file:
+            saved_offsets = json.load(offsets_file)
+        if saved_offsets["checkpoint"] != Journal.get_checkpoint_header(self.savepath):
+            logger.info("Ignoring outdated offsets %s", self.offsets_path)
+            return None
+        return saved_offsets["entries"]
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Backend saving the entries in normalized tables of a SQLite database
+    (mainDB.sqlite). Only entries that changed since the last save are written.
+
+    Tables:
+        entries : One row per entry (ID, Path)
+        items : One row per item of an entry with type and (for Single items) value
+        list_values : One row per value of a ListItem
+    """
+
+    name = "sqlite"
+    filename = "mainDB.sqlite"
+    backup_suffix = ".sqlite.backup"
+
+    schema: ClassVar[list[str]] = [
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "id TEXT PRIMARY KEY, path TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS items ("
+        "id TEXT NOT NULL, item TEXT NOT NULL, position INTEGER NOT NULL, "
+        "type TEXT NOT NULL, value TEXT, PRIMARY KEY (id, item))",
+        "CREATE TABLE IF NOT EXISTS list_values ("
+        "id TEXT NOT NULL, item TEXT NOT NULL, position INTEGER NOT NULL, "
+        "value TEXT NOT NULL, PRIMARY KEY (id, item, position))",
+        "CREATE INDEX IF NOT EXISTS idx_entries_path ON entries (path)",
+        "CREATE INDEX IF NOT EXISTS idx_items_value ON items (item, value)",
+        "CREATE INDEX IF NOT EXISTS idx_list_values_value ON list_values (item, value)",
+    ]
+
+    def connect(self) -> sqlite3.Connection:
+        """Returns a new connection to the database file with initialized schema"""
+        connection = sqlite3.connect(self.savepath)
+        with connection:
+            for statement in self.schema:
+                connection.execute(statement)
+        return connection
+
+    def load(
+        self, progress: Callable[[int, int], None] | None = None
+    ) -> Iterator[dict]:
+        connection = self.connect()
+        try:
+            total = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            n_loaded = 0
+            list_values = {}
+            for entry_id, item, value in connection.execute(
+                "SELECT id, item, value FROM list_values ORDER BY id, item, position"
+            ):
+                list_values.setdefault((entry_id, item), []).append(value)
+            saved_entry = None
+            current_id = None
+            for entry_id, item, item_type, value in connection.execute(
+                "SELECT id, item, type, value FROM items "
+                "ORDER BY CAST(id AS INTEGER), id, position"
+            ):
+                if entry_id != current_id:
+                    if saved_entry is not None:
+                        n_loaded += 1
+                        if progress is not None:
+                            progress(n_loaded, total)
+                        yield saved_entry
+                    saved_entry = {}
+                    current_id = entry_id
+                if item_type == "List":
+                    value = list_values.get((entry_id, item), [])
+                saved_entry[item] = {"type": item_type, "value": value}
+            if saved_entry is not None:
+                if progress is not None:
+                    progress(n_loaded + 1, total)
+                yield saved_entry
+        finally:
+            connection.close()
+
+    def save(
+        self,
+        entries: list["EntryBase"],
+        changed_entries: list["EntryBase"] | None = None,
+        removed_ids: set[str] | None = None,
+    ) -> bool:
+        if not self.exists():
+            changed_entries = None
+        elif not os.path.exists(self.backup_path()):
+            logger.debug("Making backup")
+            self.backup()
+        if changed_entries is None:
+            changed_entries = entries
+        connection = self.connect()
+        try:
+            with connection:
+                if removed_ids:
+                    self._delete(connection, removed_ids)
+                for entry in changed_entries:
+                    self.upsert(connection, entry.get_dict_repr())
+        finally:
+            connection.close()
+        logger.debug(
+            "Saved %s entries at %s (removed %s)",
+            len(changed_entries),
+            self.savepath,
+            len(removed_ids) if removed_ids else 0,
+        )
+        return True
+
+    def backup(self) -> None:
+        """Creates a consistent copy of the database using the SQLite backup API"""
+        source = sqlite3.connect(self.savepath)
+        target = sqlite3.connect(self.backup_path())
+        try:
+            with target:
+                source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+    @classmethod
+    def upsert(
+        cls: type["SQLiteStorage"], connection: sqlite3.Connection, dict_repr: dict
+    ) -> None:
+        """Insert or replace the entry in dictionary representation dict_repr"""
+        entry_id = dict_repr["ID"]["value"]
+        connection.execute(
+            "INSERT INTO entries (id, path) VALUES (?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET path = excluded.path",
+            (entry_id, dict_repr["Path"]["value"]),
+        )
+        connection.execute("DELETE FROM items WHERE id = ?", (entry_id,))
+        connection.execute("DELETE FROM list_values WHERE id = ?", (entry_id,))
+        item_rows = []
+        list_rows = []
+        for position, (item, saved_item) in enumerate(dict_repr.items()):
+            if saved_item["type"] == "List":
+                item_rows.append((entry_id, item, position, "List", None))
+                for value_position, value in enumerate(saved_item["value"]):
+                    list_rows.append((entry_id, item, value_position, value))
+            else:
+                item_rows.append(
+                    (entry_id, item, position, "Single", saved_item["value"])
+                )
+        connection.executemany(
+            "INSERT INTO items (id, item, position, type, value) "
+            "VALUES (?, ?, ?, ?, ?)",
+            item_rows,
+        )
+        connection.executemany(
+            "INSERT INTO list_values (id, item, position, value) VALUES (?, ?, ?, ?)",
+            list_rows,
+        )
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, entry_ids: list[str]) -> None:
+        rows = [(entry_id,) for entry_id in entry_ids]
+        connection.executemany("DELETE FROM entries WHERE id = ?", rows)
+        connection.executemany("DELETE FROM items WHERE id = ?", rows)
+        connection.executemany("DELETE FROM list_values WHERE id = ?", rows)
+
+
+def iter_json_object(
+    json_file: IO[bytes],
+    chunk_size: int = 2**20,
+    progress: Callable[[int, int], None] | None = None,
+    offsets: bool = False,
+) -> Iterator[tuple]:
+    """
+    Iterate over the members of the top-level json object in a file without
+    decoding the whole file at once. Only the current member and one chunk of the
+    file are kept in memory.
+
+    Args:
+        json_file (file) : File opened in binary mode containing utf-8 encoded json
+        chunk_size (int) : Number of bytes read at once
+        progress (callable) : Called as progress(bytes_read, total_bytes) after each
+                              member
+        offsets (bool) : If True the character range of each value is returned as
+                         well. Matches the byte range for ascii files
+
+    Returns:
+        iterator of tuples : (key, value) or (key, value, start, end) for each
+                             member of the object
+
+    Raises:
+        json.JSONDecodeError : If the file is not a valid json object
+    """
+    total = os.fstat(json_file.fileno()).st_size
+    reader = _JSONChunkReader(json_file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        reader.peek()
+        start = reader.offset + reader.pos
+        value = reader.decode()
+        if progress is not None:
+            progress(reader.bytes_read - reader.bytes_pending(), total)
+        if offsets:
+            yield key, value, start, reader.offset + reader.pos
+        else:
+            yield key, value
+        if reader.expect(",}") == "}":
+            return
+
+
+class _JSONChunkReader:
+    """Buffered decoding of json values from a file read in chunks"""
+
+    def __init__(self, json_file: IO[bytes], chunk_size: int) -> None:
+        self.json_file = json_file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def bytes_pending(self) -> int:
+        """Number of bytes read from the file but not yet consumed (ascii estimate)"""
+        return len(self.buffer) - self.pos
+
+    def read_chunk(self) -> bool:
+        """Append the next chunk of the file to the buffer. Returns False on EOF"""
+        if self.eof:
+            return False
+        chunk = self.json_file.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        self.eof = len(chunk) < self.chunk_size
+        self.buffer += self.text_decoder.decode(chunk, final=self.eof)
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character (empty string on EOF)"""
+        # Drop the consumed part of the buffer
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos :]
+            self.offset += self.pos
+            self.pos = 0
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read_chunk():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, characters: str) -> str:
+        """Consume the next non-whitespace character which has to be in characters"""
+        char = self.peek()
+        if not char or char not in characters:
+            raise json.JSONDecodeError(
+                "Expecting one of {0!r}".format(characters), self.buffer, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def decode(self) -> object:
+        """Decode the next json value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_chunk():
+                    raise
+                continue
+            # Values at the end of the buffer (e.g. numbers) may be incomplete
+            if end < len(self.buffer) or not self.read_chunk():
+                self.pos = end
+                return value
+
+
+BACKENDS = {JSONStorage.name: JSONStorage, SQLiteStorage.name: SQLiteStorage}
+
+
+def get_storage_backend(mimirdir: str, name: str | None = None) -> StorageBackend:
+    """
+    Returns the storage backend for the .mimir folder mimirdir.
+
+    Args:
+        mimirdir (str) : Path to the .mimir folder
+        name (str) : Name of the backend (json, sqlite). If None, the backend is
+                     detected from the files in mimirdir (SQLite is preferred)
+                     and falls back to json.
+
+    Raises:
+        KeyError : If name is no valid backend name
+    """
+    if name is None:
+        for backend in (SQLiteStorage, JSONStorage):
+            if os.path.exists(mimirdir + "/" + backend.filename):
+                return backend(mimirdir)
+        return JSONStorage(mimirdir)
+    if name not in BACKENDS:
+        raise KeyError(
+            "Storage backend {0} not supported. Use one of {1}".format(
+                name, list(BACKENDS.keys())
+            )
+        )
+    return BACKENDS[name](mimirdir)
+
+
+def migrate(mimirdir: str, source: str = "json", target: str = "sqlite") -> int:
+    """
+    Copy all entries saved with the source backend to the target backend.
+
+    Args:
+        mimirdir (str) : Path to the .mimir folder
+        source (str) : Name of the backend the database is currently saved with
+        target (str) : Name of the backend the database will be saved with
+
+    Returns:
+        int : Number of migrated entries
+    """
+    source_backend = get_storage_backend(mimirdir, source)
+    target_backend = get_storage_backend(mimirdir, target)
+    if not source_backend.exists():
+        raise RuntimeError("No database saved at {0}".format(source_backend.savepath))
+    if target_backend.exists():
+        raise RuntimeError(
+            "Target {0} already exists. Remove it first".format(target_backend.savepath)
+        )
+    if isinstance(target_backend, SQLiteStorage):
+        n_entries = 0
+        connection = target_backend.connect()
+        try:
+            with connection:
+                for dict_repr in source_backend.load():
+                    target_backend.upsert(connection, dict_repr)
+                    n_entries += 1
+        finally:
+            connection.close()
+    else:
+        output = OrderedDict()
+        for dict_repr in source_backend.load():
+            output[dict_repr["Path"]["value"]] = dict_repr
+        with open(target_backend.savepath, "w") as outfile:
+            json.dump(output, outfile, indent=4)
+        n_entries = len(output)
+    logger.info(
+        "Migrated %s entries from %s to %s",
+        n_entries,
+        source_backend.savepath,
+        target_backend.savepath,
+    )
+    return n_entries
@@ -0,0 +1,571 @@
+"""
+Watcher keeping a database up to date with the filesystem without full rescans.
+Changes are read from Linux inotify (ctypes binding, no dependencies) or, if
+inotify is not available, by polling the filesystem with the scanner of the
+database.
+"""
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mimir.backend.database import DataBase
+    from mimir.backend.entry import EntryBase
+    from mimir.backend.scanner import FileScanner
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifySource:
+    """
+    Source of filesystem events of all (non hidden) directories below root using
+    inotify. Events are tuples with kind and paths relative to root:
+
+        ("created", path), ("deleted", path), ("moved", old_path, new_path),
+        ("dir_created", path), ("dir_deleted", path), ("dir_moved", old, new),
+        ("resync",) if events were lost
+
+    Args:
+        root (str) : Root directory of the database
+
+    Raises:
+        RuntimeError : If inotify is not available
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        try:
+            self.libc = ctypes.CDLL(None, use_errno=True)
+            self.libc.inotify_init1.argtypes = [ctypes.c_int]
+            self.libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            self.libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError) as error:
+            raise RuntimeError("inotify not available: {0}".format(error))
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise RuntimeError(
+                "inotify_init1 failed: {0}".format(os.strerror(ctypes.get_errno()))
+            )
+        self.watches = {}
+        self.pending_moves = {}
+        try:
+            self.add_watch_tree("")
+        except RuntimeError:
+            self.close()
+            raise
+
+    def add_watch(self, rel_dir: str) -> None:
+        """Watch a single directory (relative to root)"""
+        abs_dir = self.root + "/" + rel_dir if rel_dir else self.root
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(abs_dir), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise RuntimeError(
+                "Could not watch {0}: {1}".format(abs_dir, os.strerror(error))
+            )
+        self.watches[wd] = rel_dir
+
+    def add_watch_tree(self, rel_dir: str) -> None:
+        """Watch a directory and all (non hidden) subdirectories"""
+        dirs = [rel_dir]
+        while dirs:
+            this_dir = dirs.pop()
+            self.add_watch(this_dir)
+            abs_dir = self.root + "/" + this_dir if this_dir else self.root
+            try:
+                with os.scandir(abs_dir) as dir_entries:
+                    for dir_entry in dir_entries:
+                        if not dir_entry.name.startswith(".") and dir_entry.is_dir(
+                            follow_symlinks=False
+                        ):
+                            dirs.append(self.join(this_dir, dir_entry.name))
+            except OSError:
+                continue
+
+    def remove_watch_tree(self, rel_dir: str) -> None:
+        """Stop watching a directory and its subdirectories"""
+        for wd, watched_dir in list(self.watches.items()):
+            if watched_dir == rel_dir or watched_dir.startswith(rel_dir + "/"):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def move_watch_tree(self, old_dir: str, new_dir: str) -> None:
+        """Update the paths of watched directories after a directory was moved"""
+        for wd, watched_dir in list(self.watches.items()):
+            if watched_dir == old_dir or watched_dir.startswith(old_dir + "/"):
+                self.watches[wd] = new_dir + watched_dir[len(old_dir) :]
+
+    @staticmethod
+    def join(rel_dir: str, name: str) -> str:
+        """Join a relative directory and a name"""
+        return rel_dir + "/" + name if rel_dir else name
+
+    def read(self, timeout: float | None) -> list[tuple]:
+        """
+        Wait up to timeout seconds for events.
+
+        Returns:
+            list : Events (see class description)
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflow. Resyncing with filesystem")
+                events.append(("resync",))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches or name.startswith("."):
+                continue
+            path = self.join(self.watches[wd], name)
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & IN_MOVED_FROM:
+                self.pending_moves[cookie] = (path, is_dir)
+            elif mask & IN_MOVED_TO:
+                if cookie in self.pending_moves:
+                    old_path, _ = self.pending_moves.pop(cookie)
+                    if is_dir:
+                        self.move_watch_tree(old_path, path)
+                        events.append(("dir_moved", old_path, path))
+                    else:
+                        events.append(("moved", old_path, path))
+                elif is_dir:
+                    self.add_watch_tree(path)
+                    events.append(("dir_created", path))
+                else:
+                    events.append(("created", path))
+            elif mask & IN_CREATE:
+                # Regular files are reported once they are written (IN_CLOSE_WRITE)
+                if is_dir:
+                    self.add_watch_tree(path)
+                    events.append(("dir_created", path))
+            elif mask & IN_CLOSE_WRITE:
+                events.append(("created", path))
+            elif mask & IN_DELETE:
+                events.append(("dir_deleted" if is_dir else "deleted", path))
+        return events
+
+    def flush(self) -> list[tuple]:
+        """
+        Returns events for moves without matching destination (moved out of the
+        watched tree). Called before a batch of events is applied.
+        """
+        events = []
+        for path, is_dir in self.pending_moves.values():
+            if is_dir:
+                self.remove_watch_tree(path)
+                events.append(("dir_deleted", path))
+            else:
+                events.append(("deleted", path))
+        self.pending_moves = {}
+        return events
+
+    def close(self) -> None:
+        """Close the inotify file descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    """
+    Source of filesystem events polling the filesystem with a FileScanner (using
+    its directory mtime cache). Returns a ("resync", files) event if the matching
+    files changed since the last poll.
+
+    Args:
+        scanner (FileScanner) : Scanner of the database
+        interval (float) : Seconds between two polls
+    """
+
+    def __init__(self, scanner: "FileScanner", interval: float = 5.0) -> None:
+        self.scanner = scanner
+        self.interval = interval
+        self.files = set(scanner.scan())
+        self.next_poll = time.monotonic() + interval
+
+    def read(self, timeout: float | None) -> list[tuple]:
+        """Wait until the next poll (at most timeout seconds) and return events"""
+        wait = self.next_poll - time.monotonic()
+        if timeout is not None and wait > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        time.sleep(max(wait, 0))
+        self.next_poll = time.monotonic() + self.interval
+        files = self.scanner.scan()
+        if set(files) == self.files:
+            return []
+        self.files = set(files)
+        return [("resync", files)]
+
+    def flush(self) -> list[tuple]:
+        """Polling has no pending events"""
+        return []
+
+    def close(self) -> None:
+        """Nothing to close for polling"""
+
+
+class PathChanges:
+    """
+    Changes of the files of a database collected from a batch of events. Only the
+    paths in the events are looked up in the database (directory events search
+    the Path index for the entries in the directory).
+
+    Args:
+        database (DataBase) : Database the events belong to
+
+    Attributes:
+        current (dict) : Path of a file changed in the batch -> Path of its entry
+                         in the database (None for new files)
+        vacated (set) : Paths of entries whose file is not at this path anymore
+    """
+
+    def __init__(self, database: "DataBase") -> None:
+        self.database = database
+        self.current = {}
+        self.vacated = set()
+
+    def is_entry_path(self, path: str) -> bool:
+        """Returns True if an entry with Path path exists and its file was not moved"""
+        return path not in self.vacated and bool(
+            self.database.get_entry_by_item_name("Path", path)
+        )
+
+    def take(self, path: str) -> str | None:
+        """
+        Remove the file at path.
+
+        Returns:
+            str : Path of the entry of the file or None for files without entry
+        """
+        if path in self.current:
+            return self.current.pop(path)
+        if self.is_entry_path(path):
+            self.vacated.add(path)
+            return path
+        return None
+
+    def put(self, path: str, origin: str | None) -> None:
+        """Add the file of the entry with Path origin (None for new files) at path"""
+        if not self.database.scanner.matches(path):
+            return
+        if origin is not None and origin == path:
+            self.vacated.discard(path)
+            return
+        # A file at path is replaced
+        self.take(path)
+        self.current[path] = origin
+
+    def created(self, path: str) -> None:
+        """A file was written at path"""
+        if path in self.current or self.is_entry_path(path):
+            return
+        if path in self.vacated and path not in self.current.values():
+            # Recreated before the entry was updated
+            self.put(path, path)
+        else:
+            self.put(path, None)
+
+    def deleted(self, path: str) -> None:
+        """The file at path was deleted"""
+        self.take(path)
+
+    def moved(self, old_path: str, new_path: str) -> None:
+        """The file at old_path was moved to new_path"""
+        origin = self.take(old_path)
+        if origin is None:
+            self.created(new_path)
+        else:
+            self.put(new_path, origin)
+
+    def dir_paths(self, directory: str) -> list[str]:
+        """Returns the current paths of all known files in directory"""
+        prefix = directory + "/"
+        paths = [path for path in self.current if path.startswith(prefix)]
+        paths += [
+            path
+            for path in self.database.get_paths_below(directory)
+            if path not in self.vacated
+        ]
+        return paths
+
+    def dir_created(self, directory: str) -> None:
+        """A directory was created (or moved in from outside the database)"""
+        for path in self.database.scanner.scan(directory):
+            self.created(path)
+
+    def dir_deleted(self, directory: str) -> None:
+        """A directory was deleted (or moved out of the database)"""
+        for path in self.dir_paths(directory):
+            self.take(path)
+
+    def dir_moved(self, old_dir: str, new_dir: str) -> None:
+        """A directory was moved"""
+        prefix = old_dir + "/"
+        moves = [
+            (path, new_dir + "/" + path[len(prefix) :])
+            for path in self.dir_paths(old_dir)
+        ]
+        origins = [self.take(old_path) for old_path, _ in moves]
+        for (_, new_path), origin in zip(moves, origins):
+            self.put(new_path, origin)
+
+    def resync(self, files: list[str]) -> None:
+        """
+        Replace all changes by the difference of the database and files (all files
+        on the filesystem). Moves are detected later by file key and name.
+        """
+        files = set(files)
+        entry_paths = self.database.get_paths_below("")
+        self.current = {
+            path: None
+            for path in files
+            if not self.database.get_entry_by_item_name("Path", path)
+        }
+        self.vacated = {path for path in entry_paths if path not in files}
+
+
+class DataBaseWatcher:
+    """
+    Keeps a database up to date with the filesystem. Events are collected until no
+    new event arrived for debounce seconds (or max_batch events are collected) and
+    then applied to the database at once (see PathChanges):
+
+        1. Moved files update the Path of their entry
+        2. Moves not reported as such (e.g. polling) are detected by file key and
+           name (see DataBase.match_moves)
+        3. Entries of deleted files are removed
+        4. Entries for new files are created
+
+    Only the entries of paths in the events are touched, so no full scan of the
+    filesystem or the database is required (except if events were lost or for
+    polling). The database is not saved. When running in a thread (start), the
+    database must only be accessed while holding lock.
+
+    Args:
+        database (DataBase) : Database to keep up to date
+        backend (str) : inotify, polling or auto (inotify if available)
+        debounce (float) : Seconds without new events before a batch is applied
+        max_batch (int) : Apply the batch once this many events are collected
+        poll_interval (float) : Seconds between polls for the polling backend
+        mod_id (bool) : If True, entries with the highest IDs are moved in the
+                        places of removed entries (see DataBase.fill_free_ids)
+        on_change (callable) : Called with the result of each applied batch
+
+    Raises:
+        RuntimeError : If inotify is requested but not available
+    """
+
+    def __init__(
+        self,
+        database: "DataBase",
+        backend: str = "auto",
+        debounce: float = 1.0,
+        max_batch: int = 10000,
+        poll_interval: float = 5.0,
+        mod_id: bool = False,
+        on_change: Callable[[dict], None] | None = None,
+    ) -> None:
+        self.database = database
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.mod_id = mod_id
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        if backend not in ["auto", "inotify", "polling"]:
+            raise KeyError("Unsupported watcher backend {0}".format(backend))
+        self.source = None
+        if backend in ["auto", "inotify"]:
+            try:
+                self.source = InotifySource(database.databaseRoot)
+            except RuntimeError:
+                if backend == "inotify":
+                    raise
+                logger.warning("inotify not available. Falling back to polling")
+        if self.source is None:
+            self.source = PollingSource(database.scanner, poll_interval)
+        logger.info("Watching %s with %s", database.databaseRoot, self.backend)
+
+    @property
+    def backend(self) -> str:
+        """Name of the used backend"""
+        return "inotify" if isinstance(self.source, InotifySource) else "polling"
+
+    def process(self, timeout: float | None = None) -> dict | None:
+        """
+        Wait up to timeout seconds for events, collect the batch and apply it.
+
+        Returns:
+            dict : Changes applied to the database (see apply) or None if there
+                   were no events
+        """
+        events = self.source.read(timeout)
+        if not events:
+            return None
+        while len(events) < self.max_batch:
+            more_events = self.source.read(self.debounce)
+            if not more_events:
+                break
+            events.extend(more_events)
+        events.extend(self.source.flush())
+        with self.lock:
+            result = self.apply(events)
+        if self.on_change is not None:
+            self.on_change(result)
+        return result
+
+    def apply(self, events: list[tuple]) -> dict:
+        """
+        Apply a batch of events to the database. New entries take the IDs of
+        entries removed in the batch first.
+
+        Returns:
+            dict : With keys moved (list of (ID, old path, new path)), removed (list
+                   of paths), id_changes (list of (old ID, new ID), see mod_id) and
+                   added (list of (path, ID))
+        """
+        database = self.database
+        changes = PathChanges(database)
+        for event in events:
+            kind = event[0]
+            if kind == "resync":
+                changes.resync(event[1] if len(event) > 1 else database.scanner.scan())
+            elif kind == "created":
+                changes.created(event[1])
+            elif kind == "deleted":
+                changes.deleted(event[1])
+            elif kind == "moved":
+                changes.moved(event[1], event[2])
+            elif kind == "dir_created":
+                changes.dir_created(event[1])
+            elif kind == "dir_deleted":
+                changes.dir_deleted(event[1])
+            elif kind == "dir_moved":
+                changes.dir_moved(event[1], event[2])
+            else:
+                raise RuntimeError("Invalid event {0}".format(event))
+
+        def get_entry(path: str) -> "EntryBase":
+            return database.get_entry_by_item_name("Path", path)[0]
+
+        moves = [
+            (get_entry(origin), path)
+            for path, origin in changes.current.items()
+            if origin is not None
+        ]
+        moved_origins = {origin for origin in changes.current.values()}
+        missing_entries = [
+            get_entry(path)
+            for path in sorted(changes.vacated)
+            if path not in moved_origins
+        ]
+        new_files = [path for path, origin in changes.current.items() if origin is None]
+        detected_moves = database.match_moves(new_files, missing_entries)
+        moves += detected_moves
+        moved_keys = {entry.key for entry, _ in moves}
+        removed_entries = [e for e in missing_entries if e.key not in moved_keys]
+
+        removed = [entry.Path for entry in removed_entries]
+        free_ids = [entry.ID for entry in removed_entries]
+        database.remove_many(free_ids)
+        moved = database.apply_moves(moves)
+        id_changes = []
+        if self.mod_id:
+            id_changes = database.fill_free_ids(free_ids)
+            free_ids = []
+        detected_files = {path for _, path in detected_moves}
+        added = []
+        # IDs above maxID (removed entries with the highest IDs) are assigned by
+        # counting up from maxID, so new entries get contiguous IDs
+        free_ids = sorted(
+            int(free_id) for free_id in free_ids if int(free_id) < database.maxID
+        )
+        for path in sorted(new_files):
+            if path in detected_files:
+                continue
+            if free_ids:
+                c_id = free_ids.pop(0)
+            else:
+                database.maxID += 1
+                c_id = database.maxID
+            added.append((path, c_id))
+        database.create_new_entries(added)
+        logger.info(
+            "Applied %s events: %s moved, %s removed, %s added",
+            len(events),
+            len(moved),
+            len(removed),
+            len(added),
+        )
+        return {
+            "moved": moved,
+            "removed": removed,
+            "id_changes": id_changes,
+            "added": added,
+        }
+
+    def start(self) -> None:
+        """Process events in a background thread until stop is called"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Errors of one batch (filesystem, invalid events or database
+            # modifications) are logged and do not stop the thread
+            try:
+                self.process(timeout=0.5)
+            except (OSError, RuntimeError, KeyError, IndexError, ValueError):
+                logger.exception("Failed to apply filesystem events")
+
+    def stop(self) -> None:
+        """Stop the background thread and release the event source"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
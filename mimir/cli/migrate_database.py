@@ -0,0 +1,45 @@
+import logging
+
+import click
+
+from mimir.backend.storage import BACKENDS, migrate
+
+log_format = "[%(asctime)s] %(name)-40s %(levelname)-8s %(message)s"
+logging.basicConfig(
+    format=log_format,
+    level="INFO",
+)
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("mimir_base")
+@click.option(
+    "--source",
+    help="Storage backend the database is currently saved with",
+    type=click.Choice(list(BACKENDS.keys())),
+    default="json",
+    show_default=True,
+)
+@click.option(
+    "--target",
+    help="Storage backend the database will be saved with",
+    type=click.Choice(list(BACKENDS.keys())),
+    default="sqlite",
+    show_default=True,
+)
+def cli(mimir_base: str, source: str, target: str) -> None:
+    """
+    Cli script for migrating the database saved in MIMIR_BASE/.mimir to a different
+    storage backend. The source file is kept as is. When loading the database the
+    SQLite backend is preferred if present.
+    """
+    if mimir_base.endswith("/"):
+        mimir_base = mimir_base[:-1]
+    logger.info("Migrating database in %s from %s to %s", mimir_base, source, target)
+    migrate(mimir_base + "/.mimir", source=source, target=target)
+
+
+if __name__ == "__main__":
+    cli()
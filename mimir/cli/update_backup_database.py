@@ -2,6 +2,7 @@ import logging
 
 import click
 
+from mimir.backend.reconcile import reconcile
 from mimir.frontend.terminal.application import init_database
 
 log_format = "[%(asctime)s] %(name)-40s %(levelname)-8s %(message)s"
@@ -15,7 +16,10 @@ logger = logging.getLogger(__name__)
 
 @click.command()
 @click.argument("mimir_base")
-def cli(mimir_base):
+@click.option(
+    "--dry-run", is_flag=True, help="Only report the changes. Nothing is saved"
+)
+def cli(mimir_base: str, dry_run: bool) -> None:
     """
     Cli script for updating the database saved in MIMIR_BASE/.mimir. Equivalent to
     running MTF and doing "missing files" and "Update paths" in database options.
@@ -24,14 +28,12 @@ def cli(mimir_base):
 
     database, status = init_database(mimir_base)
     logger.info("Got database at %s with status %s", database, status)
-    logger.info("Checking paths")
-    database.check_changed_paths()
-    logger.info("Checking missing files")
-    database.check_missing_files(mod_id=False)
-    logger.info("Resetting entry ids")
-    database.reset_entry_ids()
-    logger.info("Saving database")
-    database.save_main()
+    logger.info("Reconciling database with filesystem")
+    result = reconcile(database, dry_run=dry_run)
+    click.echo(result.summary())
+    if not dry_run:
+        logger.info("Saving database")
+        database.save_main()
 
 
 if __name__ == "__main__":
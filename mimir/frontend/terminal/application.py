@@ -206,13 +206,17 @@ class App:
                 query_string = self.listWindow.interact(
                     "Enter Query", None, onlyInteraction=True
                 )
-                this_query = query_string.split(" ")
-                query_ids = self.database.query(
-                    self.config.queryItems, this_query, return_ids=True
-                )
+                query_ids, prefix_matches = self.get_query_ids(query_string)
                 query_ids = sorted(query_ids, key=lambda x: int(x))
                 table_elements = self.generate_list(query_ids)
                 self.listWindow.lines = []
+                if prefix_matches:
+                    self.listWindow.draw_pre_table_title("-", [(" ", "-")])
+                    self.listWindow.draw_pre_table_title(
+                        f"_no_exact_matches_-_prefix_matches_for_{query_string}_",
+                        [(" ", "-"), ("_", " ")],
+                    )
+                    self.listWindow.draw_pre_table_title("-", [(" ", "-")])
                 self.listWindow.update(table_elements)
             elif ret_val == "6":
                 n_display = self.config.restrictedListLen
@@ -221,9 +225,9 @@ class App:
                         n_display = int(add_vals[0])
                     except ValueError:
                         pass
-                sorted_ids = self.database.get_sorted_ids("Added", reverse_order=True)[
-                    0:n_display
-                ]
+                sorted_ids = self.database.get_sorted_ids(
+                    "Added", reverse_order=True, limit=n_display
+                )
                 table_elements = self.generate_list(sorted_ids)
                 self.listWindow.lines = []
                 self.listWindow.draw_pre_table_title("-", [(" ", "-")])
@@ -240,9 +244,9 @@ class App:
                         n_display = int(add_vals[0])
                     except ValueError:
                         pass
-                sorted_ids = self.database.get_sorted_ids("Opened", reverse_order=True)[
-                    0:n_display
-                ]
+                sorted_ids = self.database.get_sorted_ids(
+                    "Opened", reverse_order=True, limit=n_display
+                )
                 table_elements = self.generate_list(sorted_ids)
                 self.listWindow.lines = []
                 self.listWindow.draw_pre_table_title("-", [(" ", "-")])
@@ -260,8 +264,8 @@ class App:
                     except ValueError:
                         pass
                 sorted_ids = self.database.get_sorted_ids(
-                    "Changed", reverse_order=True
-                )[0:n_display]
+                    "Changed", reverse_order=True, limit=n_display
+                )
                 table_elements = self.generate_list(sorted_ids)
                 self.listWindow.lines = []
                 self.listWindow.draw_pre_table_title("-", [(" ", "-")])
@@ -458,18 +462,16 @@ class App:
         Entries
         """
         id_list = sorted(id_list, key=lambda x: int(x))
+        all_ids = self.database.get_all_value_by_item_name("ID")
         _validIDs = []
         _rmIDs = []
         for ID in id_list:
-            if int(ID) > len(self.database.entries) - 1:
+            if str(int(ID)) not in all_ids:
                 _rmIDs.append(ID)
             else:
                 _validIDs.append(ID)
         if len(_rmIDs) > 0:
-            window.update(
-                "ids %s are larger than max (%s)"
-                % (_rmIDs, len(self.database.entries) - 1)
-            )
+            window.update("ids %s are not in the database" % _rmIDs)
         if len(_validIDs) > 0:
             window.update("id_list : %s" % _validIDs)
             self.mod_list_of_items(self.modWindow, _validIDs)
@@ -539,33 +541,32 @@ class App:
         method = window.draw("Choose Method (Append/App/A | Replace/RP | Remove/RM)")
         if method.lower() in ["append", "app", "a"]:
             newValue = window.draw("New Value")
-            for ID in ids:
-                self.make_list_modifications(ID, name, "Append", None, newValue)
-                if verbose:
-                    window.update("Appended %s" % newValue)
+            with self.database.batch() as batch:
+                for ID in ids:
+                    batch.append(ID, name, newValue)
+                    if verbose:
+                        window.update("Appended %s" % newValue)
         elif method.lower() in ["remove", "rm"]:
             oldValue = window.draw("Remove Value")
-            for ID in ids:
-                sucess = self.make_list_modifications(
-                    ID, name, "Remove", oldValue, None
-                )
-                if sucess:
-                    if verbose:
-                        window.update("Removed %s from entry" % oldValue)
-                else:
-                    window.update("Value %s no in entry" % oldValue)
+            with self.database.batch() as batch:
+                for ID in ids:
+                    if self.has_list_value(ID, name, oldValue):
+                        batch.remove(ID, name, oldValue)
+                        if verbose:
+                            window.update("Removed %s from entry" % oldValue)
+                    else:
+                        window.update("Value %s no in entry" % oldValue)
         elif method.lower() in ["replace", "rp"]:
             oldValue = window.draw("Value to replace")
             newValue = window.draw("New Value")
-            for ID in ids:
-                sucess = self.make_list_modifications(
-                    ID, name, "Replace", oldValue, newValue
-                )
-                if not sucess:
-                    window.update("Value %s no in entry" % oldValue)
-                else:
-                    if verbose:
-                        window.update("Replaces %s with %s" % (oldValue, newValue))
+            with self.database.batch() as batch:
+                for ID in ids:
+                    if self.has_list_value(ID, name, oldValue):
+                        batch.replace(ID, name, newValue, oldValue)
+                        if verbose:
+                            window.update("Replaces %s with %s" % (oldValue, newValue))
+                    else:
+                        window.update("Value %s no in entry" % oldValue)
         else:
             window.update("!!! - %s is Invalid Method" % method)
         if fromMultiMod:
@@ -573,6 +574,10 @@ class App:
                 ids[0], name, joinFull=True
             )
 
+    def has_list_value(self, ID: str, name: str, value: str) -> bool:
+        """Check if value is in ListItem name of the entry with ID"""
+        return value in self.database.get_entry_by_id(ID).get_item(name).value
+
     def mod_list_of_items(self, window, ids):
         """
         Multiple modification of a single Item
@@ -580,8 +585,9 @@ class App:
         item = window.draw("Change item ({0})".format(" | ".join(self.config.modItems)))
         if item in self.modSingleItems:
             newValue = window.draw("New Value for %s" % item)
-            for ID in ids:
-                self.database.modify_single_entry(ID, item, newValue, by_id=True)
+            with self.database.batch() as batch:
+                for ID in ids:
+                    batch.set(ID, item, newValue)
         elif item in self.modListItems:
             self.mod_list_item(window, ids, item, verbose=False)
         else:
@@ -597,8 +603,9 @@ class App:
             )
         if name in self.modSingleItems:
             newValue = window.draw("New Value for %s" % name)
-            for ID in ids:
-                self.database.modify_single_entry(ID, name, newValue, by_id=True)
+            with self.database.batch() as batch:
+                for ID in ids:
+                    batch.set(ID, name, newValue)
             if fromMultiMod:
                 window.headerTextSecondary[name] = self.get_print_item_values(
                     ids[0], name, joinFull=True
@@ -672,8 +679,12 @@ class App:
         if not self.lastIDList:
             window.print("No entries to choose from. Maybe requery?")
         else:
+            choose_from = self.lastIDList
+            if len(choose_from) == len(self.database.entries):
+                # All entries listed -> Draw from the samplers of the database
+                choose_from = None
             randID = self.database.get_random_entry(
-                choose_from=self.lastIDList, weighted=weighted
+                choose_from=choose_from, weighted=weighted
             )
             _listIDList = self.lastIDList
             if fromList:
@@ -685,6 +696,26 @@ class App:
                 window.update("Executing entry with ID {0}".format(randID))
             self.execute(randID, window, fromList, silent=silent)
 
+    def get_query_ids(self, query_string: str) -> tuple[list[str], bool]:
+        """
+        Get the IDs returned by a query on the configured query items. Only if a single
+        word without veto returns no exact matches, the entries with a word in Name or
+        Path starting with it are returned instead.
+
+        Args:
+            query_string (str) : Query as entered by the user
+
+        Returns:
+            tuple : List of IDs and a bool that is True if the IDs are prefix matches
+        """
+        this_query = query_string.split(" ")
+        query_ids = self.database.query(
+            self.config.queryItems, this_query, return_ids=True
+        )
+        if query_ids or len(this_query) > 1 or query_string.startswith("!"):
+            return list(query_ids), False
+        return self.database.complete(query_string), True
+
     def toggle_for_deletion(self, ID, window):
         if ID not in self.database.get_all_value_by_item_name("ID"):
             window.update("ID %s not in database" % ID)
@@ -783,9 +814,9 @@ class App:
         """
         thisValue = []
         for priority in self.config.itemInfo[item]["Priority"]:
-            if priority in entry.getItem(item).value:
+            if priority in entry.get_item(item).value:
                 thisValue.append(priority)
-        loopVals = deepcopy(entry.getItem(item).value)
+        loopVals = deepcopy(entry.get_item(item).value)
         if self.config.itemInfo[item]["Sorting"] == "reverse":
             loopVals.reverse()
         for val in loopVals:
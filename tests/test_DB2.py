@@ -9,6 +9,7 @@ import sys
 # DEBUGGING
 import tracemalloc
 import unittest
+from collections import Counter
 from glob import glob
 
 import coverage
@@ -18,8 +19,10 @@ import pytest
 # sys.path.insert(0, os.path.abspath('.'))
 # print(sys.path)
 import mimir.backend.database
+import mimir.backend.helper
 from mimir.backend.database import DataBase, Model
-from mimir.backend.entry import Item, ListItem
+from mimir.backend.entry import DataBaseEntry, Item, ListItem
+from mimir.backend.enums import RandomWeightingMethod
 
 if os.getcwd().endswith("tests"):
     mimir_dir = os.getcwd()[0 : -len("/tests")]
@@ -173,8 +176,8 @@ def test_02_DB_init_new():
         if entry.Path not in filesindbRoot:
             allEntriesSaved = False
     assert allEntriesSaved
-    for item in database.model.allItems:
-        assert not database.cachedValuesChanged[item]
+    assert database.cachedValues.keys() == database.model.allItems
+    assert database.get_all_value_by_item_name("Path") == set(filesindbRoot)
     del database
 
 
@@ -709,27 +712,34 @@ def test_24_DB_countListItem(ID, nExpected, preCreatedDB):
 
 
 def test_25_DB_cachedValues(mocker, preCreatedDB):
-    assert preCreatedDB.cachedValuesChanged.keys() == preCreatedDB.model.allItems
-    mocker.spy(DataBase, "cacheAllValuebyItemName")
+    database = copy.deepcopy(preCreatedDB)
+    assert database.cachedValues.keys() == database.model.allItems
+    mocker.spy(DataBase, "cache_all_value_by_item_name")
     ###### Test caching for ListItem entries
-    values_ListItem_preChange = preCreatedDB.getAllValuebyItemName("ListItem")
-    assert DataBase.cache_all_value_by_item_name.call_count == 0
-    preCreatedDB.modifyListEntry("4", "ListItem", "Cyan", byID=True)
-    values_ListItem_postChange = preCreatedDB.getAllValuebyItemName("ListItem")
-    assert DataBase.cache_all_value_by_item_name.call_count == 1
-    assert list(set(values_ListItem_postChange) - set(values_ListItem_preChange)) == [
-        "Cyan"
-    ]
+    values_ListItem_preChange = set(database.get_all_value_by_item_name("ListItem"))
+    database.modify_list_entry("4", "ListItem", "Cyan", by_id=True)
+    values_ListItem_postChange = database.get_all_value_by_item_name("ListItem")
+    assert list(set(values_ListItem_postChange) - values_ListItem_preChange) == ["Cyan"]
+    assert database.get_value_counts("ListItem")["Lavender"] == 2
+    database.modify_list_entry("4", "ListItem", None, "Remove", "Lavender", by_id=True)
+    assert database.get_value_counts("ListItem")["Lavender"] == 1
+    assert "Lavender" in database.get_all_value_by_item_name("ListItem")
+    database.modify_list_entry("3", "ListItem", None, "Remove", "Lavender", by_id=True)
+    assert "Lavender" not in database.get_all_value_by_item_name("ListItem")
     ###### Test caching for SingleItem Entries
-    Entry4 = preCreatedDB.getEntryByItemName("ID", "4")[0]
-    oldValue = Entry4.getItem("SingleItem").value
+    Entry4 = database.get_entry_by_item_name("ID", "4")[0]
+    oldValue = Entry4.get_item("SingleItem").value
     newValue = "Gamma"
-    preCreatedDB.modifySingleEntry("4", "SingleItem", newValue, byID=True)
-    values_ListItem_postChange = preCreatedDB.getAllValuebyItemName("SingleItem")
-    assert DataBase.cache_all_value_by_item_name.call_count == 2
+    database.modify_single_entry("4", "SingleItem", newValue, by_id=True)
+    values_SingleItem_postChange = database.get_all_value_by_item_name("SingleItem")
     assert (
-        oldValue not in values_ListItem_postChange
-        and newValue in values_ListItem_postChange
+        oldValue not in values_SingleItem_postChange
+        and newValue in values_SingleItem_postChange
+    )
+    ###### Values are never recomputed from all entries
+    assert DataBase.cache_all_value_by_item_name.call_count == 0
+    assert database.get_value_counts("Rating") == Counter(
+        [e.Rating for e in database.entries]
     )
 
 
@@ -787,5 +797,476 @@ def test_28_DB_checkMissingFileAndReSort(preCreatedDB):
     )
 
 
+def test_29_DB_singleItemIndex():
+    config = mimir_dir + "/conf/modeltest.json"
+    dbRootPath = dir2tests + "/testStructure"
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+    database = DataBase(dbRootPath, "new", config)
+    assert set(database._index.keys()) == set(database.model.items.keys())
+    assert set(database._index["ID"].keys()) == set(
+        str(i) for i in range(len(database.entries))
+    )
+    # Modification through the database
+    database.modify_single_entry("1", "SingleItem", "Indexed", by_id=True)
+    entry = database.get_entry_by_item_name("ID", "1")[0]
+    assert database.get_entry_by_item_name("SingleItem", "Indexed") == [entry]
+    # Modification directly on the entry
+    entry.change_item_value("SingleItem", "IndexedAgain")
+    assert database.get_entry_by_item_name("SingleItem", "Indexed") == []
+    assert database.get_entry_by_item_name("SingleItem", "IndexedAgain") == [entry]
+    # Removal
+    database.remove("1", by_id=True)
+    assert "1" not in database._index["ID"]
+    assert database.get_entry_by_item_name("SingleItem", "IndexedAgain") == []
+    assert entry.observer is None
+    # Index after loading
+    database.save_main()
+    loadedDB = DataBase(dbRootPath, "load")
+    for item in database._index:
+        assert database._index[item].keys() == loadedDB._index[item].keys()
+    path = database.entries[0].Path
+    assert loadedDB.get_entry_by_item_name("Path", path)[0] == database.entries[0]
+
+
+@pytest.mark.parametrize(
+    "Query, IDsExp",
+    [
+        ("!Lavender", ["0", "1", "2", "5"]),
+        ("!Xi", ["1", "2", "3", "4", "5"]),
+        ("!Eta Lavender", ["4"]),
+        ("Orange", ["0"]),
+        ("Lavender !Pinkish", ["3"]),
+        ("Lavender Pinkish Spring", ["4"]),
+        ("Lavender Blue", []),
+    ],
+)
+def test_30_DB_query_postings(Query, IDsExp, preCreatedDB):
+    qList = Query.split(" ")
+    resultID = preCreatedDB.query(["SingleItem", "ListItem"], qList, return_ids=True)
+    assert resultID == IDsExp
+    resultEntries = preCreatedDB.query(["SingleItem", "ListItem"], qList)
+    assert [e.ID for e in resultEntries] == IDsExp
+
+
+def test_31_DB_query_postings_update(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    database.modify_list_entry("1", "ListItem", "Deep Purple", by_id=True)
+    assert database.query("ListItem", "Purple", return_ids=True) == ["1"]
+    database.modify_list_entry(
+        "1", "ListItem", "Light Purple", "Replace", "Deep Purple", by_id=True
+    )
+    assert database.query("ListItem", "Deep", return_ids=True) == []
+    assert database.query("ListItem", "Purple", return_ids=True) == ["1"]
+    # Postings follow ID changes
+    database.modify_single_entry("1", "ID", "99", by_id=True)
+    assert database.query("ListItem", "Purple", return_ids=True) == ["99"]
+    # Items not in SecondaryDBs are indexed on first use
+    database.modify_single_entry("99", "Rating", "5", by_id=True)
+    assert database.query("Rating", "5", return_ids=True) == ["3", "99"]
+    database.modify_single_entry("3", "Rating", "4", by_id=True)
+    assert database.query("Rating", "5", return_ids=True) == ["99"]
+    # Removed entries are removed from postings
+    database.remove("99", by_id=True)
+    assert database.query("ListItem", "Purple", return_ids=True) == []
+    assert database.query("Rating", "5", return_ids=True) == []
+
+
 if __name__ == "__main__":
     unittest.main()
+
+
+def test_32_DB_sharedScan(preCreatedDB, mocker):
+    database = copy.deepcopy(preCreatedDB)
+    files = [e.Path for e in database.entries]
+    scan_spy = mocker.spy(database.scanner, "scan")
+    files.remove("folder2/folder2file2.mp4")
+    files.append("folder2/folder2file3.mp4")
+    assert database.get_missing_files(files=files) == ["folder2/folder2file2.mp4"]
+    assert database.find_new_files(files=files)[0] == ["folder2/folder2file3.mp4"]
+    assert database.check_changed_paths(files=files) == []
+    assert scan_spy.call_count == 0
+
+
+def test_33_DB_checkChangedPaths_inode(tmp_path):
+    config = mimir_dir + "/conf/modeltest.json"
+    for path in ["a.mp4", "sub1/b.mp4", "sub1/sub2/c.mp4", "sub3/b.mp4"]:
+        os.makedirs(os.path.dirname(str(tmp_path / path)), exist_ok=True)
+        (tmp_path / path).write_text(path)
+    database = DataBase(str(tmp_path), "new", config, plugin_workers=1)
+    assert database.save_main()
+    ids = {e.Path: e.ID for e in database.entries}
+    # Rename, directory move and files with the same name
+    os.rename(str(tmp_path / "a.mp4"), str(tmp_path / "renamed.mp4"))
+    os.rename(str(tmp_path / "sub1"), str(tmp_path / "moved"))
+    os.rename(str(tmp_path / "sub3/b.mp4"), str(tmp_path / "sub3/x.mp4"))
+    loadedDB = DataBase(str(tmp_path), "load")
+    assert loadedDB.file_keys == database.file_keys
+    updated = loadedDB.check_changed_paths()
+    assert sorted(updated) == sorted(
+        [
+            (ids["a.mp4"], "a.mp4", "renamed.mp4"),
+            (ids["sub1/b.mp4"], "sub1/b.mp4", "moved/b.mp4"),
+            (ids["sub1/sub2/c.mp4"], "sub1/sub2/c.mp4", "moved/sub2/c.mp4"),
+            (ids["sub3/b.mp4"], "sub3/b.mp4", "sub3/x.mp4"),
+        ]
+    )
+    assert "a.mp4" not in loadedDB.file_keys
+    assert "renamed.mp4" in loadedDB.file_keys
+    assert loadedDB.check_changed_paths() == []
+    # Without recorded inodes only unique names are matched
+    loadedDB.file_keys = {}
+    os.rename(str(tmp_path / "moved/b.mp4"), str(tmp_path / "b.mp4"))
+    os.rename(str(tmp_path / "sub3/x.mp4"), str(tmp_path / "moved/x2.mp4"))
+    assert loadedDB.check_changed_paths() == [
+        (ids["sub1/b.mp4"], "moved/b.mp4", "b.mp4")
+    ]
+
+
+def test_34_DB_removeMany(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    changed = {e.ID: list(e.Changed) for e in database.entries}
+    removed_paths = [database.get_entry_by_id(i).Path for i in ("1", "4")]
+    removed = database.remove_many(["1", 4])
+    assert sorted(e.ID for e in removed) == ["1", "4"]
+    assert [e.ID for e in database.entries] == ["0", "2", "3", "5"]
+    for path in removed_paths:
+        assert database.get_entry_by_item_name("Path", path) == []
+    assert database.get_entry_by_item_name("SingleItem", "Tau") == []
+    assert {e.ID: list(e.Changed) for e in database.entries} == {
+        i: changed[i] for i in ("0", "2", "3", "5")
+    }
+    with pytest.raises(IndexError):
+        database.remove_many(["0", "1"])
+    assert len(database.entries) == 4
+
+
+def test_35_DB_renumber(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    changed = {e.Path: list(e.Changed) for e in database.entries}
+    path_1 = database.get_entry_by_id(1).Path
+    path_5 = database.get_entry_by_id(5).Path
+    database.renumber({"1": "5", 5: 1})
+    assert database.get_entry_by_id(5).Path == path_1
+    assert database.get_entry_by_id(1).Path == path_5
+    assert database.get_entry_by_item_name("SingleItem", "Tau")[0].ID == "5"
+    assert {e.Path: list(e.Changed) for e in database.entries} == changed
+    with pytest.raises(IndexError):
+        database.renumber({"10": "11"})
+    with pytest.raises(RuntimeError):
+        database.renumber({"1": "2"})
+    database.remove_many(["0", "3"])
+    database.reset_entry_ids()
+    assert sorted(e.ID for e in database.entries) == ["0", "1", "2", "3"]
+    assert database.maxID == 3
+    assert {e.Path: list(e.Changed) for e in database.entries} == {
+        e.Path: changed[e.Path] for e in database.entries
+    }
+
+
+def test_36_DB_checkMissingFiles_maxID(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    files = [e.Path for e in database.entries]
+    max_entry = database.get_entry_by_id(database.maxID)
+    files.remove(max_entry.Path)
+    files.remove(database.get_entry_by_id(0).Path)
+    moved_path = database.get_entry_by_id(database.maxID - 1).Path
+    id_changes = database.check_missing_files(files=files)
+    assert id_changes == [(database.maxID + 1, "0")]
+    assert database.get_entry_by_id(0).Path == moved_path
+    assert sorted(int(e.ID) for e in database.entries) == list(range(4))
+
+
+def test_37_DB_stableKeys(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    entry = database.get_entry_by_id(4)
+    key = entry.key
+    assert database.get_entry_by_key(key) is entry
+    database.remove("2", by_id=True)
+    database.modify_single_entry("4", "ID", "10", by_id=True)
+    assert entry.key == key
+    assert database.query("ListItem", "Lavender", return_ids=True) == ["3", "10"]
+    assert database.compact_ids() == [("3", "2"), ("5", "3"), ("10", "4")]
+    assert database.get_entry_by_key(key).ID == "4"
+    assert database.query("ListItem", "Lavender", return_ids=True) == ["2", "4"]
+    assert database.compact_ids() == []
+    assert database.maxID == 4
+    database.save_main()
+    loadedDB = DataBase(database.databaseRoot, "load")
+    assert loadedDB.get_entry_by_id(4).Path == entry.Path
+
+
+def test_38_DB_batch(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    n_changed = {e.ID: len(e.Changed) for e in database.entries}
+    with database.batch() as batch:
+        for entry_id in ["1", "2"]:
+            batch.set(entry_id, "SingleItem", "Batched")
+            batch.set(entry_id, "Rating", "1")
+            batch.append(entry_id, "ListItem", "Magenta")
+            batch.append(entry_id, "ListItem", "Cyan")
+        batch.remove("2", "ListItem", "Cyan")
+    assert sorted(e.ID for e in batch.modified) == ["1", "2"]
+    for entry_id in ["1", "2"]:
+        entry = database.get_entry_by_id(entry_id)
+        assert len(entry.Changed) == n_changed[entry_id] + 1
+        assert entry.Rating == "1"
+    assert len(database.get_entry_by_id("0").Changed) == n_changed["0"]
+    assert [e.ID for e in database.get_entry_by_item_name("SingleItem", "Batched")] == [
+        "1",
+        "2",
+    ]
+    assert database.query("ListItem", "Magenta", return_ids=True) == ["1", "2"]
+    assert database.query("ListItem", "Cyan", return_ids=True) == ["1"]
+    assert database.get_value_counts("ListItem")["Magenta"] == 2
+    # Invalid batches do not change anything
+    before = [e.get_dict_repr() for e in database.entries]
+    with pytest.raises(IndexError):
+        database.apply_mutations(
+            [("1", "Rating", "Set", "2", None), ("100", "Rating", "Set", "2", None)]
+        )
+    with pytest.raises(TypeError):
+        database.apply_mutations([("1", "ListItem", "Set", "2", None)])
+    with pytest.raises(ValueError):
+        database.apply_mutations(
+            [
+                ("1", "Rating", "Set", "2", None),
+                ("2", "ListItem", "Remove", None, "NotThere"),
+            ]
+        )
+    with pytest.raises(RuntimeError):
+        with database.batch() as batch:
+            batch.set("1", "Rating", "3")
+            raise RuntimeError
+    # IDs have to be unique after the batch
+    with pytest.raises(RuntimeError):
+        database.apply_mutations(
+            [("1", "Rating", "Set", "2", None), ("1", "ID", "Set", "2", None)]
+        )
+    with pytest.raises(RuntimeError):
+        database.apply_mutations(
+            [("1", "ID", "Set", "10", None), ("2", "ID", "Set", "10", None)]
+        )
+    assert [e.get_dict_repr() for e in database.entries] == before
+    assert database.get_entry_by_item_name("Rating", "2") == []
+    assert database.get_value_counts("Rating")["1"] == 3
+    # Swapping IDs is allowed
+    path_1 = database.get_entry_by_id("1").Path
+    database.apply_mutations(
+        [("1", "ID", "Set", "2", None), ("2", "ID", "Set", "1", None)]
+    )
+    assert database.get_entry_by_id("2").Path == path_1
+    assert len(database.get_entry_by_item_name("ID", "1")) == 1
+
+
+def test_39_DB_getSortedIDs_limit(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    database.modify_list_entry("4", "Opened", "01.02.20|10:00:00", by_id=True)
+    database.modify_list_entry("2", "Opened", "01.02.21|10:00:00", by_id=True)
+    database.modify_list_entry("5", "Opened", "01.02.21|10:00:00", by_id=True)
+
+    def reference(item, reverse):
+        pairs = []
+        for entry in database.entries:
+            value = entry.get_item(item).value
+            if item in ("Opened", "Changed"):
+                value = max(
+                    mimir.backend.helper.convertToDateTime(v)
+                    if "|" in v
+                    else datetime.datetime(2000, 1, 1)
+                    for v in value
+                )
+            elif item == "Rating":
+                value = int(value)
+            pairs.append(
+                (value, -int(entry.ID) if reverse else int(entry.ID), entry.ID)
+            )
+        return [p[2] for p in sorted(pairs, reverse=reverse)]
+
+    for item in ["Opened", "Changed", "Rating", "SingleItem"]:
+        for reverse in [True, False]:
+            expected = reference(item, reverse)
+            assert database.get_sorted_ids(item, reverse) == expected
+            assert database.get_sorted_ids(item, reverse, limit=3) == expected[:3]
+    assert database.get_sorted_ids("Opened", limit=3) == ["2", "5", "4"]
+    # Ordered index and sort keys follow changes
+    database.update_opened("1")
+    database.modify_single_entry("2", "ID", "7", by_id=True)
+    database.remove("4", by_id=True)
+    database.modify_single_entry("0", "Rating", "5", by_id=True)
+    assert database.get_sorted_ids("Opened", limit=3) == ["1", "5", "7"]
+    for item in ["Opened", "Changed", "Rating"]:
+        for reverse in [True, False]:
+            assert database.get_sorted_ids(item, reverse) == reference(item, reverse)
+
+
+def test_40_DB_sortValues(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    model = database.model
+    assert model.get_sort_value("Rating", "4") == 4
+    assert model.get_sort_value("SingleItem", "4") == "4"
+    epoch = model.get_sort_value("Added", "02.03.21|04:05:06")
+    assert epoch == int(
+        datetime.datetime(2021, 3, 2, 4, 5, 6)
+        .replace(tzinfo=datetime.timezone.utc)
+        .timestamp()
+    )
+    assert model.get_sort_value("Opened", ["emptyOpened", "02.03.21|04:05:06"]) == epoch
+    # Sort keys are created on first request and follow changes
+    assert "Rating" not in database._sort_keys
+    ratings = database.get_sort_keys("Rating")
+    assert ratings[database.get_entry_by_id(3).key] == 5
+    database.modify_single_entry("3", "Rating", "2", by_id=True)
+    assert ratings[database.get_entry_by_id(3).key] == 2
+    # Entries keep the string values
+    assert database.get_entry_by_id(3).Rating == "2"
+    # Invalid values do not prevent modifications
+    database.modify_single_entry("3", "Rating", "many", by_id=True)
+    assert "Rating" not in database._sort_keys
+    with pytest.raises(ValueError):
+        database.get_sorted_ids("Rating")
+
+
+def test_41_DB_getItemsByPaths(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    paths = [
+        "testStructure/Blue/Xi.mp4",
+        "testStructure/Pink/bluexi.mp4",
+        "testStructure/Pink/Orange_Hand.mp4",
+    ]
+    options = database.get_items_by_paths(paths)
+    assert list(options.keys()) == paths
+    for path in paths:
+        assert options[path] == database.get_items_by_path(path)
+    assert options[paths[0]] == {"SingleItem": {"Xi"}, "ListItem": {"Blue"}}
+    assert options[paths[1]] == {"SingleItem": {"Xi"}, "ListItem": {"Blue"}}
+    assert options[paths[2]]["ListItem"] == {"Triple Orange", "Double Orange"}
+    # The matcher is rebuilt only if the values change
+    matcher = database.get_path_matcher()
+    database.modify_single_entry("1", "Rating", "2", by_id=True)
+    assert database.get_path_matcher() is matcher
+    database.modify_list_entry("1", "ListItem", "Red", by_id=True)
+    assert database.get_path_matcher() is not matcher
+    assert database.get_items_by_path("testStructure/Pink/Red.mp4")["ListItem"] == {
+        "Red"
+    }
+    # Elements matching values of multiple items
+    database.modify_single_entry("1", "SingleItem", "Blue", by_id=True)
+    options = database.get_items_by_path("testStructure/Blue/Xi.mp4")
+    assert options["SingleItem"] == {"Blue", "Xi"}
+    assert options["ListItem"] == {"Blue"}
+
+
+def test_42_DB_complete(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    assert database.complete("fold") == ["1", "2", "3", "4", "5"]
+    assert database.complete("FOLDER2") == ["3", "4", "5"]
+    assert database.complete("folder2file", limit=1) == ["3"]
+    assert database.complete("folder3") == ["5"]
+    assert database.complete("xyz") == []
+    assert database.complete("") == []
+    # The index follows modifications
+    database.modify_single_entry("0", "Name", "Something Else", by_id=True)
+    assert database.complete("some") == ["0"]
+    assert database.complete("some els") == ["0"]
+    assert database.complete("some fold") == []
+    assert database.complete("rootfile") == ["0"]
+    database.modify_single_entry("0", "Path", "folder9/other.mp4", by_id=True)
+    assert database.complete("rootfile") == []
+    assert database.complete("folder9") == ["0"]
+    database.remove("0", by_id=True)
+    assert database.complete("some") == []
+    assert "something" not in database._completion.tokens
+
+
+def test_43_DB_randomSampler(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    all_ids = set(database.get_all_value_by_item_name("ID"))
+    assert database.get_random_entry() in all_ids
+    assert database.get_random_entry(weighted=True) in all_ids
+    sampler = database.get_sampler(RandomWeightingMethod.TIMES_OPENED)
+    entry = database.get_entry_by_id(2)
+    assert sampler.get(entry.key) == 5
+    # Weights follow the executions
+    database.update_opened("2")
+    assert sampler.get(entry.key) == pytest.approx(1 / 3)
+    database.modify_list_entry("2", "Opened", "01.01.20|10:00:00", by_id=True)
+    assert sampler.get(entry.key) == pytest.approx(1 / 5)
+    # Recently executed entries are not chosen
+    for id_ in ["0", "1", "2", "3", "4"]:
+        database.last_executed_ids.append(id_)
+    for weighted in (False, True):
+        assert database.get_random_entry(weighted=weighted) == "5"
+        assert database.get_random_entry(["1", "5"], weighted=weighted) == "5"
+    database.remove("5", by_id=True)
+    with pytest.raises(IndexError):
+        database.get_random_entry()
+    with pytest.raises(NotImplementedError):
+        database.get_random_entry(weighted=True, method=RandomWeightingMethod.OPENED)
+
+
+def test_44_DB_contentHashes(preCreatedDB, monkeypatch):
+    database = copy.deepcopy(preCreatedDB)
+    other = copy.deepcopy(preCreatedDB)
+    assert database == other
+    assert database.get_root_hash() == other.get_root_hash()
+    assert not database.diff(other)
+    # Diff by ID
+    other.modify_single_entry("2", "Rating", "1", by_id=True)
+    other.remove("5", by_id=True)
+    assert database != other
+    diff = database.diff(other)
+    assert [entry.ID for entry in diff.added] == ["5"]
+    assert diff.removed == []
+    assert [(a.ID, b.ID) for a, b in diff.changed] == [("2", "2")]
+    assert [entry.ID for entry in other.diff(database).removed] == ["5"]
+    # The root hash does not depend on the order of the entries
+    root = database.get_root_hash()
+    entry = database.get_entry_by_id(0)
+    database.remove_from_index(entry)
+    database.entries.remove(entry)
+    assert database.get_root_hash() != root
+    database.entries.add(entry)
+    database.add_to_index(entry)
+    assert database.get_root_hash() == root
+    # get_status compares with the saved root hash
+    os.makedirs(database.mimirdir, exist_ok=True)
+    database.save_main()
+    assert os.path.exists(database.hash_path)
+
+    def no_readonly(*args, **kwargs):
+        raise AssertionError("Saved database should not be read")
+
+    monkeypatch.setattr(mimir.backend.readonly, "ReadOnlyDataBase", no_readonly)
+    assert database.get_status()
+    entry = database.get_entry_by_id(2)
+    entry.change_item_value("Rating", "1")
+    assert not database.get_status()
+    # Reverted changes are detected
+    entry.change_item_value("Rating", "4")
+    assert database.get_status()
+    # Hash is ignored if the saved database changed
+    monkeypatch.undo()
+    os.utime(database.savepath, ns=(0, 0))
+    assert database.load_root_hash() is None
+    assert database.get_status()
+    shutil.rmtree(database.mimirdir)
+
+
+def test_45_DB_compactEntries(preCreatedDB):
+    database = copy.deepcopy(preCreatedDB)
+    entry_class = database.model.entry_class
+    assert entry_class is not None
+    assert all(type(entry) is entry_class for entry in database.entries)
+    saved = {"ID": {"type": "Single", "value": "1"}}
+    assert type(database.model.entry_from_dict(saved)) is DataBaseEntry
+    entry = database.get_entry_by_id(1)
+    database.modify_list_entry("1", "ListItem", "Red", by_id=True)
+    assert "Red" in entry.ListItem
+    assert "Red" in database.get_all_value_by_item_name("ListItem")
+    assert database.query(["ListItem"], ["Red"]) == [entry]
+    assert database.model.entry_from_dict(entry.get_dict_repr()) == entry
+    # Items in another order than the model still use the compact class
+    saved = dict(reversed(list(entry.get_dict_repr().items())))
+    assert type(database.model.entry_from_dict(saved)) is entry_class
+    assert database.model.entry_from_dict(saved) == entry
@@ -1,10 +1,12 @@
 # flake8: noqa
+import copy
+import pickle
 import unittest
 
 import pytest
 
 # sys.path.insert(0, os.path.abspath('..'))
-from mimir.backend.entry import DataBaseEntry, Item, ListItem
+from mimir.backend.entry import DataBaseEntry, Item, ListItem, make_entry_class
 
 
 def check_items_in_entry(InputItems, entry):
@@ -209,6 +211,16 @@ def test_entry_equal():
     assert newEntry == newEntry2
 
 
+def test_entry_equal_itemOrder():
+    Items, newEntry = getEntry()
+    reversedEntry = DataBaseEntry(list(reversed(Items)))
+    assert newEntry == reversedEntry and reversedEntry == newEntry
+    CompactClass = make_entry_class("TestEntry", [(n, t) for n, t, _ in Items])
+    assert CompactClass(Items) == reversedEntry
+    reversedEntry.change_item_value("Item2", "ReplacedValue")
+    assert newEntry != reversedEntry
+
+
 def test_entry_notequal_sameNames():
     Items, newEntry = getEntry()
     Items2, newEntry2 = getEntry()
@@ -240,5 +252,46 @@ def test_entry_getAllValues_byName_split(preCreatedEntry):
     assert list(allValues) == list(set(["DefaultListItem2", "DefaultListItem3"]))
 
 
+def test_entry_compact():
+    Items, genericEntry = getEntry()
+    CompactClass = make_entry_class("TestEntry", [(n, t) for n, t, _ in Items])
+    assert make_entry_class("TestEntry", [(n, t) for n, t, _ in Items]) is CompactClass
+    assert CompactClass.accepts(Items)
+    assert not CompactClass.accepts(Items[:2])
+    newEntry = CompactClass(Items)
+    # Only the item slots, observer and key exist
+    assert not hasattr(newEntry, "__dict__")
+    slots = [
+        slot
+        for cls in CompactClass.__mro__
+        for slot in cls.__dict__.get("__slots__", ())
+    ]
+    assert sorted(slots) == sorted(["observer", "key"] + [n for n, _, _ in Items])
+    with pytest.raises(AttributeError):
+        newEntry.Blubb = "Value"
+    assert not isinstance(newEntry, DataBaseEntry)
+    assert newEntry == genericEntry and genericEntry == newEntry
+    assert newEntry.get_dict_repr() == genericEntry.get_dict_repr()
+    assert newEntry.Item1 == "DefaultForItem1"
+    assert isinstance(newEntry.get_item("ListItem1"), ListItem)
+    assert isinstance(newEntry.get_item("Item1"), Item)
+    assert newEntry.has_item("Item2") and not newEntry.has_item("Blubb")
+    newEntry.change_item_value("Item1", "New")
+    newEntry.add_item_value("ListItem1", "Added")
+    newEntry.replace_item_value("ListItem2", "Replaced", "DefaultListItem2")
+    assert newEntry.Item1 == "New"
+    assert newEntry.get_item("ListItem1").value == ["DefaultListItem1", "Added"]
+    assert newEntry.ListItem2 == ["Replaced"]
+    with pytest.raises(RuntimeError):
+        newEntry.change_item_value("ListItem1", "New")
+    with pytest.raises(RuntimeError):
+        newEntry.add_item("Item3", "Single", "Value")
+    with pytest.raises(RuntimeError):
+        CompactClass(list(reversed(Items)))
+    assert copy.deepcopy(newEntry) == newEntry
+    assert type(pickle.loads(pickle.dumps(newEntry))) is CompactClass
+    assert make_entry_class("TestEntry2", [("items", "Single")]) is None
+
+
 if __name__ == "__main__":
     unittest.main()
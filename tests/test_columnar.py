@@ -0,0 +1,79 @@
+# flake8: noqa
+import copy
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mimir.backend.database import DataBase
+
+if os.getcwd().endswith("tests"):
+    mimir_dir = os.getcwd()[0 : -len("/tests")]
+    dir2tests = os.getcwd()
+else:
+    mimir_dir = os.getcwd()
+    dir2tests = os.getcwd() + "/tests"
+
+config = mimir_dir + "/conf/modeltest.json"
+dbRootPath = dir2tests + "/testStructure"
+
+
+@pytest.fixture()
+def columnDB():
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+    database = DataBase(dbRootPath, "new", config)
+    for entry_id, rating in [("0", "3"), ("1", "2"), ("2", "4"), ("3", "5")]:
+        database.modify_single_entry(entry_id, "Rating", rating, by_id=True)
+    database.modify_list_entry("1", "Opened", "01.02.20|10:00:00", by_id=True)
+    database.modify_list_entry("2", "Opened", "01.02.21|10:00:00", by_id=True)
+    yield database
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+
+
+def test_01_columnar_queries(columnDB):
+    columns = columnDB.enable_columns()
+    assert len(columns) == len(columnDB.entries)
+    high = columns.mask("Rating", ">=", 3)
+    assert columns.ids(high) == ["0", "2", "3"]
+    assert columns.ids(high & columns.mask("Opened", ">", "01.01.21|00:00:00")) == ["2"]
+    ratings = [int(e.Rating) for e in columnDB.entries]
+    assert columns.aggregate("Rating") == sum(ratings)
+    assert columns.aggregate("Rating", "max", mask=columns.mask("ID", "<", 2)) == 3
+    assert columns.value_counts("Rating") == {
+        float(r): ratings.count(r) for r in set(ratings)
+    }
+    path = columnDB.get_entry_by_id(2).Path
+    assert columns.ids(columns.mask("Path", "==", path)) == ["2"]
+    assert columns.ids(columns.mask("Path", "==", "unknown")) == []
+    for item in ["Rating", "Opened", "Added"]:
+        for reverse in [True, False]:
+            expected = columnDB.get_sorted_ids(item, reverse)
+            assert columns.sorted_ids(item, reverse) == expected
+            assert columns.sorted_ids(item, reverse, limit=2) == expected[:2]
+    with pytest.raises(NotImplementedError):
+        columns.mask("Path", "<", "a")
+
+
+def test_02_columnar_updates(columnDB):
+    columns = columnDB.enable_columns(["Rating", "SingleItem"])
+    columnDB.modify_single_entry("3", "Rating", "1", by_id=True)
+    columnDB.modify_single_entry("1", "SingleItem", "Column", by_id=True)
+    columnDB.remove("0", by_id=True)
+    with columnDB.batch() as batch:
+        batch.set("2", "Rating", "1")
+        batch.set("1", "ID", "10")
+    columnDB.create_new_entry("folder1/new.mp4", 11)
+    assert columns.ids(columns.mask("Rating", "==", 1)) == ["2", "3"]
+    assert columns.ids(columns.mask("SingleItem", "==", "Column")) == ["10"]
+    assert columns.value_counts("SingleItem")["Column"] == 1
+    assert len(columns) == len(columnDB.entries)
+    assert list(columns.values("ID")) == [float(e.ID) for e in columnDB.entries]
+    # Capacity grows with the row keys
+    for c_id in range(12, 12 + columns.min_capacity):
+        columnDB.create_new_entry("folder1/new{0}.mp4".format(c_id), c_id)
+    assert len(columns) == len(columnDB.entries)
+    assert columns.sorted_ids("ID", limit=1) == [str(11 + columns.min_capacity)]
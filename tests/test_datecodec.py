@@ -0,0 +1,54 @@
+# flake8: noqa
+import datetime
+
+import pytest
+
+import mimir.backend.datecodec as datecodec
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("01.01.70|00:00:00", datetime.datetime(2070, 1, 1)),
+        ("29.02.20|23:59:59", datetime.datetime(2020, 2, 29, 23, 59, 59)),
+        ("1.2.19|3:04:5", datetime.datetime(2019, 2, 1, 3, 4, 5)),
+    ],
+)
+def test_01_datecodec_roundtrip(value, expected):
+    datecodec.clear_memo()
+    epoch = datecodec.to_epoch(value)
+    assert epoch == int(expected.replace(tzinfo=datetime.timezone.utc).timestamp())
+    assert datecodec.to_epoch(value) == epoch
+    assert datecodec.to_datetime(value) == expected
+    assert datecodec.to_epoch(datecodec.from_epoch(epoch)) == epoch
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "emptyOpened",
+        "Blubb|00:00:00",
+        "01.01.01|Blubb",
+        "30.02.20|00:00:00",
+        "01.01.20|24:00:00",
+        None,
+    ],
+)
+def test_02_datecodec_invalid(value):
+    with pytest.raises(ValueError):
+        datecodec.to_epoch(value)
+
+
+def test_03_datecodec_batch():
+    values = ["01.01.19|00:00:00", "emptyOpened", "01.01.19|00:00:00"]
+    with pytest.raises(ValueError):
+        datecodec.to_epochs(values)
+    default = datecodec.to_epoch("01.01.00|00:00:00")
+    epochs = datecodec.to_epochs(values, default=default)
+    assert epochs[1] == default
+    assert epochs[0] == epochs[2]
+    assert datecodec.from_epochs(epochs) == [
+        "01.01.19|00:00:00",
+        "01.01.00|00:00:00",
+        "01.01.19|00:00:00",
+    ]
@@ -0,0 +1,30 @@
+# flake8: noqa
+import pytest
+
+from mimir.backend.entry import DataBaseEntry
+from mimir.backend.entrystore import EntryStore
+
+
+def makeEntry(entry_id):
+    return DataBaseEntry([("ID", "Single", entry_id), ("Name", "Single", "N")])
+
+
+def test_01_entrystore_keys():
+    entries = [makeEntry(str(i)) for i in range(4)]
+    store = EntryStore(entries)
+    assert [e.key for e in entries] == [0, 1, 2, 3]
+    assert store[2] is entries[2]
+    assert store == entries
+    store.remove(entries[1])
+    assert entries[1].key is None
+    assert entries[1] not in store
+    assert list(store) == [entries[0], entries[2], entries[3]]
+    assert list(store.keys()) == [0, 2, 3]
+    # Keys are not reused
+    new_entry = makeEntry("1")
+    assert store.add(new_entry) == 4
+    assert len(store) == 4
+    with pytest.raises(KeyError):
+        store.remove(entries[1])
+    with pytest.raises(KeyError):
+        store[1]
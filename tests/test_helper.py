@@ -120,6 +120,13 @@ def test_03_sortDateTime():
     assert len(sortedList) == len(expectedList)
     for iElem, elem in enumerate(sortedList):
         assert elem == expectedList[iElem]
+    # Default values are sorted last, malformed dates raise
+    assert mimir.backend.helper.sortDateTime(["emptyOpened", "01.01.19|00:00:00"]) == [
+        "01.01.19|00:00:00",
+        "01.01.00|00:00:00",
+    ]
+    with pytest.raises(RuntimeError):
+        mimir.backend.helper.sortDateTime(["01-01-19|00:00:00"])
 
 
 def test_04_fixedList():
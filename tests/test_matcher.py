@@ -0,0 +1,26 @@
+# flake8: noqa
+from mimir.backend.matcher import AhoCorasick, PathMatcher
+
+
+def test_01_ahocorasick_find():
+    automaton = AhoCorasick(["he", "she", "his", "hers", "xyz"])
+    assert automaton.find("ushers") == {"he", "she", "hers"}
+    assert automaton.find("ahishe") == {"his", "she", "he"}
+    assert automaton.find("abc") == set()
+    assert AhoCorasick([]).find("abc") == set()
+
+
+def test_02_pathmatcher_match():
+    matcher = PathMatcher(
+        {"Item": ["Blue", "Double Orange"], "Other": ["Xi"]}, ["_", "-"], ["mp4"]
+    )
+    assert matcher.match("a/Double_Orange.mp4") == {
+        "Item": {"Double Orange"},
+        "Other": set(),
+    }
+    assert matcher.match("a/Double_Orange.mp4", whitespace_match=False) == {
+        "Item": {"Double Orange"},
+        "Other": set(),
+    }
+    assert matcher.match("a/bluexi-x.mp4") == {"Item": {"Blue"}, "Other": {"Xi"}}
+    assert matcher.match("a/bluexi-x.mp4", fast=True) == {"Item": set(), "Other": set()}
@@ -288,3 +288,48 @@ def test_10_MTF_modDisaply(item, value, expValue, modDisplay, preCreatedDB):
     app = MTF.App(preCreatedDB)
     app.config.itemInfo[item]["modDisplay"] = modDisplay
     assert app.mod_disaply(item, value) == expValue
+
+
+@pytest.fixture()
+def queryDB():
+    config = mimir_dir + "/conf/modeltest.json"
+    dbRootPath = dir2tests + "/testStructure"
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+    database = DataBase(dbRootPath, "new", config)
+    shutil.copy2(
+        mimir_dir + "/conf/MTF_modeltest.json", dbRootPath + "/.mimir/MTF_model.json"
+    )
+    entry = database.get_entry_by_item_name("Path", "rootFile1.mp4")[0]
+    database.modify_single_entry(entry.ID, "SingleItem", "Xi", by_id=True)
+    yield database
+    shutil.rmtree(dbRootPath + "/.mimir")
+
+
+@pytest.mark.parametrize(
+    "query, expPaths, expPrefix",
+    [
+        ("Xi", ["rootFile1.mp4"], False),
+        ("folder3", ["folder2/folder3/folder3file1.mp4"], True),
+        ("xyz", [], True),
+        ("folder3 Xi", [], False),
+    ],
+)
+def test_11_MTF_queryIDs(query, expPaths, expPrefix, queryDB):
+    app = MTF.App(queryDB)
+    query_ids, prefix_matches = app.get_query_ids(query)
+    assert (
+        sorted(queryDB.get_entry_by_item_name("ID", ID)[0].Path for ID in query_ids)
+        == expPaths
+    )
+    assert prefix_matches == expPrefix
+
+
+def test_12_MTF_queryIDs_veto(queryDB):
+    app = MTF.App(queryDB)
+    query_ids, prefix_matches = app.get_query_ids("!Xi")
+    xi_ID = queryDB.get_entry_by_item_name("Path", "rootFile1.mp4")[0].ID
+    assert sorted(query_ids) == sorted(
+        ID for ID in queryDB.get_all_value_by_item_name("ID") if ID != xi_ID
+    )
+    assert not prefix_matches
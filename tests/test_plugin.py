@@ -200,3 +200,150 @@ def test_06_plugin_newEntry_wPlugin(mocker):
     assert metadata_width == width
     assert metadata_duration == durationExp
     assert osData_size == fileSizeGB
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_07_plugin_getPluginValues_parallel(workers, mocker):
+    def osData(filename, SF=1e9):
+        if filename == "file3":
+            raise OSError
+        return {"size": filename}
+
+    mocker.patch("mimir.backend.plugin.get_osData", new=osData)
+    fileNames = ["file{0}".format(i) for i in range(10)]
+    with pytest.raises(ValueError):
+        mimir.backend.plugin.getPluginValues_parallel(fileNames, ["blubb:width"])
+    values = mimir.backend.plugin.getPluginValues_parallel(
+        fileNames, ["osData:size"], workers=workers, chunk_size=2
+    )
+    expected = [{"osData:size": f} for f in fileNames]
+    expected[3] = None
+    assert values == expected
+
+
+def test_08_plugin_getPluginValues_parallel_brokenWorker(mocker):
+    def osData(filename, SF=1e9):
+        if filename == "file3":
+            os._exit(1)
+        return {"size": filename}
+
+    mocker.patch("mimir.backend.plugin.get_osData", new=osData)
+    fileNames = ["file{0}".format(i) for i in range(10)]
+    values = mimir.backend.plugin.getPluginValues_parallel(
+        fileNames, ["osData:size"], workers=2, chunk_size=1
+    )
+    assert len(values) == len(fileNames)
+    assert values[3] is None
+    for fileName, fileValues in zip(fileNames, values):
+        assert fileValues is None or fileValues == {"osData:size": fileName}
+
+
+def test_09_plugin_newEntries_failingPlugin(mocker):
+    config = mimir_dir + "/conf/modeltest.json"
+    with open(config) as f:
+        modelDict = json.load(f)
+    modelDict["Size"] = {
+        "Type": "Item",
+        "default": "-1",
+        "hide": "",
+        "itemType": "str",
+        "plugin": "osData:size",
+    }
+    pluginConf = mimir_dir + "/conf/plugin_modeltest.json"
+    with open(pluginConf, "w") as outfile:
+        json.dump(modelDict, outfile, sort_keys=True, indent=4, separators=(",", ": "))
+    dbRootPath = dir2tests + "/testStructure"
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+
+    def osData(filename, SF=1e9):
+        if filename.endswith("folder1file2.mp4"):
+            raise OSError
+        return {"size": "1.00"}
+
+    mocker.patch("mimir.backend.plugin.get_osData", new=osData)
+    database = DataBase(dbRootPath, "new", pluginConf, dummy=True, plugin_workers=2)
+    assert [e.ID for e in database.entries] == [
+        str(i) for i in range(len(database.entries))
+    ]
+    for entry in database.entries:
+        if entry.Path.endswith("folder1file2.mp4"):
+            assert entry.Size == "-1"
+        else:
+            assert entry.Size == "1.00"
+
+
+def test_10_plugin_PluginCache(tmp_path, mocker):
+    files = []
+    for i in range(3):
+        files.append(str(tmp_path / "file{0}.mp4".format(i)))
+        with open(files[-1], "w") as f:
+            f.write("a" * i)
+    cache = mimir.backend.plugin.PluginCache(str(tmp_path / "plugin_cache"))
+    osData_spy = mocker.spy(mimir.backend.plugin, "get_osData")
+    values = mimir.backend.plugin.getPluginValues_parallel(
+        files, ["osData:size"], workers=1, cache=cache
+    )
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert osData_spy.call_count == 3
+    assert (
+        mimir.backend.plugin.getPluginValues_parallel(
+            files, ["osData:size"], workers=1, cache=cache
+        )
+        == values
+    )
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert osData_spy.call_count == 3
+    # Different definitions and changed files are not taken from the cache
+    assert cache.get_many(files, ["osData:size", "VideoMetaData:width"]) == [None] * 3
+    with open(files[0], "w") as f:
+        f.write("changed")
+    assert mimir.backend.plugin.getPluginValues(files[0], ["osData:size"], cache=cache)
+    assert osData_spy.call_count == 4
+    os.remove(files[1])
+    # Moved files keep their records
+    moved = str(tmp_path / "moved.mp4")
+    os.rename(files[2], moved)
+    assert cache.evict([files[0], moved]) == 1
+    assert cache.get_many([moved], ["osData:size"]) == [values[2]]
+    # Records of files not in the scan are removed
+    assert cache.evict([moved]) == 1
+
+
+def test_11_plugin_DB_rebuildWithCache(mocker):
+    config = mimir_dir + "/conf/modeltest.json"
+    with open(config) as f:
+        modelDict = json.load(f)
+    modelDict["Size"] = {
+        "Type": "Item",
+        "default": "-1",
+        "hide": "",
+        "itemType": "str",
+        "plugin": "osData:size",
+    }
+    pluginConf = mimir_dir + "/conf/plugin_modeltest.json"
+    with open(pluginConf, "w") as outfile:
+        json.dump(modelDict, outfile, sort_keys=True, indent=4, separators=(",", ": "))
+    dbRootPath = dir2tests + "/testStructure"
+    for folder in [dbRootPath + "/.mimir", dbRootPath + "/.mimir.old"]:
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+
+    database = DataBase(dbRootPath, "new", pluginConf, plugin_workers=1)
+    assert database.plugin_cache.misses == len(database.entries)
+    shutil.move(dbRootPath + "/.mimir", dbRootPath + "/.mimir.old")
+    osData_spy = mocker.spy(mimir.backend.plugin, "get_osData")
+    rebuiltDB = DataBase(
+        dbRootPath,
+        "new",
+        pluginConf,
+        plugin_workers=1,
+        plugin_cache=dbRootPath + "/.mimir.old/plugin_cache",
+    )
+    assert osData_spy.call_count == 0
+    assert rebuiltDB.plugin_cache.hits == len(database.entries)
+    for entry in database.entries:
+        assert rebuiltDB.get_entry_by_id(entry.ID).Size == entry.Size
+    shutil.rmtree(dbRootPath + "/.mimir.old")
+    shutil.rmtree(dbRootPath + "/.mimir")
+    os.remove(pluginConf)
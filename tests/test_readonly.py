@@ -0,0 +1,95 @@
+# flake8: noqa
+import json
+import os
+import shutil
+from collections import OrderedDict
+
+import pytest
+
+from mimir.backend.database import DataBase
+from mimir.backend.readonly import ReadOnlyDataBase
+
+if os.getcwd().endswith("tests"):
+    mimir_dir = os.getcwd()[0 : -len("/tests")]
+    dir2tests = os.getcwd()
+else:
+    mimir_dir = os.getcwd()
+    dir2tests = os.getcwd() + "/tests"
+
+config = mimir_dir + "/conf/modeltest.json"
+dbRootPath = dir2tests + "/testStructure"
+
+
+@pytest.fixture()
+def savedDB():
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+    database = DataBase(dbRootPath, "new", config)
+    database.modify_list_entry("1", "ListItem", "Blue", by_id=True)
+    database.save_main()
+    yield database
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+
+
+def test_01_readonly_saveFormat(savedDB):
+    expected = OrderedDict()
+    for entry in savedDB.entries:
+        expected[entry.Path] = entry.get_dict_repr()
+    with open(savedDB.savepath) as save_file:
+        assert save_file.read() == json.dumps(expected, indent=4)
+    with open(savedDB.storage.offsets_path) as offsets_file:
+        offsets = json.load(offsets_file)["entries"]
+    assert [o[0] for o in offsets] == [e.ID for e in savedDB.entries]
+    with open(savedDB.savepath, "rb") as save_file:
+        content = save_file.read()
+    for entry_id, path, start, end in offsets:
+        assert json.loads(content[start:end]) == expected[path]
+
+
+@pytest.mark.parametrize("with_offsets", [True, False])
+def test_02_readonly_entries(savedDB, with_offsets):
+    if not with_offsets:
+        os.remove(savedDB.storage.offsets_path)
+    with ReadOnlyDataBase(dbRootPath) as readonlyDB:
+        assert len(readonlyDB) == len(savedDB.entries)
+        assert readonlyDB.maxID == savedDB.maxID
+        assert readonlyDB.ids == [e.ID for e in savedDB.entries]
+        for entry in savedDB.entries:
+            assert readonlyDB.get_entry_by_id(entry.ID) == entry
+            assert readonlyDB.get_entry_by_path(entry.Path) == entry
+        assert list(readonlyDB) == savedDB.entries
+        assert readonlyDB.get_entry_by_item_name("ListItem", "Blue") == [
+            savedDB.get_entry_by_id(1)
+        ]
+        assert readonlyDB.get_entry_by_item_name("ID", "1000") == []
+        with pytest.raises(IndexError):
+            readonlyDB.get_entry_by_id(1000)
+
+
+def test_03_readonly_lru(savedDB):
+    with ReadOnlyDataBase(dbRootPath, cache_size=2) as readonlyDB:
+        first = readonlyDB.get_entry_by_id(0)
+        assert readonlyDB.get_entry_by_id(0) is first
+        readonlyDB.get_entry_by_id(1)
+        readonlyDB.get_entry_by_id(0)
+        readonlyDB.get_entry_by_id(2)
+        assert list(readonlyDB._cache.keys()) == ["0", "2"]
+        assert readonlyDB.get_entry_by_id(1) is not None
+        assert len(readonlyDB._cache) == 2
+
+
+def test_04_readonly_journal(savedDB):
+    savedDB.modify_single_entry("2", "Rating", "4", by_id=True)
+    removed_path = savedDB.get_entry_by_id(3).Path
+    savedDB.remove("3", by_id=True)
+    savedDB.save_main()
+    assert os.path.exists(dbRootPath + "/.mimir/journal")
+    with ReadOnlyDataBase(dbRootPath) as readonlyDB:
+        assert len(readonlyDB) == len(savedDB.entries)
+        assert readonlyDB.get_entry_by_id(2).Rating == "4"
+        assert readonlyDB.get_entry_by_item_name("ID", "3") == []
+        assert readonlyDB.get_entry_by_item_name("Path", removed_path) == []
+    assert savedDB.get_status()
+    savedDB.modify_single_entry("2", "Rating", "3", by_id=True)
+    assert not savedDB.get_status()
@@ -0,0 +1,66 @@
+# flake8: noqa
+import copy
+import os
+
+import pytest
+
+from mimir.backend.database import DataBase
+from mimir.backend.reconcile import reconcile
+
+if os.getcwd().endswith("tests"):
+    mimir_dir = os.getcwd()[0 : -len("/tests")]
+    dir2tests = os.getcwd()
+else:
+    mimir_dir = os.getcwd()
+    dir2tests = os.getcwd() + "/tests"
+
+config = mimir_dir + "/conf/modeltest.json"
+
+
+@pytest.fixture()
+def changedDB(tmp_path):
+    for path in ["a.mp4", "b.mp4", "sub1/c.mp4", "sub1/d.mp4", "e.mp4"]:
+        os.makedirs(os.path.dirname(str(tmp_path / path)), exist_ok=True)
+        (tmp_path / path).write_text(path)
+    database = DataBase(str(tmp_path), "new", config, plugin_workers=1)
+    os.rename(str(tmp_path / "sub1"), str(tmp_path / "sub2"))
+    os.remove(str(tmp_path / "b.mp4"))
+    os.remove(str(tmp_path / "a.mp4"))
+    (tmp_path / "new.mp4").write_text("new")
+    return database
+
+
+def test_01_reconcile_dryRun(changedDB):
+    database = copy.deepcopy(changedDB)
+    result = reconcile(database, dry_run=True)
+    assert result.dry_run
+    assert sorted(m[1:] for m in result.moved) == [
+        ("sub1/c.mp4", "sub2/c.mp4"),
+        ("sub1/d.mp4", "sub2/d.mp4"),
+    ]
+    assert sorted(p for _, p in result.missing) == ["a.mp4", "b.mp4"]
+    assert result.new_files == ["new.mp4"]
+    assert len(result.id_changes) == 3
+    assert list(result.timings.keys()) == ["scan", "diff"]
+    assert "[Dry run]" in result.summary()
+    assert database == changedDB
+
+
+def test_02_reconcile_apply(changedDB):
+    expectedDB = copy.deepcopy(changedDB)
+    expectedDB.check_changed_paths()
+    expectedDB.check_missing_files(mod_id=False)
+    expectedDB.reset_entry_ids()
+    database = copy.deepcopy(changedDB)
+    result = reconcile(database)
+    assert list(result.timings.keys()) == ["scan", "diff", "move", "remove", "renumber"]
+    assert database == expectedDB
+    assert database.maxID == 2
+    assert sorted(e.ID for e in database.entries) == ["0", "1", "2"]
+    assert database.get_all_value_by_item_name("Path") == {
+        "sub2/c.mp4",
+        "sub2/d.mp4",
+        "e.mp4",
+    }
+    result = reconcile(database, add_new=True)
+    assert result.added == [("new.mp4", 3)]
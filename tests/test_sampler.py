@@ -0,0 +1,58 @@
+# flake8: noqa
+import random
+
+import pytest
+
+from mimir.backend.helper import IdQueue
+from mimir.backend.sampler import WeightedSampler
+
+
+def test_01_sampler_weights():
+    sampler = WeightedSampler()
+    for key, weight in enumerate([1.0, 0.0, 3.0, 0.5]):
+        sampler.set(key, weight)
+    assert sampler.total() == pytest.approx(4.5)
+    rng = random.Random(42)
+    draws = [sampler.sample(rng=rng) for _ in range(9000)]
+    assert 1 not in draws
+    assert draws.count(2) / len(draws) == pytest.approx(3.0 / 4.5, abs=0.03)
+    assert set(sampler.sample(exclude=[2], rng=rng) for _ in range(100)) <= {0, 3}
+    assert sampler.get(2) == 3.0
+    # Growing beyond the capacity
+    sampler.set(5000, 2.0)
+    assert sampler.total() == pytest.approx(6.5)
+    for key in (0, 2, 3, 5000):
+        sampler.set(key, 0.0)
+    with pytest.raises(IndexError):
+        sampler.sample()
+    with pytest.raises(ValueError):
+        sampler.set(0, -1)
+
+
+def test_02_sampler_many_updates():
+    sampler = WeightedSampler()
+    rng = random.Random(1)
+    weights = {}
+    for _ in range(5000):
+        key = rng.randrange(2000)
+        weights[key] = rng.random()
+        sampler.set(key, weights[key])
+    assert sampler.total() == pytest.approx(sum(weights.values()))
+
+
+def test_03_idqueue():
+    queue = IdQueue(2)
+    queue.append("1")
+    queue.append("1")
+    queue.append("2")
+    assert queue.containes("1") and "2" in queue
+    queue.append("3")
+    assert "1" not in queue
+    assert len(queue) == 2
+
+
+def test_04_sampler_init():
+    sampler = WeightedSampler({0: 1.0, 2: 2.0, 3000: 3.0})
+    assert sampler.total() == pytest.approx(6.0)
+    assert sampler.get(3000) == 3.0
+    assert sampler.sample(exclude=[0, 2]) == 3000
@@ -0,0 +1,76 @@
+# flake8: noqa
+import os
+import time
+
+import pytest
+
+from mimir.backend.scanner import FileScanner
+
+
+@pytest.fixture()
+def fileTree(tmp_path):
+    for path in [
+        "a.mp4",
+        "b.txt",
+        "mp4",
+        ".hidden.mp4",
+        "sub1/c.mp4",
+        "sub1/d.MP4",
+        "sub1/sub2/e.mkv",
+        ".hiddenDir/f.mp4",
+    ]:
+        os.makedirs(os.path.dirname(str(tmp_path / path)), exist_ok=True)
+        (tmp_path / path).write_text("")
+    old = time.time() - 100
+    for folder in ["", "sub1", "sub1/sub2", ".hiddenDir"]:
+        os.utime(str(tmp_path / folder), (old, old))
+    return tmp_path
+
+
+def test_01_scanner_scan(fileTree):
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"])
+    assert sorted(scanner.scan()) == ["a.mp4", "sub1/c.mp4", "sub1/sub2/e.mkv"]
+    assert sorted(scanner.scan("sub1/")) == ["sub1/c.mp4", "sub1/sub2/e.mkv"]
+    assert scanner.scan("notThere") == []
+
+
+def test_02_scanner_cache(fileTree):
+    cache_path = str(fileTree / ".hiddenDir" / "scan_cache.json")
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"], cache_path)
+    files = scanner.scan()
+    assert (scanner.n_listed, scanner.n_cached) == (3, 0)
+    assert os.path.exists(cache_path)
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"], cache_path)
+    assert scanner.scan() == files
+    assert (scanner.n_listed, scanner.n_cached) == (0, 3)
+    # Adding a file changes the mtime of the directory
+    (fileTree / "sub1" / "new.mp4").write_text("")
+    assert sorted(scanner.scan()) == sorted(files + ["sub1/new.mp4"])
+    assert (scanner.n_listed, scanner.n_cached) == (1, 2)
+    # Recently modified directories are not cached
+    assert "sub1" not in scanner.dir_cache
+    # Cache is not used if extentions change
+    scanner = FileScanner(str(fileTree), ["mp4"], cache_path)
+    assert scanner.dir_cache == {}
+
+
+def test_03_scanner_cache_save(fileTree):
+    cache_path = str(fileTree / ".hiddenDir" / "scan_cache.json")
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"], cache_path)
+    scanner.scan()
+    old = time.time() - 50
+    os.utime(cache_path, (old, old))
+    mtime_ns = os.stat(cache_path).st_mtime_ns
+    # Unchanged directories do not rewrite the cache
+    scanner.scan()
+    assert os.stat(cache_path).st_mtime_ns == mtime_ns
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"], cache_path)
+    scanner.scan()
+    assert os.stat(cache_path).st_mtime_ns == mtime_ns
+    # Removed directories are dropped from the saved cache
+    os.remove(str(fileTree / "sub1" / "sub2" / "e.mkv"))
+    os.rmdir(str(fileTree / "sub1" / "sub2"))
+    scanner.scan()
+    assert os.stat(cache_path).st_mtime_ns != mtime_ns
+    scanner = FileScanner(str(fileTree), ["mp4", "mkv"], cache_path)
+    assert "sub1/sub2" not in scanner.dir_cache
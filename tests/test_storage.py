@@ -0,0 +1,197 @@
+# flake8: noqa
+import copy
+import json
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import mimir.backend.storage
+from mimir.backend.database import DataBase
+from mimir.backend.storage import JSONStorage, SQLiteStorage, get_storage_backend
+
+if os.getcwd().endswith("tests"):
+    mimir_dir = os.getcwd()[0 : -len("/tests")]
+    dir2tests = os.getcwd()
+else:
+    mimir_dir = os.getcwd()
+    dir2tests = os.getcwd() + "/tests"
+
+config = mimir_dir + "/conf/modeltest.json"
+dbRootPath = dir2tests + "/testStructure"
+
+
+@pytest.fixture()
+def cleanRoot():
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+    yield dbRootPath
+    if os.path.exists(dbRootPath + "/.mimir"):
+        shutil.rmtree(dbRootPath + "/.mimir")
+
+
+def test_01_storage_getBackend(cleanRoot):
+    mimirdir = cleanRoot + "/.mimir"
+    assert isinstance(get_storage_backend(mimirdir), JSONStorage)
+    assert isinstance(get_storage_backend(mimirdir, "sqlite"), SQLiteStorage)
+    with pytest.raises(KeyError):
+        get_storage_backend(mimirdir, "blubb")
+    database = DataBase(cleanRoot, "new", config, storage="sqlite")
+    database.save_main()
+    assert isinstance(get_storage_backend(mimirdir), SQLiteStorage)
+
+
+def test_02_storage_sqlite_saveLoad(cleanRoot):
+    database = DataBase(cleanRoot, "new", config, storage="sqlite")
+    database.modify_list_entry("1", "ListItem", "Double Orange", by_id=True)
+    database.modify_list_entry("1", "ListItem", "Blue", by_id=True)
+    database.modify_single_entry("2", "Rating", "4", by_id=True)
+    assert database.save_main()
+    assert os.path.exists(cleanRoot + "/.mimir/mainDB.sqlite")
+    assert not os.path.exists(cleanRoot + "/.mimir/mainDB.json")
+    loadedDB = DataBase(cleanRoot, "load")
+    assert isinstance(loadedDB.storage, SQLiteStorage)
+    assert database == loadedDB
+    assert loadedDB.get_entry_by_item_name("ID", "1")[0].ListItem == [
+        "Double Orange",
+        "Blue",
+    ]
+    assert loadedDB.maxID == database.maxID
+
+
+def test_03_storage_sqlite_incrementalSave(cleanRoot, mocker):
+    database = DataBase(cleanRoot, "new", config, storage="sqlite")
+    database.save_main()
+    spy = mocker.spy(SQLiteStorage, "upsert")
+    database.modify_single_entry("2", "Rating", "4", by_id=True)
+    database.save_main()
+    # Only the modified entry is written
+    assert spy.call_count == 1
+    # Nothing changed -> nothing written
+    database.save_main()
+    assert spy.call_count == 1
+    # Removed and renumbered entries
+    database.remove("0", by_id=True)
+    database.modify_single_entry(str(database.maxID), "ID", "0", by_id=True)
+    database.maxID -= 1
+    database.save_main()
+    assert spy.call_count == 2
+    loadedDB = DataBase(cleanRoot, "load")
+    assert database == loadedDB
+    connection = sqlite3.connect(cleanRoot + "/.mimir/mainDB.sqlite")
+    n_entries = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    connection.close()
+    assert n_entries == len(database.entries)
+
+
+def test_04_storage_migrate(cleanRoot):
+    database = DataBase(cleanRoot, "new", config)
+    database.modify_list_entry("3", "ListItem", "Lavender", by_id=True)
+    database.save_main()
+    n_migrated = mimir.backend.storage.migrate(cleanRoot + "/.mimir")
+    assert n_migrated == len(database.entries)
+    with pytest.raises(RuntimeError):
+        mimir.backend.storage.migrate(cleanRoot + "/.mimir")
+    loadedDB = DataBase(cleanRoot, "load")
+    assert isinstance(loadedDB.storage, SQLiteStorage)
+    assert database == loadedDB
+
+
+def test_05_storage_json_journal(cleanRoot):
+    database = DataBase(cleanRoot, "new", config)
+    assert database.save_main()
+    checkpoint = cleanRoot + "/.mimir/mainDB.json"
+    journal = cleanRoot + "/.mimir/journal"
+    checkpoint_stat = os.stat(checkpoint)
+    assert not os.path.exists(journal)
+    database.modify_list_entry("1", "ListItem", "Blue", by_id=True)
+    database.modify_single_entry("2", "Rating", "4", by_id=True)
+    database.remove("3", by_id=True)
+    assert database.save_main()
+    assert os.path.exists(journal)
+    assert os.stat(checkpoint).st_mtime_ns == checkpoint_stat.st_mtime_ns
+    loadedDB = DataBase(cleanRoot, "load")
+    assert database == loadedDB
+    assert loadedDB.get_entry_by_item_name("ID", "3") == []
+    assert database.compact()
+    assert not os.path.exists(journal)
+    assert database == DataBase(cleanRoot, "load")
+
+
+def test_06_storage_json_journal_uncommitted(cleanRoot):
+    database = DataBase(cleanRoot, "new", config)
+    assert database.save_main()
+    database.modify_single_entry("1", "Rating", "4", by_id=True)
+    assert database.save_main()
+    journal = cleanRoot + "/.mimir/journal"
+    with open(journal, "a") as journal_file:
+        journal_file.write('{"op":"delete","id":"1"}\n{"op":"com')
+    loadedDB = DataBase(cleanRoot, "load")
+    assert loadedDB.get_entry_by_item_name("ID", "1")[0].Rating == "4"
+
+
+def test_07_storage_json_journal_outdated(cleanRoot):
+    database = DataBase(cleanRoot, "new", config)
+    assert database.save_main()
+    database.modify_single_entry("1", "Rating", "4", by_id=True)
+    assert database.save_main()
+    journal = cleanRoot + "/.mimir/journal"
+    shutil.copy2(journal, journal + ".old")
+    database.modify_single_entry("1", "Rating", "2", by_id=True)
+    assert database.compact()
+    shutil.copy2(journal + ".old", journal)
+    loadedDB = DataBase(cleanRoot, "load")
+    assert loadedDB.get_entry_by_item_name("ID", "1")[0].Rating == "2"
+
+
+def test_08_storage_json_journal_compactOnSize(cleanRoot, mocker):
+    database = DataBase(cleanRoot, "new", config)
+    assert database.save_main()
+    mocker.patch.object(JSONStorage, "compact_ratio", 0.0)
+    compact_spy = mocker.spy(JSONStorage, "compact")
+    database.modify_single_entry("1", "Rating", "4", by_id=True)
+    assert database.save_main()
+    assert compact_spy.call_count == 1
+    assert not os.path.exists(cleanRoot + "/.mimir/journal")
+    assert database == DataBase(cleanRoot, "load")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 2**20])
+def test_09_storage_iterJsonObject(tmp_path, chunk_size):
+    data = {
+        "a": {"ID": {"type": "Single", "value": "1"}},
+        "b\\u00e4": [1, 2.5, "x", None, True],
+        "c": 12345,
+        "d": "multi byte äö",
+    }
+    for indent in [None, 4]:
+        path = tmp_path / "test.json"
+        with open(path, "w", encoding="utf-8") as outfile:
+            json.dump(data, outfile, indent=indent, ensure_ascii=False)
+        with open(path, "rb") as infile:
+            members = list(
+                mimir.backend.storage.iter_json_object(infile, chunk_size=chunk_size)
+            )
+        assert members == list(data.items())
+    path.write_text("{}")
+    with open(path, "rb") as infile:
+        assert list(mimir.backend.storage.iter_json_object(infile)) == []
+    path.write_text('{"a": 1, "b": ')
+    with open(path, "rb") as infile:
+        with pytest.raises(json.JSONDecodeError):
+            list(mimir.backend.storage.iter_json_object(infile, chunk_size=4))
+
+
+def test_10_storage_json_loadProgress(cleanRoot, mocker):
+    database = DataBase(cleanRoot, "new", config)
+    assert database.save_main()
+    progress = mocker.Mock()
+    loadedDB = DataBase(cleanRoot, "load", progress=progress)
+    assert database == loadedDB
+    assert progress.call_count == len(database.entries)
+    total = os.path.getsize(cleanRoot + "/.mimir/mainDB.json")
+    done = [call[0][0] for call in progress.call_args_list]
+    assert done == sorted(done)
+    assert all(call[0][1] == total for call in progress.call_args_list)
+    assert done[-1] <= total
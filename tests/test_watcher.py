@@ -0,0 +1,170 @@
+# flake8: noqa
+import os
+
+import pytest
+
+from mimir.backend.database import DataBase
+
+if os.getcwd().endswith("tests"):
+    mimir_dir = os.getcwd()[0 : -len("/tests")]
+    dir2tests = os.getcwd()
+else:
+    mimir_dir = os.getcwd()
+    dir2tests = os.getcwd() + "/tests"
+
+config = mimir_dir + "/conf/modeltest.json"
+
+
+@pytest.fixture()
+def watchedDB(tmp_path):
+    for path in ["a.mp4", "sub1/b.mp4", "sub1/sub2/c.mp4", "sub3/d.mp4"]:
+        os.makedirs(os.path.dirname(str(tmp_path / path)), exist_ok=True)
+        (tmp_path / path).write_text("")
+    return DataBase(str(tmp_path), "new", config, plugin_workers=1)
+
+
+def test_01_watcher_apply(watchedDB):
+    watcher = watchedDB.watch(backend="polling", poll_interval=100)
+    entry_b = watchedDB.get_entry_by_item_name("Path", "sub1/b.mp4")[0]
+    result = watcher.apply(
+        [
+            ("created", "new.mp4"),
+            ("created", "new.txt"),
+            ("moved", "sub1/b.mp4", "sub3/b2.mp4"),
+            ("dir_moved", "sub1/sub2", "sub4"),
+            ("deleted", "a.mp4"),
+            ("created", "tmp.mp4"),
+            ("deleted", "tmp.mp4"),
+        ]
+    )
+    watcher.stop()
+    assert entry_b.Path == "sub3/b2.mp4"
+    assert sorted(result["moved"], key=lambda m: m[1]) == [
+        (entry_b.ID, "sub1/b.mp4", "sub3/b2.mp4"),
+        (
+            watchedDB.get_entry_by_item_name("Path", "sub4/c.mp4")[0].ID,
+            "sub1/sub2/c.mp4",
+            "sub4/c.mp4",
+        ),
+    ]
+    assert result["removed"] == ["a.mp4"]
+    assert [path for path, _ in result["added"]] == ["new.mp4"]
+    assert sorted(e.Path for e in watchedDB.entries) == [
+        "new.mp4",
+        "sub3/b2.mp4",
+        "sub3/d.mp4",
+        "sub4/c.mp4",
+    ]
+    assert sorted(int(e.ID) for e in watchedDB.entries) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("backend", ["inotify", "polling"])
+def test_02_watcher_filesystem(watchedDB, backend):
+    root = watchedDB.databaseRoot
+    watcher = watchedDB.watch(backend=backend, debounce=0.2, poll_interval=0.1)
+    assert watcher.backend == backend
+    with open(root + "/sub1/new.mp4", "w") as new_file:
+        new_file.write("data")
+    os.rename(root + "/sub3/d.mp4", root + "/sub1/d.mp4")
+    os.remove(root + "/a.mp4")
+    result = None
+    for _ in range(20):
+        result = watcher.process(timeout=1)
+        if result is not None:
+            break
+    watcher.stop()
+    assert result is not None
+    assert [path for path, _ in result["added"]] == ["sub1/new.mp4"]
+    assert [m[1:] for m in result["moved"]] == [("sub3/d.mp4", "sub1/d.mp4")]
+    assert result["removed"] == ["a.mp4"]
+    assert sorted(e.Path for e in watchedDB.entries) == [
+        "sub1/b.mp4",
+        "sub1/d.mp4",
+        "sub1/new.mp4",
+        "sub1/sub2/c.mp4",
+    ]
+
+
+def test_03_watcher_apply_targeted(watchedDB, monkeypatch):
+    watcher = watchedDB.watch(backend="polling", poll_interval=100)
+    watcher.stop()
+    id_a = watchedDB.get_entry_by_item_name("Path", "a.mp4")[0].ID
+    id_d = watchedDB.get_entry_by_item_name("Path", "sub3/d.mp4")[0].ID
+    # Events do not require a scan of the filesystem
+    monkeypatch.setattr(
+        watchedDB.scanner, "scan", lambda *args: pytest.fail("Unexpected scan")
+    )
+    result = watcher.apply(
+        [
+            # Swapped files keep their entries
+            ("moved", "a.mp4", "tmp.mp4"),
+            ("moved", "sub3/d.mp4", "a.mp4"),
+            ("moved", "tmp.mp4", "sub3/d.mp4"),
+            # Deleted and written again keeps the entry
+            ("deleted", "sub1/b.mp4"),
+            ("created", "sub1/b.mp4"),
+            # Renamed to a not matching extention removes the entry
+            ("moved", "sub1/sub2/c.mp4", "sub1/sub2/c.txt"),
+        ]
+    )
+    assert watchedDB.get_entry_by_item_name("Path", "sub3/d.mp4")[0].ID == id_a
+    assert watchedDB.get_entry_by_item_name("Path", "a.mp4")[0].ID == id_d
+    assert len(result["moved"]) == 2
+    assert result["removed"] == ["sub1/sub2/c.mp4"]
+    assert result["added"] == []
+    assert result["id_changes"] == []
+    assert sorted(e.Path for e in watchedDB.entries) == [
+        "a.mp4",
+        "sub1/b.mp4",
+        "sub3/d.mp4",
+    ]
+
+
+def test_04_watcher_apply_mod_id(watchedDB):
+    watcher = watchedDB.watch(backend="polling", poll_interval=100)
+    watcher.stop()
+    assert not watcher.mod_id
+    max_id = max(int(e.ID) for e in watchedDB.entries)
+    removed_id = watchedDB.get_entry_by_item_name("Path", "a.mp4")[0].ID
+    result = watcher.apply([("deleted", "a.mp4"), ("created", "new.mp4")])
+    # IDs of the other entries are not changed and new files take the free IDs
+    assert max(int(e.ID) for e in watchedDB.entries) == max_id
+    assert result["added"] == [("new.mp4", int(removed_id))]
+    watcher.mod_id = True
+    result = watcher.apply([("deleted", "new.mp4")])
+    assert result["id_changes"] == [(max_id, removed_id)]
+    assert sorted(int(e.ID) for e in watchedDB.entries) == list(range(max_id))
+
+
+def test_05_watcher_inotify_partial_write(watchedDB):
+    root = watchedDB.databaseRoot
+    watcher = watchedDB.watch(backend="inotify", debounce=0.2)
+    new_file = open(root + "/new.mp4", "w")
+    new_file.write("part")
+    new_file.flush()
+    # Files are only added after they are closed
+    assert watcher.process(timeout=0.5) is None
+    new_file.write("rest")
+    new_file.close()
+    result = watcher.process(timeout=1)
+    watcher.stop()
+    assert [path for path, _ in result["added"]] == ["new.mp4"]
+    assert watchedDB.file_keys["new.mp4"][2] == len("partrest")
+
+
+def test_06_watcher_apply_contiguousIDs(watchedDB):
+    watcher = watchedDB.watch(backend="polling", poll_interval=100)
+    watcher.stop()
+    by_id = {int(e.ID): e.Path for e in watchedDB.entries}
+    # Remove the entries with the highest IDs and add fewer files in one batch
+    result = watcher.apply(
+        [("deleted", by_id[3]), ("deleted", by_id[2]), ("created", "new1.mp4")]
+    )
+    assert result["added"] == [("new1.mp4", 2)]
+    assert watchedDB.maxID == 2
+    assert sorted(int(e.ID) for e in watchedDB.entries) == [0, 1, 2]
+    result = watcher.apply(
+        [("deleted", by_id[1]), ("created", "new2.mp4"), ("created", "new3.mp4")]
+    )
+    assert result["added"] == [("new2.mp4", 1), ("new3.mp4", 3)]
+    assert sorted(int(e.ID) for e in watchedDB.entries) == [0, 1, 2, 3]